@@ -1,42 +1,98 @@
 #!/usr/bin/env python3
-"""Check NiFi Process Group and Controller Services Status"""
+"""Check the status of every CDC flow with one recursive NiFi status request per poll"""
 
 import sys
-sys.path.append('src')
-from nifi_api_client import NiFiAPIClient
+import argparse
 import json
+import logging
+from pathlib import Path
+
+# Add src to Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from nifi_api_client import NiFiAPIClient
+from config_parser import ConfigParser
+from cdc_flow_builder import CDCFlowBuilder
+from fleet_monitor import FleetMonitor
+
+
+def format_lag(lag_seconds):
+    if lag_seconds is None:
+        return "stalled"
+    return f"{lag_seconds:.0f}s"
+
 
-def check_nifi_status():
-    client = NiFiAPIClient('http://nifi.nks.stjeong.com/nifi-api')
-    pg_id = '4cc2258f-0198-1000-6594-f0b789be82ef'
+def print_flows(flows, mapping_names=None, as_json=False):
+    """Print the snapshot of the selected flows (all of them by default)"""
+    selected = {key: flow for key, flow in sorted(flows.items())
+                if not mapping_names or key in mapping_names}
+    if as_json:
+        print(json.dumps(selected, indent=2, default=str))
+        return
+
+    print(f"\n=== CDC Flows ({len(selected)}) ===")
+    print(f"{'FLOW':<40} {'QUEUED':>8} {'QUEUE %':>7} {'LOADED/S':>9} {'LAG':>8} {'THREADS':>7}")
+    for key, flow in selected.items():
+        print(f"{key:<40} {flow['queued_count']:>8} {flow['max_queue_percent']:>6}% "
+              f"{flow['throughput']:>9.2f} {format_lag(flow['lag_seconds']):>8} {flow['active_threads']:>7}")
+        for bulletin in flow["bulletins"]:
+            print(f"  [{bulletin['level']}] {bulletin['timestamp']} {bulletin['source']}: {bulletin['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the status of the CDC flows in NiFi")
+    parser.add_argument(
+        "mapping",
+        nargs="*",
+        help="Only show these mappings (default: every flow under the CDC parent group)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling every MONITORING_INTERVAL"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the snapshot as JSON"
+    )
+    parser.add_argument(
+        "--base-path",
+        default=".",
+        help="Base path for configuration files (default: current directory)"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    config_parser = ConfigParser(args.base_path)
+    env_config = config_parser.get_env_config()
+    nifi_client = NiFiAPIClient.from_env_config(env_config)
+    monitor = FleetMonitor.from_env_config(CDCFlowBuilder(config_parser, nifi_client), env_config)
+
+    def show(flows):
+        print_flows(flows, args.mapping, args.json)
 
     try:
-        # Controller Services 조회
-        cs_url = f'{client.base_url}/flow/process-groups/{pg_id}/controller-services'
-        response = client.session.get(cs_url)
-        cs_list = response.json()['controllerServices']
-        
-        print(f'=== Controller Services ({len(cs_list)}) ===')
-        for cs in cs_list:
-            comp = cs['component']
-            print(f'\n- {comp["name"]}')
-            print(f'  ID: {comp["id"]}')
-            print(f'  Type: {comp["type"]}')
-            print(f'  State: {comp["state"]}')
-            if comp["state"] != "ENABLED":
-                print(f'  Validation Errors: {comp.get("validationErrors", [])}')
-            
-            # 속성 확인
-            if 'properties' in comp:
-                print(f'  Properties:')
-                for key, value in comp['properties'].items():
-                    if key != 'Password':  # 비밀번호는 숨김
-                        print(f'    {key}: {value}')
-                        
+        if args.watch:
+            monitor.watch(show)
+        else:
+            show(monitor.poll())
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
-        print(f'Error: {e}')
-        import traceback
-        traceback.print_exc()
+        logging.getLogger(__name__).error(f"Error checking NiFi status: {e}", exc_info=True)
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    check_nifi_status()
\ No newline at end of file
+    main()
@@ -6,15 +6,18 @@ Creates a CDC flow in NiFi using the API based on configuration files
 
 import sys
 import argparse
+import glob
 import logging
 from pathlib import Path
 
 # Add src to Python path
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from nifi_api_client import NiFiAPIClient
+from nifi_api_client import NiFiAPIClient, request_context
 from config_parser import ConfigParser
 from cdc_flow_builder import CDCFlowBuilder
+from backfill import BackfillScheduler
+from request_tracer import RequestTracer
 
 
 def setup_logging(log_level: str = "INFO"):
@@ -26,11 +29,97 @@ def setup_logging(log_level: str = "INFO"):
     return logging.getLogger(__name__)
 
 
+def resolve_mapping_names(config_parser: ConfigParser, patterns, all_mappings: bool = False):
+    """Expand mapping names and glob patterns into a de-duplicated list of mapping names"""
+    if all_mappings:
+        return config_parser.list_mappings()
+    
+    names = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = config_parser.list_mappings(pattern)
+            if not matches:
+                raise FileNotFoundError(f"No mappings match pattern: {pattern}")
+            names.extend(matches)
+        else:
+            names.append(pattern)
+    
+    return list(dict.fromkeys(names))
+
+
+def print_batch_summary(summary):
+    """Print per-mapping results and the total wall-clock time of a batch run"""
+    print(f"\nDeployed {summary['succeeded']}/{len(summary['results'])} CDC flows "
+          f"in {summary['elapsed']:.1f}s")
+    for result in summary["results"]:
+        if result["success"]:
+            process_group = result["flow"]["process_group"]
+            print(f"  ✅ {result['mapping']}: {process_group['name']} "
+                  f"(ID: {process_group['id']}) [{result['elapsed']:.1f}s]")
+        else:
+            print(f"  ❌ {result['mapping']}: {result['error']} [{result['elapsed']:.1f}s]")
+
+
+def print_trace(tracer: RequestTracer, trace_file: str):
+    """Print the NiFi request timing per flow and optionally write it as a Chrome trace"""
+    print("\nNiFi request timing:")
+    print(tracer.format_summary())
+    if trace_file:
+        tracer.write_chrome_trace(trace_file)
+        print(f"Chrome trace written to {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create CDC flow in NiFi")
     parser.add_argument(
         "mapping",
-        help="Mapping name (without .properties extension)"
+        nargs="*",
+        help="Mapping names (without .properties extension) or glob patterns such as 'emp_*'"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Create flows for every mapping in the mappings directory"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Number of flows deployed concurrently (default: MAX_CONCURRENT_FLOWS)"
+    )
+    parser.add_argument(
+        "--flow-definition",
+        action="store_true",
+        help="Upload each flow as one flow definition instead of creating components individually"
+    )
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help="Update existing flows in place, applying only the differences to the mapping"
+    )
+    parser.add_argument(
+        "--drop-queues",
+        action="store_true",
+        help="With --reconcile/--backfill, drop FlowFiles still queued in connections that are deleted"
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Deploy or update the flow, then run its window in cdc.window.slice slices, "
+             "resuming after the last finished slice"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only validate the mappings and their datasources, without connecting to NiFi"
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="Print where the time of each flow goes per phase and NiFi endpoint; "
+             "with FILE also write a Chrome trace (JSON) of every request"
     )
     parser.add_argument(
         "--base-path",
@@ -45,29 +134,80 @@ def main():
     )
     
     args = parser.parse_args()
+    if not args.mapping and not args.all:
+        parser.error("at least one mapping or --all is required")
+    if args.backfill and (args.all or len(args.mapping) != 1 or glob.has_magic(args.mapping[0])):
+        parser.error("--backfill takes a single mapping")
     logger = setup_logging(args.log_level)
+    tracer = RequestTracer() if args.trace is not None else None
     
     try:
         # Initialize configuration parser
         logger.info("Initializing configuration parser...")
         config_parser = ConfigParser(args.base_path)
         env_config = config_parser.get_env_config()
+        mapping_names = resolve_mapping_names(config_parser, args.mapping, args.all)
+        
+        # Validate every mapping before the first request to NiFi
+        logger.info(f"Loaded {config_parser.preload()} configuration files")
+        errors = CDCFlowBuilder(config_parser, None).validate_mappings(mapping_names)
+        for mapping_name, problems in errors.items():
+            for problem in problems:
+                logger.error(f"Invalid mapping {mapping_name}: {problem}")
+        if args.dry_run:
+            print(f"\nValidated {len(mapping_names)} mappings: {len(mapping_names) - len(errors)} valid, "
+                  f"{len(errors)} invalid")
+            for mapping_name, problems in errors.items():
+                print(f"  ❌ {mapping_name}: {'; '.join(problems)}")
+        if errors:
+            sys.exit(1)
+        if args.dry_run:
+            return
         
         # Initialize NiFi API client
         logger.info(f"Connecting to NiFi at {env_config['nifi_api_base_url']}...")
-        nifi_client = NiFiAPIClient(
-            env_config["nifi_api_base_url"],
-            env_config["nifi_api_username"],
-            env_config["nifi_api_password"]
-        )
+        nifi_client = NiFiAPIClient.from_env_config(env_config, request_hooks=[tracer.hook] if tracer else None)
         
         # Create CDC flow builder
         logger.info("Creating CDC flow builder...")
         flow_builder = CDCFlowBuilder(config_parser, nifi_client)
         
+        if len(mapping_names) != 1 or args.all or glob.has_magic(args.mapping[0]):
+            # Batch mode: deploy every mapping through a bounded worker pool
+            logger.info(f"Creating CDC flows for {len(mapping_names)} mappings...")
+            summary = flow_builder.create_cdc_flows(
+                mapping_names, args.max_workers, args.flow_definition, args.reconcile, args.drop_queues
+            )
+            for result in summary["results"]:
+                if not result["success"]:
+                    logger.error(f"Failed to create CDC flow for {result['mapping']}: {result['error']}")
+            print_batch_summary(summary)
+            if summary["failed"]:
+                sys.exit(1)
+            return
+        
         # Create the CDC flow
-        logger.info(f"Creating CDC flow for mapping: {args.mapping}")
-        result = flow_builder.create_cdc_flow(args.mapping)
+        logger.info(f"Creating CDC flow for mapping: {mapping_names[0]}")
+        with request_context(flow=mapping_names[0]):
+            if args.backfill:
+                flow_builder.reconcile_cdc_flow(mapping_names[0], drop_queues=args.drop_queues)
+                scheduler = BackfillScheduler(flow_builder, str(Path(args.base_path) / ".backfill"))
+                summary = scheduler.run(mapping_names[0])
+                print(f"\nBackfilled {summary['finished']} slices "
+                      f"({summary['skipped']} already done, {len(summary['failed'])} failed) "
+                      f"of {summary['slices']}")
+                for slice_key in summary["failed"]:
+                    print(f"  ❌ {slice_key}")
+                if summary["failed"]:
+                    sys.exit(1)
+                return
+            elif args.reconcile:
+                result = flow_builder.reconcile_cdc_flow(mapping_names[0], drop_queues=args.drop_queues)
+                print(f"\nReconciled changes: {result['changes']}")
+            elif args.flow_definition:
+                result = flow_builder.create_cdc_flow_from_definition(mapping_names[0])
+            else:
+                result = flow_builder.create_cdc_flow(mapping_names[0])
         
         logger.info("CDC flow created successfully!")
         logger.info(f"Process Group ID: {result['process_group']['id']}")
@@ -86,6 +226,9 @@ def main():
     except Exception as e:
         logger.error(f"Error creating CDC flow: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if tracer and tracer.calls:
+            print_trace(tracer, args.trace)
 
 
 if __name__ == "__main__":
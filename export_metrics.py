@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Serve per-mapping CDC throughput, queue and lag metrics in OpenMetrics format for Prometheus"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add src to Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from nifi_api_client import NiFiAPIClient
+from config_parser import ConfigParser
+from cdc_flow_builder import CDCFlowBuilder
+from fleet_monitor import FleetMonitor
+from metrics_exporter import MetricsExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve CDC flow metrics for Prometheus")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Port of the /metrics endpoint (default: METRICS_PORT)"
+    )
+    parser.add_argument(
+        "--host",
+        default="0.0.0.0",
+        help="Address to listen on (default: all interfaces)"
+    )
+    parser.add_argument(
+        "--no-max-value-lag",
+        action="store_true",
+        help="Do not read the state of incremental extracts (saves one request per flow and poll)"
+    )
+    parser.add_argument(
+        "--base-path",
+        default=".",
+        help="Base path for configuration files (default: current directory)"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    config_parser = ConfigParser(args.base_path)
+    env_config = config_parser.get_env_config()
+    nifi_client = NiFiAPIClient.from_env_config(env_config)
+    monitor = FleetMonitor.from_env_config(CDCFlowBuilder(config_parser, nifi_client), env_config,
+                                           track_max_values=not args.no_max_value_lag)
+    port = args.port or int(env_config.get("metrics_port") or 9405)
+
+    try:
+        MetricsExporter(monitor, args.host, port).serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import json
+import logging
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from flow_reconciler import FlowReconciler
+
+logger = logging.getLogger(__name__)
+
+# Format of cdc.incremental.from/to and of the slice bounds written into the queries
+WINDOW_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SLICE_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_slice_duration(value: str) -> timedelta:
+    """Parse a slice length such as 30m, 1h or 1d"""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", value or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid cdc.window.slice: {value!r} (expected e.g. 30m, 1h, 1d)")
+    return timedelta(**{SLICE_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def window_slices(start: datetime, end: datetime, size: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end] into consecutive slices of at most ``size``"""
+    slices = []
+    while start < end:
+        slices.append((start, min(start + size, end)))
+        start += size
+    return slices
+
+
+class BackfillScheduler:
+    """Run the CDC window of a mapping as time slices through the extract lanes of its flow.
+
+    Each lane runs one slice at a time, so at most cdc.window.concurrency slice
+    queries hit the source database at once. Finished slices are recorded in a
+    JSON state file, and an interrupted backfill resumes after them instead of
+    starting over.
+    """
+
+    def __init__(self, flow_builder, state_dir: str = ".backfill", slice_timeout: float = 3600.0):
+        self.flow_builder = flow_builder
+        self.nifi_client = flow_builder.nifi_client
+        self.state_dir = Path(state_dir)
+        self.slice_timeout = slice_timeout
+        self._state_lock = threading.Lock()
+
+    def run(self, mapping_name: str) -> Dict[str, Any]:
+        """Run every slice of the mapping's window that has not finished yet"""
+        mapping_config = self.flow_builder.config_parser.parse_mapping(mapping_name)
+        slices = self.plan_slices(mapping_config)
+        state_path = self.state_dir / f"{mapping_name}.json"
+        state = self._load_state(state_path, mapping_config)
+        pending = [s for s in slices if self._slice_key(s) not in state["finished"]]
+
+        group_id, lanes = self._find_lanes(mapping_config)
+        free_lanes = queue.Queue()
+        for lane_id in lanes:
+            free_lanes.put(lane_id)
+
+        logger.info(f"Backfilling {mapping_name}: {len(pending)} of {len(slices)} slices "
+                    f"on {len(lanes)} lanes")
+
+        failed = []
+
+        def run_on_free_lane(window_slice):
+            lane_id = free_lanes.get()
+            try:
+                self.run_slice(lane_id, mapping_config, window_slice, window_slice == slices[-1],
+                               group_id, lanes)
+                with self._state_lock:
+                    state["finished"].append(self._slice_key(window_slice))
+                    self._save_state(state_path, state)
+            except Exception as e:
+                logger.error(f"Backfill slice {self._slice_key(window_slice)} of {mapping_name} failed: {e}")
+                failed.append(self._slice_key(window_slice))
+            finally:
+                free_lanes.put(lane_id)
+
+        # Lanes stay disabled outside a backfill so starting the flow never runs them
+        for lane_id in lanes:
+            self.nifi_client.set_processor_run_status(lane_id, "STOPPED")
+        try:
+            with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+                list(executor.map(run_on_free_lane, pending))
+        finally:
+            for lane_id in lanes:
+                self._disable_lane(lane_id)
+
+        return {
+            "mapping": mapping_name,
+            "slices": len(slices),
+            "skipped": len(slices) - len(pending),
+            "finished": len(pending) - len(failed),
+            "failed": sorted(failed)
+        }
+
+    def plan_slices(self, mapping_config: Dict[str, str]) -> List[Tuple[datetime, datetime]]:
+        """Slices of the mapping's cdc.incremental.from .. cdc.incremental.to window"""
+        start = datetime.strptime(mapping_config.get("cdc.incremental.from"), WINDOW_TIME_FORMAT)
+        end = datetime.strptime(mapping_config.get("cdc.incremental.to"), WINDOW_TIME_FORMAT)
+        return window_slices(start, end, parse_slice_duration(mapping_config.get("cdc.window.slice")))
+
+    def run_slice(self, lane_id: str, mapping_config: Dict[str, str],
+                  window_slice: Tuple[datetime, datetime], last: bool = False,
+                  group_id: Optional[str] = None, lanes: Sequence[str] = ()):
+        """Point a lane at one slice, run it once and wait until its rows have gone through the flow.
+        
+        The slice fails when the lane, or a stage after the lanes, posted an error bulletin
+        since the run (a failed query or rejected rows only show up there).
+        """
+        slice_config = dict(mapping_config, **{
+            "cdc.incremental.from": window_slice[0].strftime(WINDOW_TIME_FORMAT),
+            "cdc.incremental.to": window_slice[1].strftime(WINDOW_TIME_FORMAT)
+        })
+        # Only the last slice keeps the window's inclusive upper bound
+        query = self.flow_builder.extract_query(slice_config, upper_inclusive=last)
+        self.nifi_client.update_processor(lane_id, {"SQL select query": query})
+        
+        since = self._latest_bulletin_id(lane_id, group_id)
+        self.nifi_client.run_processor_once(lane_id)
+        self.nifi_client.wait_for_processor_state(lane_id, "STOPPED", self.slice_timeout)
+        if group_id:
+            self.nifi_client.wait_for_process_group_drained(group_id, self.slice_timeout)
+        
+        errors = self._slice_errors(lane_id, group_id, lanes, since)
+        if errors:
+            raise RuntimeError(f"{len(errors)} error bulletins, first: {errors[0]}")
+    
+    def _bulletins(self, lane_id: str, group_id: Optional[str], after: Optional[int] = None) -> List[Dict[str, Any]]:
+        if group_id:
+            board = self.nifi_client.get_bulletin_board(after=after, group_id=group_id)
+        else:
+            board = self.nifi_client.get_bulletin_board(after=after, source_id=lane_id)
+        return board.get("bulletinBoard", {}).get("bulletins", [])
+    
+    def _latest_bulletin_id(self, lane_id: str, group_id: Optional[str]) -> Optional[int]:
+        return max((entity.get("id", 0) for entity in self._bulletins(lane_id, group_id)), default=None)
+    
+    def _slice_errors(self, lane_id: str, group_id: Optional[str], lanes: Sequence[str],
+                      since: Optional[int]) -> List[str]:
+        """Messages of the error bulletins that fail a slice: those of its lane and of the shared
+        stages after the lanes (errors of the other lanes belong to their own slices)"""
+        errors = []
+        for entity in self._bulletins(lane_id, group_id, since):
+            bulletin = entity.get("bulletin") or {}
+            source_id = entity.get("sourceId") or bulletin.get("sourceId")
+            if bulletin.get("level") != "ERROR" or (source_id != lane_id and source_id in lanes):
+                continue
+            errors.append(f"{bulletin.get('sourceName') or source_id}: {bulletin.get('message')}")
+        return errors
+    
+    def _disable_lane(self, lane_id: str):
+        """Stop a lane, wait for its query to end and disable it. A lane left enabled would run
+        the query of the whole window whenever the flow is started"""
+        try:
+            self.nifi_client.set_processor_run_status(lane_id, "STOPPED")
+            self.nifi_client.wait_for_processor_state(lane_id, "STOPPED", self.slice_timeout)
+            self.nifi_client.disable_processor(lane_id)
+        except Exception as e:
+            logger.error(f"Backfill lane {lane_id} could not be disabled ({e}); "
+                         f"disable it before starting the flow")
+    
+    def _find_lanes(self, mapping_config: Dict[str, str]) -> Tuple[str, List[str]]:
+        """Process group id and ids of the deployed extract lanes of the mapping's flow"""
+        lane_names = self.flow_builder.backfill_lane_names(mapping_config)
+        reconciler = FlowReconciler(self.flow_builder)
+        group_name = mapping_config.get("mapping.name", "CDC Flow")
+        group = reconciler.find_flow_group(group_name)
+        if group is None:
+            raise RuntimeError(f"CDC flow {group_name} is not deployed")
+
+        deployed = reconciler.fetch_deployed_flow(group["id"])["processors"]
+        missing = [name for name in lane_names if name not in deployed]
+        if missing:
+            raise RuntimeError(f"CDC flow {group_name} is missing backfill lanes: {missing}")
+        return group["id"], [deployed[name]["id"] for name in lane_names]
+
+    @staticmethod
+    def _slice_key(window_slice: Tuple[datetime, datetime]) -> str:
+        return f"{window_slice[0].strftime(WINDOW_TIME_FORMAT)}/{window_slice[1].strftime(WINDOW_TIME_FORMAT)}"
+
+    @staticmethod
+    def _window_of(mapping_config: Dict[str, str]) -> Dict[str, str]:
+        return {key: mapping_config.get(key)
+                for key in ("source.table", "cdc.column", "cdc.incremental.from",
+                            "cdc.incremental.to", "cdc.window.slice")}
+
+    def _load_state(self, state_path: Path, mapping_config: Dict[str, str]) -> Dict[str, Any]:
+        """Load the finished slices, starting over when the window or slicing changed"""
+        window = self._window_of(mapping_config)
+        if state_path.exists():
+            state = json.loads(state_path.read_text())
+            if state.get("window") == window:
+                return state
+            logger.info(f"Backfill window of {state_path.stem} changed; starting over")
+        return {"window": window, "finished": []}
+
+    def _save_state(self, state_path: Path, state: Dict[str, Any]):
+        """Write the state atomically so a crash never leaves a truncated file"""
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(state, indent=2))
+        temp_path.replace(state_path)
@@ -1,206 +1,1252 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import requests
+
 sys.path.append(str(Path(__file__).parent))
 
-from nifi_api_client import NiFiAPIClient
+from nifi_api_client import NiFiAPIClient, request_context
+from async_nifi_api_client import AsyncNiFiAPIClient
 from config_parser import ConfigParser
+from flow_definition import render_flow_definition, component_identifier, SENSITIVE_PROPERTIES
+from flow_reconciler import FlowReconciler
+from backfill import parse_slice_duration
+from column_mapping import parse_column_mappings, select_list, avro_schema, COLUMN_KEY_PREFIX
+from jdbc_dialects import dialect_of
+
+logger = logging.getLogger(__name__)
+
+# Selectable per mapping with cdc.pipeline:
+#   sql    - ExecuteSQL -> ConvertRecord -> ConvertJSONToSQL -> PutSQL
+#   record - ExecuteSQLRecord -> PutDatabaseRecord over shared record reader/writer services
+PIPELINE_PROFILES = ("sql", "record")
+
+# Selectable per mapping with cdc.mode:
+#   window      - one query over cdc.incremental.from .. cdc.incremental.to
+#   incremental - QueryDatabaseTable polling for rows past the high-water mark of cdc.column
+CDC_MODES = ("window", "incremental")
+
+# Selectable per mapping with cdc.load.mode:
+#   insert - plain INSERTs; rows already in the target fail on key conflicts
+#   upsert - PutDatabaseRecord UPSERT (a MERGE on Oracle) keyed on cdc.load.key.columns
+LOAD_MODES = ("insert", "upsert")
+
+# Processors without a failure relationship, which get no error connection
+PROCESSORS_WITHOUT_FAILURE = {
+    "org.apache.nifi.processors.standard.QueryDatabaseTable",
+    "org.apache.nifi.processors.standard.QueryDatabaseTableRecord",
+}
+
+# Concurrent tasks of the extract processor fed by GenerateTableFetch, per node
+PARTITIONED_EXTRACT_CONCURRENCY = 4
+
+# Processor scheduling settings tunable per stage with cdc.<stage>.<setting>,
+# e.g. cdc.load.concurrency=8 or cdc.convert.sql.run.duration=25
+STAGE_TUNING_SETTINGS = {
+    "concurrency": "concurrentlySchedulableTaskCount",
+    "schedule": "schedulingPeriod",
+    "schedule.strategy": "schedulingStrategy",
+    "execution.node": "executionNode",
+    "yield": "yieldDuration",
+    "penalty": "penaltyDuration",
+    "run.duration": "runDurationMillis",
+}
+SCHEDULING_STRATEGIES = ("TIMER_DRIVEN", "CRON_DRIVEN")
+EXECUTION_NODES = ("ALL", "PRIMARY")
+
+# Connection settings tunable with cdc.connection.<setting> for the whole flow
+# and cdc.<stage>.connection.<setting> for the connections leaving a stage
+CONNECTION_TUNING_SETTINGS = {
+    "backpressure.count": "backPressureObjectThreshold",
+    "backpressure.size": "backPressureDataSizeThreshold",
+    "expiration": "flowFileExpiration",
+    "load.balance": "loadBalanceStrategy",
+    "load.balance.attribute": "loadBalancePartitionAttribute",
+    "load.balance.compression": "loadBalanceCompression",
+    "prioritizers": "prioritizers",
+}
+LOAD_BALANCE_STRATEGIES = ("DO_NOT_LOAD_BALANCE", "ROUND_ROBIN", "PARTITION_BY_ATTRIBUTE", "SINGLE_NODE")
+LOAD_BALANCE_COMPRESSIONS = ("DO_NOT_COMPRESS", "COMPRESS_ATTRIBUTES_ONLY", "COMPRESS_ATTRIBUTES_AND_CONTENT")
+
+# DBCPConnectionPool properties set from datasource db.pool.* keys. Durations are
+# NiFi time periods ("30 secs", "8 hours"); a bare number is taken as milliseconds
+DBCP_POOL_SETTINGS = {
+    "db.pool.size": "Max Total Connections",
+    "db.pool.max.idle": "dbcp-max-idle-conns",
+    "db.pool.min.idle": "dbcp-min-idle-conns",
+    "db.pool.max.wait": "Max Wait Time",
+    "db.pool.validation.query": "Validation-query",
+    "db.pool.eviction.interval": "dbcp-time-between-eviction-runs",
+    "db.pool.min.evictable.idle": "dbcp-min-evictable-idle-time",
+    "db.pool.max.lifetime": "dbcp-max-conn-lifetime",
+}
+DBCP_DURATION_SETTINGS = ("db.pool.max.wait", "db.pool.eviction.interval",
+                          "db.pool.min.evictable.idle", "db.pool.max.lifetime")
+DBCP_DURATION_PATTERN = re.compile(r"-1|\d+\s*(ms|millis|msecs?|secs?|seconds?|mins?|minutes?|hrs?|hours?|days?)")
+
+# A mapping lists several tables with table.<id>.source/target (plus per-table overrides
+# table.<id>.<key>); all of them run in the mapping's process group, one row per table
+TABLE_KEY_PATTERN = re.compile(r"table\.([A-Za-z0-9_]+)\.(.+)")
+TABLE_ROW_HEIGHT = 600
+
+# Keys that apply to the whole mapping and cannot be overridden per table
+MAPPING_LEVEL_KEYS = ("mapping.name", "source.datasource", "target.datasource")
+
+# Upload responses telling that NiFi cannot take a flow definition at all (no upload
+# endpoint, or a 400 rejecting the snapshot format); other errors may follow a
+# successful upload, which a fallback would then deploy a second time
+UPLOAD_UNSUPPORTED_STATUS_CODES = {404, 405}
+UPLOAD_REJECTED_FORMAT_PATTERN = re.compile(r"snapshot|flow definition|deserializ|unrecognized field|json",
+                                            re.IGNORECASE)
+
+# Schema access strategies supported for the shared AvroReader (cdc.record.schema.access)
+RECORD_SCHEMA_ACCESS_STRATEGIES = ("embedded-avro-schema", "schema-text-property")
 
 
 class CDCFlowBuilder:
-    def __init__(self, config_parser: ConfigParser, nifi_client: NiFiAPIClient):
+    def __init__(self, config_parser: ConfigParser, nifi_client: NiFiAPIClient,
+                 async_client: Optional[AsyncNiFiAPIClient] = None):
         self.config_parser = config_parser
         self.nifi_client = nifi_client
+        self.async_client = async_client
         self.env_config = config_parser.get_env_config()
+        self._cdc_parent_group_id = None
+        self._cdc_parent_group_lock = threading.Lock()
+        self._shared_services = {}
+        self._shared_services_lock = threading.Lock()
         
     def create_cdc_flow(self, mapping_name: str) -> Dict[str, Any]:
         """Create complete CDC flow based on mapping configuration"""
         # Parse configurations
         mapping_config = self.config_parser.parse_mapping(mapping_name)
-        source_ds_name = mapping_config.get("source.datasource")
-        target_ds_name = mapping_config.get("target.datasource")
         
-        source_config = self.config_parser.parse_datasource(source_ds_name)
-        target_config = self.config_parser.parse_datasource(target_ds_name)
+        # Connection pools (one per datasource) and record services are shared by all
+        # flows under the CDC parent group, and are enabled before they are returned
+        with request_context(phase="services"):
+            service_ids = self._ensure_shared_services(mapping_config)
         
         # Create process group for CDC
-        cdc_group = self._create_cdc_process_group(mapping_config.get("mapping.name", "CDC Flow"))
+        with request_context(phase="process_group"):
+            cdc_group = self._create_cdc_process_group(mapping_config.get("mapping.name", "CDC Flow"))
         process_group_id = cdc_group["id"]
         
-        # Create controller services
-        source_dbcp = self._create_dbcp_service(process_group_id, f"{source_ds_name}_DBCP", source_config)
-        target_dbcp = self._create_dbcp_service(process_group_id, f"{target_ds_name}_DBCP", target_config)
+        # Create processors
+        with request_context(phase="processors"):
+            processors = self._create_cdc_processors(
+                process_group_id, 
+                mapping_config, 
+                service_ids["source_dbcp"], 
+                service_ids["target_dbcp"],
+                service_ids
+            )
+        
+        # Create connections
+        with request_context(phase="connections"):
+            self._create_processor_connections(process_group_id, processors, mapping_config)
         
-        # Enable controller services
-        time.sleep(2)  # Wait for services to be created
-        self.nifi_client.enable_controller_service(source_dbcp["id"])
-        self.nifi_client.enable_controller_service(target_dbcp["id"])
+        # Start all processors of the group in one request
+        with request_context(phase="start"):
+            self.nifi_client.start_process_group(process_group_id)
         
-        # Create processors
-        processors = self._create_cdc_processors(
-            process_group_id, 
-            mapping_config, 
-            source_dbcp["id"], 
-            target_dbcp["id"]
+        return dict({
+            "process_group": cdc_group,
+            "processors": processors
+        }, **self._dbcp_summary(mapping_config, service_ids))
+    
+    def reconcile_cdc_flow(self, mapping_name: str, dry_run: bool = False,
+                           drop_queues: bool = False) -> Dict[str, Any]:
+        """Update an existing CDC flow in place to match its mapping, creating it if missing"""
+        return FlowReconciler(self).reconcile(mapping_name, dry_run, drop_queues)
+    
+    def create_cdc_flow_from_definition(self, mapping_name: str) -> Dict[str, Any]:
+        """Create complete CDC flow by uploading it as a single flow definition.
+        
+        Falls back to create_cdc_flow when NiFi cannot take the upload, e.g. on a
+        NiFi version without the process group upload endpoint.
+        """
+        mapping_config = self.config_parser.parse_mapping(mapping_name)
+        group_name = mapping_config.get("mapping.name", "CDC Flow")
+        definition = self._render_cdc_flow_definition(group_name, mapping_config)
+        
+        # NiFi resolves the definition's external service references by name in the parent groups
+        service_ids = self._ensure_shared_services(mapping_config)
+        
+        try:
+            uploaded = self.nifi_client.upload_process_group(
+                self._get_cdc_parent_group_id(), group_name, definition
+            )
+        except requests.HTTPError as e:
+            if not self._upload_unsupported(e):
+                raise
+            logger.warning(f"Flow definition upload failed for {mapping_name} ({e}); "
+                           "creating components individually")
+            return self.create_cdc_flow(mapping_name)
+        
+        cdc_group = uploaded["component"]
+        process_group_id = cdc_group["id"]
+        
+        # Map the instantiated components back to their stage keys
+        flow = self.nifi_client.get_process_group_flow(process_group_id)["processGroupFlow"]["flow"]
+        processor_specs = self._cdc_processor_specs(mapping_config, {})
+        try:
+            processors = self._match_uploaded_components(group_name, processor_specs, flow.get("processors", []))
+        except RuntimeError:
+            # Do not leave an incomplete flow behind
+            self.nifi_client.delete_process_group(process_group_id)
+            raise
+        
+        self.nifi_client.start_process_group(process_group_id)
+        
+        return dict({
+            "process_group": cdc_group,
+            "processors": processors
+        }, **self._dbcp_summary(mapping_config, service_ids))
+    
+    def render_cdc_flow_definition(self, mapping_name: str) -> Dict[str, Any]:
+        """Render the CDC flow of a mapping as a NiFi flow definition (flow snapshot JSON)"""
+        mapping_config = self.config_parser.parse_mapping(mapping_name)
+        return self._render_cdc_flow_definition(mapping_config.get("mapping.name", "CDC Flow"), mapping_config)
+    
+    def _render_cdc_flow_definition(self, group_name: str, mapping_config: Dict[str, str]) -> Dict[str, Any]:
+        """Render processors and connections of a flow, wired by versioned identifiers to its shared services"""
+        shared_service_specs = self._shared_service_specs(mapping_config)
+        processor_specs = self._cdc_processor_specs(
+            mapping_config,
+            {key: component_identifier(group_name, key) for key in shared_service_specs}
+        )
+        return render_flow_definition(
+            group_name,
+            {},
+            processor_specs,
+            self._processor_connection_specs(processor_specs, mapping_config),
+            {key: spec["name"] for key, spec in shared_service_specs.items()}
         )
+    
+    def _dbcp_service_specs(self, mapping_config: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the source and target DBCP services of a mapping, one per datasource"""
+        specs = {}
+        for key, ds_key in (("source_dbcp", "source.datasource"), ("target_dbcp", "target.datasource")):
+            ds_name = mapping_config.get(ds_key)
+            specs[key] = {
+                "type": "org.apache.nifi.dbcp.DBCPConnectionPool",
+                "name": f"{ds_name}_DBCP",
+                "properties": self._dbcp_service_properties(self.config_parser.parse_datasource(ds_name))
+            }
+        return specs
+    
+    def _record_service_specs(self, mapping_config: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the record reader/writer services the mapping's pipeline uses.
         
-        # Create connections
-        self._create_processor_connections(process_group_id, processors)
+        Services are named after a digest of their settings, so mappings with the
+        same settings share one service.
+        """
+        schema_access = mapping_config.get("cdc.record.schema.access") or "embedded-avro-schema"
+        if schema_access not in RECORD_SCHEMA_ACCESS_STRATEGIES:
+            raise ValueError(f"Unsupported cdc.record.schema.access: {schema_access} "
+                             f"(expected one of {', '.join(RECORD_SCHEMA_ACCESS_STRATEGIES)})")
+        cache_size = mapping_config.get("cdc.record.schema.cache.size", "1000")
         
-        # Start processors
-        for processor in processors.values():
-            self.nifi_client.start_processor(processor["id"])
+        reader_properties = {"schema-access-strategy": schema_access, "cache-size": cache_size}
+        if schema_access == "schema-text-property":
+            schema_text = mapping_config.get("cdc.record.schema.text")
+            columns = parse_column_mappings(mapping_config)
+            if not schema_text and columns:
+                # Derive the schema of the projected records from the typed column mapping
+                schema_text = avro_schema(mapping_config.get("target.table") or "record", columns)
+            reader_properties["schema-text"] = schema_text
         
+        if self._pipeline_profile(mapping_config) == "record":
+            # Avro in and out: the record set is written and read back without conversion
+            writer = {
+                "type": "org.apache.nifi.avro.AvroRecordSetWriter",
+                "properties": {
+                    "Schema Write Strategy": "avro-embedded",
+                    "schema-access-strategy": "inherit-record-schema",
+                    "cache-size": cache_size
+                }
+            }
+        else:
+            # ConvertJSONToSQL expects one JSON array per FlowFile
+            writer = {
+                "type": "org.apache.nifi.json.JsonRecordSetWriter",
+                "properties": {
+                    "Schema Write Strategy": "no-schema",
+                    "schema-access-strategy": "inherit-record-schema",
+                    "output-grouping": "output-array",
+                    "Pretty Print JSON": "false"
+                }
+            }
+        
+        specs = {
+            "record_reader": {"type": "org.apache.nifi.avro.AvroReader", "properties": reader_properties},
+            "record_writer": writer
+        }
+        for spec in specs.values():
+            digest = hashlib.sha1(json.dumps(spec["properties"], sort_keys=True).encode()).hexdigest()[:8]
+            spec["name"] = f"CDC {spec['type'].rsplit('.', 1)[-1]} {digest}"
+        return specs
+    
+    def _shared_service_specs(self, mapping_config: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the services a mapping's flow references under the CDC parent group.
+        
+        Keyed like processor references: source_dbcp/target_dbcp for the mapping, and
+        record_reader/record_writer, prefixed with "<table id>/" in multi-table mappings.
+        """
+        specs = self._dbcp_service_specs(mapping_config)
+        for table_id, table_config in self._table_configs(mapping_config).items():
+            prefix = f"{table_id}/" if table_id else ""
+            for key, spec in self._record_service_specs(table_config).items():
+                specs[prefix + key] = spec
+        return specs
+    
+    def _ensure_shared_services(self, mapping_config: Dict[str, str], create: bool = True) -> Dict[str, Optional[str]]:
+        """Find or create (and enable) the shared services of a mapping under the CDC parent group.
+        
+        An existing service whose settings no longer match its datasource is reconfigured.
+        With ``create=False`` nothing is changed and services that do not exist yet map to None.
+        """
+        specs = self._shared_service_specs(mapping_config)
+        parent_pg_id = self._get_cdc_parent_group_id()
+        
+        # Concurrent deployments must agree on a single service per settings
+        with self._shared_services_lock:
+            if all(spec["name"] in self._shared_services for spec in specs.values()):
+                return {key: self._shared_services[spec["name"]] for key, spec in specs.items()}
+            
+            existing = {
+                service["component"]["name"]: service["component"]
+                for service in self.nifi_client.get_process_group_services(parent_pg_id).get("controllerServices", [])
+            }
+            if not create:
+                return {
+                    key: self._shared_services.get(spec["name"]) or existing.get(spec["name"], {}).get("id")
+                    for key, spec in specs.items()
+                }
+            
+            resolved = {}
+            for spec in specs.values():
+                if spec["name"] in self._shared_services:
+                    continue
+                service = existing.get(spec["name"])
+                if service is None:
+                    service = self.nifi_client.create_controller_service(
+                        parent_pg_id, spec["type"], spec["name"], spec["properties"]
+                    )["component"]
+                    logger.info(f"Created shared service {spec['name']}")
+                elif service.get("properties") is not None:
+                    changed = {
+                        name: value for name, value in spec["properties"].items()
+                        if name not in SENSITIVE_PROPERTIES
+                        and str(value or "") != str(service["properties"].get(name) or "")
+                    }
+                    if changed:
+                        self._update_shared_service(service["id"], changed)
+                        self._shared_services[spec["name"]] = service["id"]
+                        continue
+                resolved[spec["name"]] = service
+            
+            # Enable every service first, then wait, so they start up together
+            to_enable = [service["id"] for service in resolved.values() if service.get("state") != "ENABLED"]
+            for service_id in to_enable:
+                self.nifi_client.enable_controller_service(service_id)
+            for service_id in to_enable:
+                self.nifi_client.wait_for_controller_service_state(service_id, "ENABLED")
+            self._shared_services.update({name: service["id"] for name, service in resolved.items()})
+            
+            return {key: self._shared_services[spec["name"]] for key, spec in specs.items()}
+    
+    def _update_shared_service(self, service_id: str, properties: Dict[str, str]):
+        """Reconfigure a shared service in use, stopping and restarting the processors running on it"""
+        client = self.nifi_client
+        references = client.get_controller_service(service_id)["component"].get("referencingComponents") or []
+        running = [reference["id"] for reference in references
+                   if reference["component"].get("referenceType") == "Processor"
+                   and reference["component"].get("state") == "RUNNING"]
+        logger.info(f"Reconfiguring shared service {service_id} ({len(running)} processors restarted)")
+        
+        for processor_id in running:
+            client.stop_processor(processor_id)
+        for processor_id in running:
+            client.wait_for_processor_state(processor_id, "STOPPED")
+        client.disable_controller_service(service_id)
+        client.wait_for_controller_service_state(service_id, "DISABLED")
+        client.update_controller_service(service_id, properties)
+        client.enable_controller_service(service_id)
+        client.wait_for_controller_service_state(service_id, "ENABLED")
+        for processor_id in running:
+            client.start_processor(processor_id)
+    
+    def _dbcp_summary(self, mapping_config: Dict[str, str], service_ids: Dict[str, str]) -> Dict[str, Any]:
+        """The source_dbcp/target_dbcp entries of a deployment result"""
         return {
+            key: {"id": service_ids[key], "name": spec["name"]}
+            for key, spec in self._dbcp_service_specs(mapping_config).items()
+        }
+    
+    @staticmethod
+    def _upload_unsupported(error: requests.HTTPError) -> bool:
+        """Whether a failed upload means NiFi cannot take flow definitions, so nothing was created"""
+        response = error.response
+        if response is None:
+            return False
+        if response.status_code in UPLOAD_UNSUPPORTED_STATUS_CODES:
+            return True
+        return response.status_code == 400 and bool(UPLOAD_REJECTED_FORMAT_PATTERN.search(response.text or ""))
+    
+    @staticmethod
+    def _match_uploaded_components(group_name: str, specs: Dict[str, Dict[str, Any]],
+                                   entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Key instantiated components by stage using their versioned id, falling back to name"""
+        by_versioned_id = {component_identifier(group_name, key): key for key in specs}
+        by_name = {spec["name"]: key for key, spec in specs.items()}
+        
+        matched = {}
+        for entity in entities:
+            component = entity["component"]
+            key = by_versioned_id.get(component.get("versionedComponentId")) or by_name.get(component.get("name"))
+            if key:
+                matched[key] = component
+        
+        missing = set(specs) - set(matched)
+        if missing:
+            raise RuntimeError(f"Uploaded flow {group_name} is missing components: {sorted(missing)}")
+        return matched
+    
+    async def create_cdc_flow_async(self, mapping_name: str) -> Dict[str, Any]:
+        """Create complete CDC flow, issuing independent NiFi requests concurrently"""
+        client = self._get_async_client()
+        
+        # Parse configurations
+        mapping_config = self.config_parser.parse_mapping(mapping_name)
+        
+        # Shared services are looked up (or created) once, before anything else
+        with request_context(phase="services"):
+            service_ids = await asyncio.to_thread(self._ensure_shared_services, mapping_config)
+        
+        # Create process group for CDC
+        with request_context(phase="process_group"):
+            parent_pg_id = await asyncio.to_thread(self._get_cdc_parent_group_id)
+            cdc_group = (await client.create_process_group(
+                parent_pg_id, mapping_config.get("mapping.name", "CDC Flow")
+            ))["component"]
+        process_group_id = cdc_group["id"]
+        
+        # Create all processors at once, then all connections
+        specs = self._cdc_processor_specs(mapping_config, service_ids)
+        with request_context(phase="processors"):
+            created = await asyncio.gather(*[
+                client.create_processor(
+                    process_group_id, spec["type"], spec["name"], spec["properties"], spec["position"],
+                    config=spec.get("config")
+                )
+                for spec in specs.values()
+            ])
+            processors = {key: result["component"] for key, result in zip(specs, created)}
+            await asyncio.gather(*[
+                client.disable_processor(processors[key]["id"])
+                for key, spec in specs.items() if spec.get("state") == "DISABLED"
+            ])
+        
+        with request_context(phase="connections"):
+            await asyncio.gather(*[
+                client.create_connection(
+                    process_group_id, processors[source]["id"], processors[destination]["id"], relationships,
+                    options=options or None
+                )
+                for source, destination, relationships, options
+                in self._processor_connection_specs(processors, mapping_config)
+            ])
+        
+        with request_context(phase="start"):
+            await client.start_process_group(process_group_id)
+        
+        return dict({
             "process_group": cdc_group,
-            "processors": processors,
-            "source_dbcp": source_dbcp,
-            "target_dbcp": target_dbcp
+            "processors": processors
+        }, **self._dbcp_summary(mapping_config, service_ids))
+    
+    def _get_async_client(self) -> AsyncNiFiAPIClient:
+        """Return the async client, wrapping the synchronous one on first use"""
+        if self.async_client is None:
+            pool_size = int(self.env_config.get("connection_pool_size") or 10)
+            self.async_client = AsyncNiFiAPIClient.from_client(self.nifi_client, pool_size)
+        return self.async_client
+    
+    def validate_mapping(self, mapping_name: str) -> List[str]:
+        """Problems that would make deploying a mapping fail, found without calling NiFi"""
+        errors = self.config_parser.validate_mapping(mapping_name)
+        if errors:
+            return errors
+        
+        # Describing the flow applies every mapping and datasource setting
+        mapping_config = self.config_parser.parse_mapping(mapping_name)
+        try:
+            service_specs = self._shared_service_specs(mapping_config)
+            processor_specs = self._cdc_processor_specs(mapping_config, {key: key for key in service_specs})
+            self._processor_connection_specs(processor_specs, mapping_config)
+        except ValueError as e:
+            return [str(e)]
+        return []
+    
+    def validate_mappings(self, mapping_names: List[str]) -> Dict[str, List[str]]:
+        """Problems of each invalid mapping among the given ones"""
+        errors = {mapping_name: self.validate_mapping(mapping_name) for mapping_name in mapping_names}
+        return {mapping_name: problems for mapping_name, problems in errors.items() if problems}
+    
+    def create_cdc_flows(self, mapping_names: List[str], max_workers: Optional[int] = None,
+                         from_definition: bool = False, reconcile: bool = False,
+                         drop_queues: bool = False) -> Dict[str, Any]:
+        """Create CDC flows for several mappings concurrently with a bounded worker pool"""
+        if max_workers is None:
+            max_workers = int(self.env_config.get("max_concurrent_flows") or 5)
+        
+        results = {}
+        started = time.monotonic()
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(self._create_cdc_flow_timed, mapping_name, from_definition, reconcile,
+                                drop_queues): mapping_name
+                for mapping_name in mapping_names
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        return {
+            # Keep the caller's ordering rather than completion order
+            "results": [results[mapping_name] for mapping_name in mapping_names],
+            "succeeded": sum(1 for result in results.values() if result["success"]),
+            "failed": sum(1 for result in results.values() if not result["success"]),
+            "elapsed": time.monotonic() - started
         }
     
+    def _create_cdc_flow_timed(self, mapping_name: str, from_definition: bool = False,
+                               reconcile: bool = False, drop_queues: bool = False) -> Dict[str, Any]:
+        """Create one CDC flow, capturing its outcome and duration instead of raising"""
+        started = time.monotonic()
+        try:
+            with request_context(flow=mapping_name):
+                if reconcile:
+                    flow = self.reconcile_cdc_flow(mapping_name, drop_queues=drop_queues)
+                elif from_definition:
+                    flow = self.create_cdc_flow_from_definition(mapping_name)
+                else:
+                    flow = self.create_cdc_flow(mapping_name)
+            return {
+                "mapping": mapping_name,
+                "success": True,
+                "flow": flow,
+                "error": None,
+                "elapsed": time.monotonic() - started
+            }
+        except Exception as e:
+            return {
+                "mapping": mapping_name,
+                "success": False,
+                "flow": None,
+                "error": str(e),
+                "elapsed": time.monotonic() - started
+            }
+    
+    def start_all_cdc_flows(self) -> Dict[str, Any]:
+        """Enable the services and start the processors of every flow under the CDC parent group"""
+        parent_pg_id = self._get_cdc_parent_group_id()
+        self.nifi_client.enable_process_group_services(parent_pg_id)
+        self.nifi_client.wait_for_process_group_services_state(parent_pg_id, "ENABLED")
+        return self.nifi_client.start_process_group(parent_pg_id)
+    
+    def stop_all_cdc_flows(self) -> Dict[str, Any]:
+        """Stop the processors of every flow under the CDC parent group"""
+        return self.nifi_client.stop_process_group(self._get_cdc_parent_group_id())
+    
     def _create_cdc_process_group(self, name: str) -> Dict[str, Any]:
         """Create process group for CDC flow"""
-        root_pg_id = self.env_config["nifi_root_process_group_id"]
-        result = self.nifi_client.create_process_group(root_pg_id, name)
+        parent_pg_id = self._get_cdc_parent_group_id()
+        result = self.nifi_client.create_process_group(parent_pg_id, name)
         return result["component"]
     
-    def _create_dbcp_service(self, process_group_id: str, name: str, db_config: Dict[str, str]) -> Dict[str, Any]:
-        """Create Database Connection Pool controller service"""
+    def _get_cdc_parent_group_id(self) -> str:
+        """Find or create the group named NIFI_CDC_PROCESS_GROUP_NAME that holds all CDC flows"""
+        root_pg_id = self.env_config["nifi_root_process_group_id"]
+        parent_name = self.env_config.get("nifi_cdc_process_group_name")
+        if not parent_name:
+            return root_pg_id
+        
+        # Concurrent deployments must agree on a single parent group
+        with self._cdc_parent_group_lock:
+            if self._cdc_parent_group_id is None:
+                flow = self.nifi_client.get_process_group_flow(root_pg_id)
+                for group in flow["processGroupFlow"]["flow"].get("processGroups", []):
+                    if group["component"]["name"] == parent_name:
+                        self._cdc_parent_group_id = group["id"]
+                        break
+                else:
+                    result = self.nifi_client.create_process_group(root_pg_id, parent_name)
+                    self._cdc_parent_group_id = result["component"]["id"]
+            
+            return self._cdc_parent_group_id
+    
+    def _dbcp_service_properties(self, db_config: Dict[str, str]) -> Dict[str, str]:
+        """Build DBCPConnectionPool properties from a datasource configuration"""
         jdbc_url = self.config_parser.build_jdbc_url(db_config)
         
         properties = {
             "Database Connection URL": jdbc_url,
-            "Database Driver Class Name": db_config.get("oracle.driver.class", "oracle.jdbc.OracleDriver"),
+            "Database Driver Class Name": dialect_of(db_config).driver(db_config),
             "Database User": db_config.get("db.username"),
-            "Password": db_config.get("db.password"),
-            "Max Total Connections": db_config.get("db.pool.size", "10")
+            "Password": db_config.get("db.password")
         }
+        if db_config.get("db.driver.locations"):
+            properties["database-driver-locations"] = db_config["db.driver.locations"]
+        properties.update(self._dbcp_pool_properties(db_config))
+        return properties
+    
+    @staticmethod
+    def _dbcp_pool_properties(db_config: Dict[str, str]) -> Dict[str, str]:
+        """Connection pool sizing, validation and eviction properties of a datasource.
         
-        result = self.nifi_client.create_controller_service(
-            process_group_id,
-            "org.apache.nifi.dbcp.DBCPConnectionPool",
-            name,
-            properties
-        )
+        Unset keys fall back to the defaults of the db.type dialect; max idle defaults to the pool
+        size so connections returned after a burst are kept rather than closed.
+        """
+        pool_size = db_config.get("db.pool.size") or "10"
+        settings = dict(dialect_of(db_config).pool_defaults,
+                        **{"db.pool.size": pool_size, "db.pool.max.idle": pool_size})
+        settings.update({key: value for key, value in db_config.items() if key in DBCP_POOL_SETTINGS and value})
         
-        return result["component"]
+        for key in ("db.pool.size", "db.pool.max.idle", "db.pool.min.idle"):
+            if key in settings and not settings[key].isdigit():
+                raise ValueError(f"Invalid {key}: {settings[key]!r} (expected a number of connections)")
+        if int(settings["db.pool.max.idle"]) > int(settings["db.pool.size"]):
+            raise ValueError("db.pool.max.idle cannot exceed db.pool.size")
+        if int(settings.get("db.pool.min.idle", "0")) > int(settings["db.pool.max.idle"]):
+            raise ValueError("db.pool.min.idle cannot exceed db.pool.max.idle")
+        for key in DBCP_DURATION_SETTINGS:
+            value = settings.get(key)
+            if value is None:
+                continue
+            if value.isdigit():
+                settings[key] = value = f"{value} millis"
+            if not DBCP_DURATION_PATTERN.fullmatch(value):
+                raise ValueError(f"Invalid {key}: {value!r} (expected e.g. 30000, 30 secs, 8 hours)")
+        
+        return {DBCP_POOL_SETTINGS[key]: value for key, value in settings.items()}
     
     def _create_cdc_processors(self, process_group_id: str, mapping_config: Dict[str, str], 
-                              source_dbcp_id: str, target_dbcp_id: str) -> Dict[str, Any]:
+                              source_dbcp_id: str, target_dbcp_id: str,
+                              service_ids: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Create CDC processors"""
         processors = {}
+        service_ids = dict(service_ids or {}, source_dbcp=source_dbcp_id, target_dbcp=target_dbcp_id)
+        specs = self._cdc_processor_specs(mapping_config, service_ids)
         
-        # 1. ExecuteSQL processor for source data extraction
-        source_table = mapping_config.get("source.table")
-        cdc_column = mapping_config.get("cdc.column")
-        cdc_from = mapping_config.get("cdc.incremental.from")
-        cdc_to = mapping_config.get("cdc.incremental.to")
+        for key, spec in specs.items():
+            processors[key] = self.nifi_client.create_processor(
+                process_group_id,
+                spec["type"],
+                spec["name"],
+                spec["properties"],
+                spec["position"],
+                config=spec.get("config")
+            )["component"]
+            if spec.get("state") == "DISABLED":
+                self.nifi_client.disable_processor(processors[key]["id"])
         
-        sql_query = f"""
-        SELECT * FROM {source_table} 
-        WHERE {cdc_column} >= TO_TIMESTAMP('{cdc_from}', 'YYYY-MM-DD HH24:MI:SS')
-        AND {cdc_column} <= TO_TIMESTAMP('{cdc_to}', 'YYYY-MM-DD HH24:MI:SS')
+        return processors
+    
+    @staticmethod
+    def _pipeline_profile(mapping_config: Dict[str, str]) -> str:
+        """Pipeline profile of a mapping (cdc.pipeline), "sql" unless set"""
+        profile = mapping_config.get("cdc.pipeline") or "sql"
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unsupported cdc.pipeline: {profile} (expected one of {', '.join(PIPELINE_PROFILES)})")
+        return profile
+    
+    @staticmethod
+    def _load_mode(mapping_config: Dict[str, str]) -> str:
+        """Load mode of a mapping (cdc.load.mode), "insert" unless set"""
+        mode = mapping_config.get("cdc.load.mode") or "insert"
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported cdc.load.mode: {mode} (expected one of {', '.join(LOAD_MODES)})")
+        return mode
+    
+    @staticmethod
+    def _table_configs(mapping_config: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """Split a mapping into the configs of its tables, keyed by table id.
+        
+        A single-table mapping (no table.* keys) is returned as is under the id "".
         """
+        base, overrides = {}, {}
+        for key, value in mapping_config.items():
+            match = TABLE_KEY_PATTERN.fullmatch(key)
+            if match:
+                overrides.setdefault(match.group(1), {})[match.group(2)] = value
+            else:
+                base[key] = value
+        if not overrides:
+            return {"": mapping_config}
         
-        processors["extract"] = self.nifi_client.create_processor(
-            process_group_id,
-            "org.apache.nifi.processors.standard.ExecuteSQL",
-            "Extract CDC Data",
-            {
-                "Database Connection Pooling Service": source_dbcp_id,
-                "SQL select query": sql_query,
-                "Max Rows Per Flow File": mapping_config.get("cdc.batch.size", "1000")
-            },
-            {"x": 100, "y": 100}
-        )["component"]
+        tables = {}
+        for table_id, table_keys in overrides.items():
+            table_config = dict(base)
+            if any(key.startswith(COLUMN_KEY_PREFIX) for key in table_keys):
+                # A table listing its own columns does not inherit the mapping's
+                table_config = {key: value for key, value in base.items() if not key.startswith(COLUMN_KEY_PREFIX)}
+            for key, value in table_keys.items():
+                key = {"source": "source.table", "target": "target.table"}.get(key, key)
+                if key in MAPPING_LEVEL_KEYS:
+                    raise ValueError(f"{key} applies to the whole mapping and cannot be set for table {table_id}")
+                table_config[key] = value
+            if not table_config.get("source.table"):
+                raise ValueError(f"Table {table_id} has no table.{table_id}.source")
+            if "target" not in table_keys:
+                table_config["target.table"] = table_config["source.table"]
+            tables[table_id] = table_config
+        return tables
+    
+    def _cdc_processor_specs(self, mapping_config: Dict[str, str],
+                             service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the CDC processors (type, name, properties, position) keyed by stage.
+        
+        ``service_ids`` maps service keys (source_dbcp, target_dbcp, record_reader,
+        record_writer) to the ids processors reference them by. In a multi-table
+        mapping each table gets its own processors, keyed "<table id>/<stage>".
+        """
+        tables = self._table_configs(mapping_config)
+        if list(tables) == [""]:
+            return self._table_processor_specs(mapping_config, service_ids)
+        if mapping_config.get("cdc.window.slice"):
+            raise ValueError("cdc.window.slice is only supported for single-table mappings")
+        
+        specs = {}
+        for row, (table_id, table_config) in enumerate(tables.items()):
+            table_service_ids = {key: value for key, value in service_ids.items() if "/" not in key}
+            table_service_ids.update({
+                key.split("/", 1)[1]: value for key, value in service_ids.items() if key.startswith(f"{table_id}/")
+            })
+            for key, spec in self._table_processor_specs(table_config, table_service_ids).items():
+                spec["name"] = f"{spec['name']} - {table_id}"
+                spec["position"] = {"x": spec["position"]["x"],
+                                    "y": spec["position"]["y"] + row * TABLE_ROW_HEIGHT}
+                specs[f"{table_id}/{key}"] = spec
+        return specs
+    
+    def _table_processor_specs(self, mapping_config: Dict[str, str],
+                               service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the processors of one table's pipeline, keyed by stage"""
+        if self._pipeline_profile(mapping_config) == "record":
+            specs = self._record_processor_specs(mapping_config, service_ids)
+        else:
+            specs = self._sql_processor_specs(mapping_config, service_ids)
+        
+        for key, spec in specs.items():
+            tuning = self._stage_tuning(mapping_config, self._stage_name(key))
+            if tuning:
+                spec["config"] = dict(spec.get("config") or {}, **tuning)
+        return specs
+    
+    def _sql_processor_specs(self, mapping_config: Dict[str, str],
+                             service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the processors of the sql pipeline: ExecuteSQL -> ConvertRecord -> ConvertJSONToSQL -> PutSQL"""
+        specs = {}
+        
+        # 1. ExecuteSQL/QueryDatabaseTable processor for source data extraction
+        specs.update(self._extract_specs(mapping_config, service_ids))
         
         # 2. ConvertRecord processor (more generic, works with Avro)
-        processors["convert"] = self.nifi_client.create_processor(
-            process_group_id,
-            "org.apache.nifi.processors.standard.ConvertRecord",
-            "Convert to JSON",
-            {
-                "Record Reader": "AvroReader",
-                "Record Writer": "JsonRecordSetWriter"
+        specs["convert"] = {
+            "type": "org.apache.nifi.processors.standard.ConvertRecord",
+            "name": "Convert to JSON",
+            "properties": {
+                "record-reader": service_ids.get("record_reader"),
+                "record-writer": service_ids.get("record_writer")
             },
-            {"x": 400, "y": 100}
-        )["component"]
+            "position": {"x": 400, "y": 100}
+        }
         
         # 3. ConvertJSONToSQL processor
+        if self._load_mode(mapping_config) == "upsert":
+            raise ValueError("cdc.load.mode=upsert requires cdc.pipeline=record "
+                             "(ConvertJSONToSQL cannot generate upserts)")
         target_table = mapping_config.get("target.table")
-        processors["convert_sql"] = self.nifi_client.create_processor(
-            process_group_id,
-            "org.apache.nifi.processors.standard.ConvertJSONToSQL",
-            "Convert to SQL",
-            {
+        specs["convert_sql"] = {
+            "type": "org.apache.nifi.processors.standard.ConvertJSONToSQL",
+            "name": "Convert to SQL",
+            "properties": {
+                # Reads the target table's columns to map the JSON fields
+                "JDBC Connection Pool": service_ids.get("target_dbcp"),
                 "Statement Type": "INSERT",
                 "Table Name": target_table,
                 "Catalog Name": "",
                 "Schema Name": ""
             },
-            {"x": 700, "y": 100}
-        )["component"]
+            "position": {"x": 700, "y": 100}
+        }
         
         # 4. PutSQL processor for target data loading
-        processors["load"] = self.nifi_client.create_processor(
-            process_group_id,
-            "org.apache.nifi.processors.standard.PutSQL",
-            "Load to Target",
-            {
-                "JDBC Connection Pool": target_dbcp_id,
+        specs["load"] = {
+            "type": "org.apache.nifi.processors.standard.PutSQL",
+            "name": "Load to Target",
+            "properties": {
+                "JDBC Connection Pool": service_ids.get("target_dbcp"),
                 "Batch Size": mapping_config.get("cdc.batch.size", "1000")
             },
-            {"x": 1000, "y": 100}
-        )["component"]
+            "position": {"x": 1000, "y": 100}
+        }
         
         # 5. LogAttribute processor for errors
-        processors["log_error"] = self.nifi_client.create_processor(
-            process_group_id,
-            "org.apache.nifi.processors.standard.LogAttribute",
-            "Log Errors",
-            {
+        specs["log_error"] = self._log_error_spec({"x": 700, "y": 300})
+        
+        return specs
+    
+    def _record_processor_specs(self, mapping_config: Dict[str, str],
+                                service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the processors of the record pipeline: ExecuteSQLRecord -> PutDatabaseRecord"""
+        specs = {}
+        batch_size = mapping_config.get("cdc.batch.size", "1000")
+        
+        # 1. ExecuteSQLRecord/QueryDatabaseTableRecord writes each batch as a single Avro record set
+        specs.update(self._extract_specs(mapping_config, service_ids))
+        
+        # 2. PutDatabaseRecord loads the whole record set in JDBC batches
+        target_config = self.config_parser.parse_datasource(mapping_config.get("target.datasource"))
+        schema_name, table_name = self._split_table_name(mapping_config.get("target.table"))
+        database_type = dialect_of(target_config).nifi_database_type
+        load_properties = {
+            "put-db-record-record-reader": service_ids.get("record_reader"),
+            "db-type": database_type,
+            "put-db-record-statement-type": "INSERT",
+            "put-db-record-dcbp-service": service_ids.get("target_dbcp"),
+            "put-db-record-schema-name": schema_name,
+            "put-db-record-table-name": table_name,
+            "put-db-record-max-batch-size": batch_size
+        }
+        if self._load_mode(mapping_config) == "upsert":
+            if database_type == "Generic":
+                raise ValueError(f"cdc.load.mode=upsert is not supported for db.type "
+                                 f"{target_config.get('db.type')!r} of the target datasource")
+            # Rows changed at the source update the target row instead of failing on its key;
+            # without key columns NiFi uses the table's primary key
+            load_properties["put-db-record-statement-type"] = "UPSERT"
+            key_columns = mapping_config.get("cdc.load.key.columns")
+            if key_columns:
+                load_properties["put-db-record-update-keys"] = ",".join(
+                    column.strip() for column in key_columns.split(",") if column.strip()
+                )
+        specs["load"] = {
+            "type": "org.apache.nifi.processors.standard.PutDatabaseRecord",
+            "name": "Load to Target",
+            "properties": load_properties,
+            "position": {"x": 400, "y": 100},
+            "config": {"autoTerminatedRelationships": ["success"]}
+        }
+        
+        # 3. LogAttribute processor for errors
+        specs["log_error"] = self._log_error_spec({"x": 250, "y": 300})
+        
+        return specs
+    
+    def _extract_specs(self, mapping_config: Dict[str, str], service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe the extract stage for the mapping's CDC mode, partitioning and pipeline profile"""
+        record = self._pipeline_profile(mapping_config) == "record"
+        batch_size = mapping_config.get("cdc.batch.size", "1000")
+        
+        if mapping_config.get("cdc.partition.column") or mapping_config.get("cdc.partition.size"):
+            if mapping_config.get("cdc.window.slice"):
+                raise ValueError("cdc.window.slice cannot be combined with cdc.partition.column/cdc.partition.size")
+            return self._partitioned_extract_specs(mapping_config, service_ids)
+        
+        if self._cdc_mode(mapping_config) == "window":
+            lane_count = self._backfill_lane_count(mapping_config)
+            if lane_count:
+                return self._backfill_lane_specs(mapping_config, service_ids, lane_count)
+            if record:
+                return {"extract": {
+                    "type": "org.apache.nifi.processors.standard.ExecuteSQLRecord",
+                    "name": "Extract CDC Data",
+                    "properties": {
+                        "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+                        "SQL select query": self.extract_query(mapping_config),
+                        "esqlrecord-record-writer": service_ids.get("record_writer"),
+                        "esql-max-rows": batch_size
+                    },
+                    "position": {"x": 100, "y": 100}
+                }}
+            return {"extract": {
+                "type": "org.apache.nifi.processors.standard.ExecuteSQL",
+                "name": "Extract CDC Data",
+                "properties": {
+                    "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+                    "SQL select query": self.extract_query(mapping_config),
+                    "Max Rows Per Flow File": batch_size
+                },
+                "position": {"x": 100, "y": 100}
+            }}
+        
+        # Incremental: NiFi keeps the largest cdc.column value seen in processor state,
+        # so each poll only selects newer rows
+        cdc_column = mapping_config.get("cdc.column")
+        source_config = self.config_parser.parse_datasource(mapping_config.get("source.datasource"))
+        properties = {
+            "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+            "db-fetch-db-type": dialect_of(source_config).nifi_database_type,
+            "Table Name": mapping_config.get("source.table"),
+            "Maximum-value Columns": cdc_column,
+            "qdbt-max-rows": batch_size
+        }
+        projection = self._projected_columns(mapping_config)
+        if projection:
+            properties["Columns to Return"] = projection
+        if mapping_config.get("cdc.incremental.from"):
+            properties[f"initial.maxvalue.{cdc_column}"] = mapping_config.get("cdc.incremental.from")
+        if record:
+            properties["qdbtr-record-writer"] = service_ids.get("record_writer")
+        
+        return {"extract": {
+            "type": ("org.apache.nifi.processors.standard.QueryDatabaseTableRecord" if record
+                     else "org.apache.nifi.processors.standard.QueryDatabaseTable"),
+            "name": "Extract CDC Data",
+            "properties": properties,
+            "position": {"x": 100, "y": 100},
+            "config": self._polling_config(mapping_config)
+        }}
+    
+    def _partitioned_extract_specs(self, mapping_config: Dict[str, str],
+                                   service_ids: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Describe GenerateTableFetch -> ExecuteSQL(Record), which runs one query per table partition"""
+        record = self._pipeline_profile(mapping_config) == "record"
+        batch_size = mapping_config.get("cdc.batch.size", "1000")
+        cdc_column = mapping_config.get("cdc.column")
+        source_config = self.config_parser.parse_datasource(mapping_config.get("source.datasource"))
+        
+        # GenerateTableFetch pages the table into queries of cdc.partition.size rows. With a
+        # partition column it pages by value ranges of that column instead of row offsets.
+        properties = {
+            "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+            "db-fetch-db-type": dialect_of(source_config).nifi_database_type,
+            "Table Name": mapping_config.get("source.table"),
+            "gen-table-fetch-partition-size": mapping_config.get("cdc.partition.size", "10000")
+        }
+        projection = self._projected_columns(mapping_config)
+        if projection:
+            properties["Columns to Return"] = projection
+        if mapping_config.get("cdc.partition.column"):
+            properties["gen-table-column-for-val-partitioning"] = mapping_config.get("cdc.partition.column")
+        
+        # The max value kept in state makes each run fetch only rows newer than the previous
+        # one; without it every run would generate the queries of every partition again
+        properties["Maximum-value Columns"] = cdc_column
+        if self._cdc_mode(mapping_config) == "window":
+            properties["db-fetch-where-clause"] = self._window_condition(mapping_config)
+            # Partition queries must be generated once, not by every node
+            generate_config = {"executionNode": "PRIMARY"}
+        else:
+            if mapping_config.get("cdc.incremental.from"):
+                properties[f"initial.maxvalue.{cdc_column}"] = mapping_config.get("cdc.incremental.from")
+            generate_config = self._polling_config(mapping_config)
+        
+        # The generated queries arrive as FlowFile content, so the extract has no query of its own
+        if record:
+            extract = {
+                "type": "org.apache.nifi.processors.standard.ExecuteSQLRecord",
+                "properties": {
+                    "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+                    "esqlrecord-record-writer": service_ids.get("record_writer"),
+                    "esql-max-rows": batch_size
+                }
+            }
+        else:
+            extract = {
+                "type": "org.apache.nifi.processors.standard.ExecuteSQL",
+                "properties": {
+                    "Database Connection Pooling Service": service_ids.get("source_dbcp"),
+                    "Max Rows Per Flow File": batch_size
+                }
+            }
+        extract.update({
+            "name": "Extract CDC Data",
+            "position": {"x": 100, "y": 100},
+            "config": {"concurrentlySchedulableTaskCount": PARTITIONED_EXTRACT_CONCURRENCY}
+        })
+        
+        return {
+            "generate": {
+                "type": "org.apache.nifi.processors.standard.GenerateTableFetch",
+                "name": "Generate Partition Queries",
+                "properties": properties,
+                "position": {"x": 100, "y": -100},
+                "config": generate_config
+            },
+            "extract": extract
+        }
+    
+    def _backfill_lane_specs(self, mapping_config: Dict[str, str], service_ids: Dict[str, str],
+                             lane_count: int) -> Dict[str, Dict[str, Any]]:
+        """Describe the extract lanes a backfill runs its window slices through.
+        
+        Lanes are created disabled, so starting the flow leaves them alone; the
+        BackfillScheduler sets each lane's query to a slice and runs it once.
+        """
+        window_specs = self._extract_specs(dict(mapping_config, **{"cdc.window.slice": ""}), service_ids)
+        lanes = {}
+        for lane in range(1, lane_count + 1):
+            spec = dict(window_specs["extract"])
+            spec["position"] = {"x": 100, "y": 100 + (lane - 1) * 120}
+            spec["state"] = "DISABLED"
+            if lane == 1:
+                lanes["extract"] = spec
+            else:
+                spec["name"] = f"{spec['name']} {lane}"
+                lanes[f"extract_{lane}"] = spec
+        return lanes
+    
+    def backfill_lane_names(self, mapping_config: Dict[str, str]) -> List[str]:
+        """Names of the extract lanes a backfill of the mapping runs its slices through"""
+        if not self._backfill_lane_count(mapping_config):
+            raise ValueError("Mapping has no cdc.window.slice; nothing to backfill")
+        if "" not in self._table_configs(mapping_config):
+            raise ValueError("Backfill supports single-table mappings only")
+        specs = self._cdc_processor_specs(mapping_config, {})
+        return [spec["name"] for key, spec in specs.items() if key == "extract" or key.startswith("extract_")]
+    
+    @staticmethod
+    def _backfill_lane_count(mapping_config: Dict[str, str]) -> int:
+        """Number of extract lanes of a window mapping backfilled in slices (cdc.window.slice).
+        
+        Only upsert loads run several slices at once: an error of the shared load stage
+        fails every slice in flight, and re-running a slice must not load its rows twice.
+        """
+        if not mapping_config.get("cdc.window.slice"):
+            return 0
+        parse_slice_duration(mapping_config.get("cdc.window.slice"))
+        upsert = CDCFlowBuilder._load_mode(mapping_config) == "upsert"
+        concurrency = mapping_config.get("cdc.window.concurrency")
+        if not concurrency:
+            return 2 if upsert else 1
+        lane_count = max(1, int(concurrency))
+        if lane_count > 1 and not upsert:
+            raise ValueError("cdc.window.concurrency > 1 requires cdc.load.mode=upsert "
+                             "(a re-run slice would insert its rows twice)")
+        return lane_count
+    
+    @staticmethod
+    def _stage_name(key: str) -> str:
+        """Mapping key prefix of a processor spec key (backfill lanes share the extract stage)"""
+        key = key.rpartition("/")[2]
+        if key.startswith("extract_"):
+            return "extract"
+        return key.replace("_", ".")
+    
+    @staticmethod
+    def _stage_tuning(mapping_config: Dict[str, str], stage: str) -> Dict[str, Any]:
+        """Processor config overrides of a stage from its cdc.<stage>.<setting> mapping keys"""
+        config = {}
+        for setting, field in STAGE_TUNING_SETTINGS.items():
+            key = f"cdc.{stage}.{setting}"
+            value = (mapping_config.get(key) or "").strip()
+            if not value:
+                continue
+            if field in ("concurrentlySchedulableTaskCount", "runDurationMillis"):
+                if not value.isdigit() or (field == "concurrentlySchedulableTaskCount" and int(value) == 0):
+                    raise ValueError(f"Invalid {key}: {value!r}")
+                value = int(value)
+            elif field == "schedulingStrategy" and value.upper() not in SCHEDULING_STRATEGIES:
+                raise ValueError(f"Invalid {key}: {value!r} (expected one of {', '.join(SCHEDULING_STRATEGIES)})")
+            elif field == "executionNode" and value.upper() not in EXECUTION_NODES:
+                raise ValueError(f"Invalid {key}: {value!r} (expected one of {', '.join(EXECUTION_NODES)})")
+            if field in ("schedulingStrategy", "executionNode"):
+                value = value.upper()
+            config[field] = value
+        return config
+    
+    @staticmethod
+    def _polling_config(mapping_config: Dict[str, str]) -> Dict[str, Any]:
+        """Scheduling of a stateful source processor polling every cdc.polling.interval ms"""
+        return {
+            "schedulingPeriod": f"{mapping_config.get('cdc.polling.interval') or '5000'} ms",
+            # The high-water mark is cluster state; polling from every node would duplicate rows
+            "executionNode": "PRIMARY"
+        }
+    
+    @staticmethod
+    def _cdc_mode(mapping_config: Dict[str, str]) -> str:
+        """CDC mode of a mapping (cdc.mode), "window" unless set"""
+        mode = mapping_config.get("cdc.mode") or "window"
+        if mode not in CDC_MODES:
+            raise ValueError(f"Unsupported cdc.mode: {mode} (expected one of {', '.join(CDC_MODES)})")
+        return mode
+    
+    @staticmethod
+    def _log_error_spec(position: Dict[str, float]) -> Dict[str, Any]:
+        """Describe the LogAttribute processor that records failed FlowFiles"""
+        return {
+            "type": "org.apache.nifi.processors.standard.LogAttribute",
+            "name": "Log Errors",
+            "properties": {
                 "Log Level": "error",
                 "Attributes to Log": ".*"
             },
-            {"x": 700, "y": 300}
-        )["component"]
+            "position": position,
+            "config": {"autoTerminatedRelationships": ["success"]}
+        }
+    
+    @staticmethod
+    def _projected_columns(mapping_config: Dict[str, str]) -> str:
+        """SELECT list of the mapping's column.* keys, or "" to extract every column"""
+        columns = parse_column_mappings(mapping_config)
+        if not columns:
+            return ""
+        cdc_column = (mapping_config.get("cdc.column") or "").upper()
+        if mapping_config.get("cdc.mode") == "incremental" and \
+                not any(source.upper() == target.upper() == cdc_column and not sql_type
+                        for source, target, sql_type in columns):
+            # QueryDatabaseTable reads the high-water mark from the result set
+            raise ValueError(f"Incremental CDC must extract cdc.column {cdc_column} unchanged "
+                             f"(add column.{cdc_column}=)")
+        return select_list(columns)
+    
+    def extract_query(self, mapping_config: Dict[str, str], upper_inclusive: bool = True) -> str:
+        """SELECT statement for the configured CDC window of the source table"""
+        source_table = mapping_config.get("source.table")
+        columns = CDCFlowBuilder._projected_columns(mapping_config) or "*"
         
-        return processors
+        return f"""
+        SELECT {columns} FROM {source_table} 
+        WHERE {self._window_condition(mapping_config, upper_inclusive)}
+        """
     
-    def _create_processor_connections(self, process_group_id: str, processors: Dict[str, Any]):
+    def _window_condition(self, mapping_config: Dict[str, str], upper_inclusive: bool = True) -> str:
+        """WHERE condition selecting the rows of the configured CDC window.
+        
+        Timestamps are written in the source database's SQL. Backfill slices
+        exclude their upper bound so adjacent slices do not overlap.
+        """
+        dialect = dialect_of(self.config_parser.parse_datasource(mapping_config.get("source.datasource")))
+        cdc_column = mapping_config.get("cdc.column")
+        cdc_from = dialect.timestamp_literal(mapping_config.get("cdc.incremental.from"))
+        cdc_to = dialect.timestamp_literal(mapping_config.get("cdc.incremental.to"))
+        upper = "<=" if upper_inclusive else "<"
+        
+        return (f"{cdc_column} >= {cdc_from}\n"
+                f"        AND {cdc_column} {upper} {cdc_to}")
+    
+    @staticmethod
+    def _split_table_name(qualified_name: Optional[str]) -> Tuple[str, str]:
+        """Split SCHEMA.TABLE into its schema and table parts"""
+        schema_name, _, table_name = (qualified_name or "").rpartition(".")
+        return schema_name, table_name
+    
+    def _create_processor_connections(self, process_group_id: str, processors: Dict[str, Any],
+                                      mapping_config: Optional[Dict[str, str]] = None):
         """Create connections between processors"""
-        # Extract -> Convert
-        self.nifi_client.create_connection(
-            process_group_id,
-            processors["extract"]["id"],
-            processors["convert"]["id"],
-            ["success"]
-        )
+        for source, destination, relationships, options in self._processor_connection_specs(processors,
+                                                                                            mapping_config):
+            self.nifi_client.create_connection(
+                process_group_id,
+                processors[source]["id"],
+                processors[destination]["id"],
+                relationships,
+                options=options or None
+            )
+    
+    def _processor_connection_specs(self, processors: Dict[str, Any],
+                                    mapping_config: Optional[Dict[str, str]] = None
+                                    ) -> List[Tuple[str, str, List[str], Dict[str, Any]]]:
+        """Describe connections as (source stage, destination stage, relationships, connection settings).
         
-        # Convert -> ConvertSQL
-        self.nifi_client.create_connection(
-            process_group_id,
-            processors["convert"]["id"],
-            processors["convert_sql"]["id"],
-            ["success"]
-        )
+        Settings come from cdc.connection.<setting> for every connection, overridden by
+        cdc.<stage>.connection.<setting> for the connections leaving that stage. The
+        processors of each table of a multi-table mapping are wired among themselves.
+        """
+        table_ids = list(dict.fromkeys(key.split("/", 1)[0] for key in processors if "/" in key))
+        if not table_ids:
+            return self._table_connection_specs(processors, mapping_config)
         
-        # ConvertSQL -> Load
-        self.nifi_client.create_connection(
-            process_group_id,
-            processors["convert_sql"]["id"],
-            processors["load"]["id"],
-            ["success"]
-        )
+        table_configs = self._table_configs(mapping_config) if mapping_config else {}
+        specs = []
+        for table_id in table_ids:
+            prefix = f"{table_id}/"
+            table_processors = {key[len(prefix):]: processor for key, processor in processors.items()
+                                if key.startswith(prefix)}
+            specs.extend(
+                (prefix + source, prefix + destination, relationships, options)
+                for source, destination, relationships, options
+                in self._table_connection_specs(table_processors, table_configs.get(table_id))
+            )
+        return specs
+    
+    def _table_connection_specs(self, processors: Dict[str, Any],
+                                mapping_config: Optional[Dict[str, str]] = None
+                                ) -> List[Tuple[str, str, List[str], Dict[str, Any]]]:
+        """Describe the connections of one table's pipeline"""
+        stages = [key for key in ("generate", "extract", "convert", "convert_sql", "load") if key in processors]
+        
+        # (Generate ->) Extract -> (Convert -> ConvertSQL ->) Load
+        specs = [(source, destination, ["success"], {}) for source, destination in zip(stages, stages[1:])]
+        
+        # Backfill lanes feed the same stage as the main extract
+        lanes = [key for key in processors if key.startswith("extract_")]
+        if lanes:
+            next_stage = stages[stages.index("extract") + 1]
+            specs.extend((lane, next_stage, ["success"], {}) for lane in lanes)
+        
+        # Spread the generated partition queries over all cluster nodes
+        if "generate" in processors:
+            specs[0] = ("generate", "extract", ["success"], {"loadBalanceStrategy": "ROUND_ROBIN"})
         
         # Error connections
-        for processor_name in ["extract", "convert", "convert_sql", "load"]:
-            if processor_name in processors:
-                self.nifi_client.create_connection(
-                    process_group_id,
-                    processors[processor_name]["id"],
-                    processors["log_error"]["id"],
-                    ["failure"]
-                )
\ No newline at end of file
+        for processor_name in stages + lanes:
+            if processors[processor_name].get("type") not in PROCESSORS_WITHOUT_FAILURE:
+                specs.append((processor_name, "log_error", ["failure"], {}))
+        
+        # PutDatabaseRecord routes transient database errors to retry; loop them back
+        if processors.get("load", {}).get("type") == "org.apache.nifi.processors.standard.PutDatabaseRecord":
+            specs.append(("load", "load", ["retry"], {}))
+        
+        if mapping_config:
+            flow_settings = self._connection_tuning(mapping_config, "cdc.connection")
+            tuned = []
+            for source, destination, relationships, options in specs:
+                settings = dict(options, **flow_settings)
+                settings.update(self._connection_tuning(mapping_config, f"cdc.{self._stage_name(source)}.connection"))
+                if settings.get("loadBalanceStrategy") == "PARTITION_BY_ATTRIBUTE" and \
+                        not settings.get("loadBalancePartitionAttribute"):
+                    raise ValueError(f"PARTITION_BY_ATTRIBUTE on connections from {source} "
+                                     f"requires a load.balance.attribute")
+                tuned.append((source, destination, relationships, settings))
+            specs = tuned
+        
+        return specs
+    
+    @staticmethod
+    def _connection_tuning(mapping_config: Dict[str, str], prefix: str) -> Dict[str, Any]:
+        """Connection setting overrides from the <prefix>.<setting> mapping keys"""
+        settings = {}
+        for setting, field in CONNECTION_TUNING_SETTINGS.items():
+            key = f"{prefix}.{setting}"
+            value = (mapping_config.get(key) or "").strip()
+            if not value:
+                continue
+            if field == "backPressureObjectThreshold":
+                if not value.isdigit():
+                    raise ValueError(f"Invalid {key}: {value!r}")
+                value = int(value)
+            elif field in ("loadBalanceStrategy", "loadBalanceCompression"):
+                value = value.upper().replace("-", "_")
+                allowed = LOAD_BALANCE_STRATEGIES if field == "loadBalanceStrategy" else LOAD_BALANCE_COMPRESSIONS
+                if value not in allowed:
+                    raise ValueError(f"Invalid {key}: {value!r} (expected one of {', '.join(allowed)})")
+            elif field == "prioritizers":
+                # Bare names refer to the prioritizers bundled with NiFi
+                value = [name if "." in name else f"org.apache.nifi.prioritizer.{name}"
+                         for name in (part.strip() for part in value.split(",")) if name]
+            settings[field] = value
+        return settings
@@ -0,0 +1,75 @@
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Mapping keys listing the columns to extract, in file order:
+#   column.<SOURCE_COLUMN>=<TARGET_COLUMN>[:<SQL TYPE>]
+# An empty target keeps the source name; a SQL type casts the column.
+COLUMN_KEY_PREFIX = "column."
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_$#]*")
+SQL_TYPE_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_ ]*(\(\s*\d+\s*(,\s*-?\d+\s*)?\))?")
+
+# Avro type ExecuteSQL/QueryDatabaseTable write for a SQL type (without Avro logical types,
+# NiFi's default, decimals and temporal values are written as strings)
+AVRO_TYPES = [
+    (re.compile(r"(SMALLINT|TINYINT|INTEGER|INT)\b"), "int"),
+    (re.compile(r"BIGINT\b"), "long"),
+    (re.compile(r"(BINARY_FLOAT|REAL)\b"), "float"),
+    (re.compile(r"(BINARY_DOUBLE|DOUBLE)\b"), "double"),
+    (re.compile(r"(BOOLEAN|BIT)\b"), "boolean"),
+    (re.compile(r"(BLOB|RAW|LONG RAW|BINARY|VARBINARY|BYTEA)\b"), "bytes"),
+]
+
+ColumnMapping = Tuple[str, str, Optional[str]]
+
+
+def parse_column_mappings(mapping_config: Dict[str, str]) -> List[ColumnMapping]:
+    """(source column, target column, SQL type or None) for each column.* key of a mapping"""
+    columns = []
+    for key, value in mapping_config.items():
+        if not key.startswith(COLUMN_KEY_PREFIX):
+            continue
+        source = key[len(COLUMN_KEY_PREFIX):].strip()
+        target, _, sql_type = (value or "").partition(":")
+        target = target.strip() or source
+        sql_type = " ".join(sql_type.split()) or None
+        if not IDENTIFIER_PATTERN.fullmatch(source) or not IDENTIFIER_PATTERN.fullmatch(target):
+            raise ValueError(f"Invalid column mapping {key}={value} (expected column.SOURCE=TARGET[:TYPE])")
+        if sql_type and not SQL_TYPE_PATTERN.fullmatch(sql_type):
+            raise ValueError(f"Invalid column type in {key}={value}: {sql_type!r}")
+        columns.append((source, target, sql_type))
+    return columns
+
+
+def select_list(columns: List[ColumnMapping]) -> str:
+    """SELECT list projecting, casting and renaming the mapped columns ("*" without a column mapping)"""
+    if not columns:
+        return "*"
+    expressions = []
+    for source, target, sql_type in columns:
+        expression = f"CAST({source} AS {sql_type})" if sql_type else source
+        expressions.append(expression if expression == target else f"{expression} AS {target}")
+    return ", ".join(expressions)
+
+
+def avro_type(sql_type: str) -> str:
+    """Avro type of the values NiFi extracts from a column of the given SQL type"""
+    for pattern, avro in AVRO_TYPES:
+        if pattern.match(sql_type.upper()):
+            return avro
+    return "string"
+
+
+def avro_schema(record_name: str, columns: List[ColumnMapping]) -> str:
+    """Avro schema text of the records extracted with a typed column mapping"""
+    untyped = [source for source, _, sql_type in columns if not sql_type]
+    if untyped:
+        raise ValueError(f"Columns need a type to derive the record schema: {', '.join(untyped)}")
+    schema: Dict[str, Any] = {
+        "type": "record",
+        "name": re.sub(r"\W", "_", record_name),
+        "fields": [{"name": target, "type": ["null", avro_type(sql_type)]}
+                   for _, target, sql_type in columns]
+    }
+    return json.dumps(schema, separators=(",", ":"))
@@ -1,18 +1,60 @@
 import configparser
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import os
 from dotenv import load_dotenv
 
+from jdbc_dialects import dialect_of
+
+
+# Keys whose values must be whole numbers
+DATASOURCE_INTEGER_KEYS = ("db.port", "db.pool.size", "db.pool.max.idle", "db.pool.min.idle")
+MAPPING_INTEGER_KEYS = ("cdc.batch.size", "cdc.polling.interval", "cdc.partition.size",
+                        "cdc.window.concurrency", "cdc.record.schema.cache.size")
+
+# Keys holding a 'YYYY-MM-DD HH:MM:SS' timestamp
+MAPPING_TIMESTAMP_KEYS = ("cdc.incremental.from", "cdc.incremental.to")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+REQUIRED_MAPPING_KEYS = ("source.datasource", "target.datasource")
+
 
 class ConfigParser:
     def __init__(self, base_path: str = "."):
         self.base_path = Path(base_path)
         load_dotenv(self.base_path / ".env")
+        self._datasources_dir = str(self.base_path / "datasources")
+        self._mappings_dir = str(self.base_path / "mappings")
+        # Parsed properties per file, with the mtime and size they were read at
+        self._properties_cache: Dict[str, Tuple[int, int, Dict[str, str]]] = {}
+        self._cache_lock = threading.Lock()
         
     def parse_datasource(self, datasource_name: str) -> Dict[str, Any]:
         """Parse datasource properties file"""
-        filepath = self.base_path / "datasources" / f"{datasource_name}.properties"
+        return self._parse_properties(os.path.join(self._datasources_dir, f"{datasource_name}.properties"))
+    
+    def parse_mapping(self, mapping_name: str) -> Dict[str, Any]:
+        """Parse mapping properties file"""
+        return self._parse_properties(os.path.join(self._mappings_dir, f"{mapping_name}.properties"))
+    
+    def _parse_properties(self, filepath: str) -> Dict[str, str]:
+        """Parse a properties file, re-reading it only when it changed since the last call.
+        
+        Callers get their own copy and may modify it.
+        """
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            # Let open() report the missing file
+            stat = None
+        
+        if stat is not None:
+            with self._cache_lock:
+                cached = self._properties_cache.get(filepath)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return dict(cached[2])
         
         # Read as simple properties file (not INI format)
         properties = {}
@@ -23,21 +65,70 @@ class ConfigParser:
                     key, value = line.split('=', 1)
                     properties[key.strip()] = value.strip()
         
-        return properties
+        if stat is not None:
+            with self._cache_lock:
+                self._properties_cache[filepath] = (stat.st_mtime_ns, stat.st_size, properties)
+        return dict(properties)
     
-    def parse_mapping(self, mapping_name: str) -> Dict[str, Any]:
-        """Parse mapping properties file"""
-        filepath = self.base_path / "mappings" / f"{mapping_name}.properties"
+    def preload(self) -> int:
+        """Parse every mapping and datasource file into the cache, returning the number of files"""
+        paths = list((self.base_path / "mappings").glob("*.properties"))
+        paths += list((self.base_path / "datasources").glob("*.properties"))
+        for path in paths:
+            self._parse_properties(str(path))
+        return len(paths)
+    
+    def validate_mapping(self, mapping_name: str) -> List[str]:
+        """Problems in a mapping file and the datasources it references (empty when valid)"""
+        try:
+            mapping_config = self.parse_mapping(mapping_name)
+        except FileNotFoundError:
+            return [f"mapping file not found: mappings/{mapping_name}.properties"]
         
-        properties = {}
-        with open(filepath, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    properties[key.strip()] = value.strip()
+        errors = [f"{key} is required" for key in REQUIRED_MAPPING_KEYS if not mapping_config.get(key)]
+        if not mapping_config.get("source.table") and not any(key.startswith("table.") for key in mapping_config):
+            errors.append("source.table (or table.<id>.source) is required")
+        errors += self._type_errors(mapping_config, MAPPING_INTEGER_KEYS, MAPPING_TIMESTAMP_KEYS)
+        
+        timestamps = [mapping_config.get(key) for key in MAPPING_TIMESTAMP_KEYS]
+        if all(timestamps) and not errors and timestamps[0] > timestamps[1]:
+            errors.append("cdc.incremental.from is after cdc.incremental.to")
         
-        return properties
+        for key in REQUIRED_MAPPING_KEYS:
+            datasource_name = mapping_config.get(key)
+            if not datasource_name:
+                continue
+            try:
+                db_properties = self.parse_datasource(datasource_name)
+            except FileNotFoundError:
+                errors.append(f"{key}: datasource file not found: datasources/{datasource_name}.properties")
+                continue
+            errors += [f"{key} {datasource_name}: {error}"
+                       for error in self._type_errors(db_properties, DATASOURCE_INTEGER_KEYS, ())]
+        return errors
+    
+    @staticmethod
+    def _type_errors(properties: Dict[str, str], integer_keys, timestamp_keys) -> List[str]:
+        """Values of integer and timestamp keys that do not parse"""
+        errors = []
+        for key in integer_keys:
+            value = properties.get(key)
+            if value and not value.isdigit():
+                errors.append(f"{key} must be a whole number, got {value!r}")
+        for key in timestamp_keys:
+            value = properties.get(key)
+            if not value:
+                continue
+            try:
+                datetime.strptime(value, TIMESTAMP_FORMAT)
+            except ValueError:
+                errors.append(f"{key} must be a 'YYYY-MM-DD HH:MM:SS' timestamp, got {value!r}")
+        return errors
+    
+    def list_mappings(self, pattern: str = "*") -> List[str]:
+        """List mapping names in the mappings directory matching a glob pattern"""
+        mappings_dir = self.base_path / "mappings"
+        return sorted(path.stem for path in mappings_dir.glob(f"{pattern}.properties"))
     
     def get_env_config(self) -> Dict[str, str]:
         """Get environment configuration"""
@@ -45,19 +136,21 @@ class ConfigParser:
             "nifi_api_base_url": os.getenv("NIFI_API_BASE_URL"),
             "nifi_api_username": os.getenv("NIFI_API_USERNAME", ""),
             "nifi_api_password": os.getenv("NIFI_API_PASSWORD", ""),
+            "nifi_api_client_cert_path": os.getenv("NIFI_API_CLIENT_CERT_PATH", ""),
+            "nifi_api_client_key_path": os.getenv("NIFI_API_CLIENT_KEY_PATH", ""),
+            "nifi_api_ca_cert_path": os.getenv("NIFI_API_CA_CERT_PATH", ""),
             "nifi_root_process_group_id": os.getenv("NIFI_ROOT_PROCESS_GROUP_ID", "root"),
-            "nifi_cdc_process_group_name": os.getenv("NIFI_CDC_PROCESS_GROUP_NAME", "CDC-Flows")
+            "nifi_cdc_process_group_name": os.getenv("NIFI_CDC_PROCESS_GROUP_NAME", "CDC-Flows"),
+            "max_concurrent_flows": os.getenv("MAX_CONCURRENT_FLOWS", "5"),
+            "connection_pool_size": os.getenv("CONNECTION_POOL_SIZE", "10"),
+            "nifi_api_timeout": os.getenv("NIFI_API_TIMEOUT", "30000"),
+            "api_retry_count": os.getenv("API_RETRY_COUNT", "3"),
+            "api_retry_delay": os.getenv("API_RETRY_DELAY", "1000"),
+            "api_rate_limit": os.getenv("API_RATE_LIMIT", ""),
+            "monitoring_interval": os.getenv("MONITORING_INTERVAL", "60000"),
+            "metrics_port": os.getenv("METRICS_PORT", "9405")
         }
     
     def build_jdbc_url(self, db_properties: Dict[str, str]) -> str:
         """Build JDBC URL from database properties"""
-        db_type = db_properties.get("db.type", "oracle")
-        
-        if db_type == "oracle":
-            host = db_properties.get("db.host")
-            port = db_properties.get("db.port")
-            service_name = db_properties.get("db.service.name")
-            return f"jdbc:oracle:thin:@{host}:{port}:{service_name}"
-        
-        # Add other database types as needed
-        return ""
\ No newline at end of file
+        return dialect_of(db_properties).jdbc_url(db_properties)
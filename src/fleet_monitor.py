@@ -0,0 +1,239 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# NiFi status counters (flowFilesIn/Out, bytesRead/Written) cover the last five minutes
+STATUS_WINDOW_SECONDS = 300.0
+
+# Pipeline stage (processor spec key) of each processor type the flow builder deploys
+PROCESSOR_STAGES = {
+    "GenerateTableFetch": "generate",
+    "ExecuteSQL": "extract",
+    "ExecuteSQLRecord": "extract",
+    "QueryDatabaseTable": "extract",
+    "QueryDatabaseTableRecord": "extract",
+    "ConvertRecord": "convert",
+    "ConvertJSONToSQL": "convert_sql",
+    "PutDatabaseRecord": "load",
+    "PutSQL": "load",
+    "LogAttribute": "log_error",
+}
+# Processors keeping the max value of cdc.column in their state, keyed <table>@!@<column>
+MAX_VALUE_PROCESSOR_TYPES = {"QueryDatabaseTable", "QueryDatabaseTableRecord"}
+MAX_VALUE_STATE_SEPARATOR = "@!@"
+# Timestamp max values are stored as java.sql.Timestamp strings, e.g. 2025-07-07 15:00:00.0
+MAX_VALUE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Bulletins kept per flow in the snapshot
+MAX_BULLETINS_PER_FLOW = 10
+
+
+def _parse_max_value_time(value: str) -> datetime:
+    """Parse a timestamp max value with optional fractional seconds (up to nanoseconds)"""
+    seconds, _, fraction = value.partition(".")
+    parsed = datetime.strptime(seconds, MAX_VALUE_TIME_FORMAT)
+    if fraction:
+        if not fraction.isdigit():
+            raise ValueError(f"Invalid fractional seconds: {value!r}")
+        parsed = parsed.replace(microsecond=int(fraction[:6].ljust(6, "0")))
+    return parsed
+
+
+class FleetMonitor:
+    """Status of every CDC flow from one recursive status request per poll.
+
+    The flows under the CDC parent group are indexed by the mapping that deployed
+    them (flows without a mapping file keep their group name). New bulletins are
+    fetched incrementally from the bulletin board and attached to their flow.
+    With track_max_values, the state of each incremental extract is read as well
+    (one request per incremental flow) to report how far its max value trails
+    the wall clock.
+    """
+
+    def __init__(self, flow_builder, interval: float = 60.0, track_max_values: bool = False):
+        self.flow_builder = flow_builder
+        self.config_parser = flow_builder.config_parser
+        self.nifi_client = flow_builder.nifi_client
+        self.interval = interval
+        self.track_max_values = track_max_values
+        # Latest snapshot per mapping, and when it was taken
+        self.flows: Dict[str, Dict[str, Any]] = {}
+        self.polled_at: Optional[float] = None
+        self._last_bulletin_id: Optional[int] = None
+
+    @classmethod
+    def from_env_config(cls, flow_builder, env_config: Dict[str, str],
+                        track_max_values: bool = False) -> "FleetMonitor":
+        """Create a monitor polling every MONITORING_INTERVAL milliseconds"""
+        return cls(flow_builder, int(env_config.get("monitoring_interval") or 60000) / 1000, track_max_values)
+
+    def poll(self) -> Dict[str, Dict[str, Any]]:
+        """Refresh the snapshot of every flow"""
+        parent_pg_id = self.flow_builder._get_cdc_parent_group_id()
+        status = self.nifi_client.get_process_group_status(parent_pg_id, recursive=True)
+        aggregate = status["processGroupStatus"]["aggregateSnapshot"]
+        mappings = self._mappings_by_group_name()
+
+        flows = {}
+        flow_of_group = {}
+        for child in aggregate.get("processGroupStatusSnapshots", []):
+            snapshot = child["processGroupStatusSnapshot"]
+            mapping_name = mappings.get(snapshot["name"])
+            key = mapping_name or snapshot["name"]
+            flows[key] = self._flow_status(snapshot, mapping_name)
+            for group in self._groups(snapshot):
+                flow_of_group[group["id"]] = key
+
+        self._attach_bulletins(flows, flow_of_group)
+        if self.track_max_values:
+            for flow in flows.values():
+                flow["max_value_lag_seconds"] = self._max_value_lag(flow.pop("max_value_processors"))
+        else:
+            for flow in flows.values():
+                del flow["max_value_processors"]
+        self.flows = flows
+        self.polled_at = time.time()
+        return flows
+
+    def get(self, mapping_name: str) -> Optional[Dict[str, Any]]:
+        """Latest snapshot of one flow"""
+        return self.flows.get(mapping_name)
+
+    def watch(self, callback: Callable[[Dict[str, Dict[str, Any]]], None], cycles: Optional[int] = None,
+              on_error: Optional[Callable[[Exception], None]] = None):
+        """Poll every interval and pass each snapshot to ``callback``; a failed poll keeps the last one"""
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            started = time.monotonic()
+            try:
+                callback(self.poll())
+            except Exception as e:
+                logger.error(f"Polling CDC flow status failed: {e}")
+                if on_error:
+                    on_error(e)
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _mappings_by_group_name(self) -> Dict[str, str]:
+        """Mapping name for each mapping.name (the name of its process group)"""
+        mappings = {}
+        for mapping_name in self.config_parser.list_mappings():
+            try:
+                group_name = self.config_parser.parse_mapping(mapping_name).get("mapping.name", "CDC Flow")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable mapping {mapping_name}: {e}")
+                continue
+            mappings[group_name] = mapping_name
+        return mappings
+
+    @classmethod
+    def _groups(cls, snapshot: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """A group status snapshot and the snapshots of all groups nested in it"""
+        yield snapshot
+        for child in snapshot.get("processGroupStatusSnapshots", []):
+            yield from cls._groups(child["processGroupStatusSnapshot"])
+
+    def _flow_status(self, snapshot: Dict[str, Any], mapping_name: Optional[str]) -> Dict[str, Any]:
+        """Queue depth, per-stage counters, throughput and lag of one flow"""
+        processors = [p["processorStatusSnapshot"] for group in self._groups(snapshot)
+                      for p in group.get("processorStatusSnapshots", [])]
+        connections = [c["connectionStatusSnapshot"] for group in self._groups(snapshot)
+                       for c in group.get("connectionStatusSnapshots", [])]
+
+        stages: Dict[str, Dict[str, int]] = {}
+        run_status: Dict[str, int] = {}
+        for processor in processors:
+            run_status[processor.get("runStatus")] = run_status.get(processor.get("runStatus"), 0) + 1
+            stage = PROCESSOR_STAGES.get(self._simple_type(processor))
+            if stage is None:
+                continue
+            counters = stages.setdefault(stage, {"flowfiles_in": 0, "flowfiles_out": 0,
+                                                 "bytes_read": 0, "bytes_written": 0, "active_threads": 0})
+            counters["flowfiles_in"] += processor.get("flowFilesIn", 0)
+            counters["flowfiles_out"] += processor.get("flowFilesOut", 0)
+            counters["bytes_read"] += processor.get("bytesRead", 0)
+            counters["bytes_written"] += processor.get("bytesWritten", 0)
+            counters["active_threads"] += processor.get("activeThreadCount", 0)
+
+        load = stages.get("load", {})
+        queued = snapshot.get("flowFilesQueued", 0)
+        throughput = load.get("flowfiles_in", 0) / STATUS_WINDOW_SECONDS
+
+        return {
+            "mapping": mapping_name,
+            "group_id": snapshot["id"],
+            "group_name": snapshot["name"],
+            "queued_count": queued,
+            "queued_bytes": snapshot.get("bytesQueued", 0),
+            "extracted_flowfiles": stages.get("extract", {}).get("flowfiles_out", 0),
+            "loaded_flowfiles": load.get("flowfiles_in", 0),
+            "throughput": throughput,
+            "bytes_per_second": load.get("bytes_read", 0) / STATUS_WINDOW_SECONDS,
+            # Seconds the load side needs to drain the queue at its current rate; None when stalled
+            "lag_seconds": (queued / throughput if throughput else None) if queued else 0.0,
+            "max_queue_percent": max((max(c.get("percentUseCount", 0), c.get("percentUseBytes", 0))
+                                      for c in connections), default=0),
+            "active_threads": snapshot.get("activeThreadCount", 0),
+            "run_status": run_status,
+            "stages": stages,
+            "connections": [{
+                "name": c.get("name") or f"{c.get('sourceName')} -> {c.get('destinationName')}",
+                "source": c.get("sourceName"),
+                "destination": c.get("destinationName"),
+                "queued_count": c.get("flowFilesQueued", 0),
+                "queued_bytes": c.get("bytesQueued", 0),
+                "percent_use_count": c.get("percentUseCount", 0),
+                "percent_use_bytes": c.get("percentUseBytes", 0)
+            } for c in connections],
+            "max_value_processors": [p["id"] for p in processors
+                                     if self._simple_type(p) in MAX_VALUE_PROCESSOR_TYPES],
+            "bulletins": []
+        }
+
+    @staticmethod
+    def _simple_type(processor: Dict[str, Any]) -> str:
+        return (processor.get("type") or "").rsplit(".", 1)[-1]
+
+    def _max_value_lag(self, processor_ids: List[str]) -> Optional[float]:
+        """Seconds between now and the newest cdc.column value the incremental extracts have seen"""
+        newest = None
+        for processor_id in processor_ids:
+            try:
+                component_state = self.nifi_client.get_processor_state(processor_id)["componentState"]
+            except Exception as e:
+                logger.warning(f"Reading the state of processor {processor_id} failed: {e}")
+                continue
+            for scope in ("clusterState", "localState"):
+                for entry in (component_state.get(scope) or {}).get("state", []):
+                    if MAX_VALUE_STATE_SEPARATOR not in entry.get("key", ""):
+                        continue
+                    try:
+                        value = _parse_max_value_time(entry.get("value") or "")
+                    except ValueError:
+                        continue  # not a timestamp column
+                    newest = value if newest is None else max(newest, value)
+        # Max values are in the database's local time, assumed to be this host's
+        return max(0.0, time.time() - newest.timestamp()) if newest else None
+
+    def _attach_bulletins(self, flows: Dict[str, Dict[str, Any]], flow_of_group: Dict[str, str]):
+        """Add the bulletins posted since the previous poll to the flows they came from"""
+        board = self.nifi_client.get_bulletin_board(after=self._last_bulletin_id)
+        bulletins: List[Dict[str, Any]] = board.get("bulletinBoard", {}).get("bulletins", [])
+        for entity in sorted(bulletins, key=lambda b: b.get("id", 0)):
+            self._last_bulletin_id = max(self._last_bulletin_id or 0, entity.get("id", 0))
+            key = flow_of_group.get(entity.get("groupId"))
+            if key is None:
+                continue
+            bulletin = entity.get("bulletin") or {}
+            flows[key]["bulletins"].append({
+                "timestamp": bulletin.get("timestamp") or entity.get("timestamp"),
+                "level": bulletin.get("level"),
+                "source": bulletin.get("sourceName"),
+                "message": bulletin.get("message")
+            })
+        for flow in flows.values():
+            del flow["bulletins"][:-MAX_BULLETINS_PER_FLOW]
@@ -0,0 +1,163 @@
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+# NiFi version the bundles are resolved against; NiFi picks a compatible
+# bundle on import when the exact version is not installed
+DEFAULT_BUNDLE_VERSION = "1.28.0"
+
+# NAR that provides each component type, by type prefix
+BUNDLE_ARTIFACTS = {
+    "org.apache.nifi.dbcp.": "nifi-dbcp-service-nar",
+    "org.apache.nifi.avro.": "nifi-record-serialization-services-nar",
+    "org.apache.nifi.json.": "nifi-record-serialization-services-nar",
+    "org.apache.nifi.processors.standard.": "nifi-standard-nar",
+}
+
+# Sensitive values are dropped by NiFi when a flow definition is imported
+SENSITIVE_PROPERTIES = {"Password"}
+
+PROCESSOR_DEFAULTS = {
+    "schedulingPeriod": "0 sec",
+    "schedulingStrategy": "TIMER_DRIVEN",
+    "executionNode": "ALL",
+    "penaltyDuration": "30 sec",
+    "yieldDuration": "1 sec",
+    "bulletinLevel": "WARN",
+    "runDurationMillis": 0,
+    "concurrentlySchedulableTaskCount": 1,
+    "autoTerminatedRelationships": [],
+}
+
+CONNECTION_DEFAULTS = {
+    "flowFileExpiration": "0 sec",
+    "backPressureDataSizeThreshold": "1 GB",
+    "backPressureObjectThreshold": 10000,
+    "loadBalanceStrategy": "DO_NOT_LOAD_BALANCE",
+    "loadBalancePartitionAttribute": "",
+    "loadBalanceCompression": "DO_NOT_COMPRESS",
+    "prioritizers": [],
+}
+# Connection settings named differently in flow definitions than in the REST ConnectionDTO
+VERSIONED_CONNECTION_FIELDS = {
+    "loadBalancePartitionAttribute": "partitioningAttribute",
+}
+
+
+def component_identifier(flow_name: str, key: str) -> str:
+    """Deterministic versioned identifier for a component of a flow"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"nifi-cdc/{flow_name}/{key}"))
+
+
+def bundle_for(component_type: str, version: str = DEFAULT_BUNDLE_VERSION) -> Dict[str, str]:
+    """Bundle coordinates of the NAR providing a component type"""
+    for prefix, artifact in BUNDLE_ARTIFACTS.items():
+        if component_type.startswith(prefix):
+            return {"group": "org.apache.nifi", "artifact": artifact, "version": version}
+    raise ValueError(f"No known bundle for component type: {component_type}")
+
+
+def render_flow_definition(flow_name: str,
+                           services: Dict[str, Dict[str, Any]],
+                           processors: Dict[str, Dict[str, Any]],
+                           connections: List[Tuple[str, str, List[str], Dict[str, Any]]],
+                           external_services: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Render service, processor and connection specs as a NiFi flow definition (flow snapshot JSON).
+
+    Components are keyed like the builder's specs; ``component_identifier(flow_name, key)``
+    gives each one's versioned identifier, which processor properties use to reference services.
+    ``external_services`` maps keys of services living outside the flow to their names, which
+    NiFi uses on import to resolve the references against services of the parent groups.
+    """
+    group_id = component_identifier(flow_name, "process_group")
+
+    def identifier(key):
+        return component_identifier(flow_name, key)
+
+    versioned_services = []
+    for key, spec in services.items():
+        versioned_services.append({
+            "identifier": identifier(key),
+            "groupIdentifier": group_id,
+            "name": spec["name"],
+            "type": spec["type"],
+            "bundle": bundle_for(spec["type"]),
+            "properties": _without_sensitive(spec["properties"]),
+            "propertyDescriptors": {},
+            "scheduledState": "DISABLED",
+            "bulletinLevel": "WARN",
+            "componentType": "CONTROLLER_SERVICE"
+        })
+
+    versioned_processors = []
+    for key, spec in processors.items():
+        processor = dict(PROCESSOR_DEFAULTS)
+        processor.update(spec.get("config") or {})
+        processor.update({
+            "identifier": identifier(key),
+            "groupIdentifier": group_id,
+            "name": spec["name"],
+            "type": spec["type"],
+            "bundle": bundle_for(spec["type"]),
+            "position": spec.get("position") or {"x": 0, "y": 0},
+            "properties": _without_sensitive(spec["properties"]),
+            "propertyDescriptors": {},
+            "style": {},
+            "scheduledState": spec.get("state") or "ENABLED",
+            "componentType": "PROCESSOR"
+        })
+        versioned_processors.append(processor)
+
+    versioned_connections = []
+    for source, destination, relationships, options in connections:
+        connection = {VERSIONED_CONNECTION_FIELDS.get(name, name): value
+                      for name, value in dict(CONNECTION_DEFAULTS, **options).items()}
+        connection.update({
+            "identifier": identifier(f"connection/{source}/{destination}/{'+'.join(relationships)}"),
+            "groupIdentifier": group_id,
+            "name": "",
+            "source": _connectable(identifier(source), group_id, processors[source]["name"]),
+            "destination": _connectable(identifier(destination), group_id, processors[destination]["name"]),
+            "selectedRelationships": list(relationships),
+            "bends": [],
+            "labelIndex": 1,
+            "zIndex": 0,
+            "componentType": "CONNECTION"
+        })
+        versioned_connections.append(connection)
+
+    return {
+        "flowEncodingVersion": "1.0",
+        "externalControllerServices": {
+            identifier(key): {"identifier": identifier(key), "name": name}
+            for key, name in (external_services or {}).items()
+        },
+        "parameterContexts": {},
+        "parameterProviders": {},
+        "flowContents": {
+            "identifier": group_id,
+            "name": flow_name,
+            "comments": "",
+            "position": {"x": 0, "y": 0},
+            "processGroups": [],
+            "remoteProcessGroups": [],
+            "processors": versioned_processors,
+            "inputPorts": [],
+            "outputPorts": [],
+            "connections": versioned_connections,
+            "labels": [],
+            "funnels": [],
+            "controllerServices": versioned_services,
+            "variables": {},
+            "flowFileConcurrency": "UNBOUNDED",
+            "flowFileOutboundPolicy": "STREAM_WHEN_AVAILABLE",
+            "componentType": "PROCESS_GROUP"
+        }
+    }
+
+
+def _connectable(component_id: str, group_id: str, name: str) -> Dict[str, str]:
+    return {"id": component_id, "type": "PROCESSOR", "groupId": group_id, "name": name}
+
+
+def _without_sensitive(properties: Dict[str, str]) -> Dict[str, str]:
+    return {name: value for name, value in properties.items() if name not in SENSITIVE_PROPERTIES}
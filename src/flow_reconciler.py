@@ -0,0 +1,317 @@
+import logging
+from typing import Dict, Any, List, Optional
+
+from flow_definition import SENSITIVE_PROPERTIES, PROCESSOR_DEFAULTS, CONNECTION_DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+
+class FlowReconciler:
+    """Bring a deployed CDC flow in line with its mapping by applying only the differences.
+
+    Components are matched by name, so queued FlowFiles, processor state and
+    unchanged components survive a redeploy.
+    """
+
+    def __init__(self, flow_builder):
+        self.flow_builder = flow_builder
+        self.nifi_client = flow_builder.nifi_client
+
+    def reconcile(self, mapping_name: str, dry_run: bool = False, drop_queues: bool = False) -> Dict[str, Any]:
+        """Create the flow if it does not exist yet, otherwise diff it and apply the changes.
+
+        Connections to delete that still hold FlowFiles are only dropped with ``drop_queues``.
+        """
+        mapping_config = self.flow_builder.config_parser.parse_mapping(mapping_name)
+        group_name = mapping_config.get("mapping.name", "CDC Flow")
+        group = self.find_flow_group(group_name)
+        moved = False
+        if group is None:
+            group = self.adopt_root_flow_group(group_name, dry_run)
+            moved = group is not None
+
+        if group is None:
+            if dry_run:
+                return {"process_group": None, "processors": {}, "changes": {"create_flow": True}}
+            flow = self.flow_builder.create_cdc_flow(mapping_name)
+            flow["changes"] = {"create_flow": True}
+            return flow
+
+        process_group_id = group["id"]
+        deployed = self.fetch_deployed_flow(process_group_id)
+        shared_service_ids = self.flow_builder._ensure_shared_services(mapping_config, create=not dry_run)
+        plan = self.diff(mapping_config, deployed, shared_service_ids)
+        processors = self._deployed_processors_by_key(plan, deployed)
+
+        if not dry_run and self.has_changes(plan):
+            processors = self.apply(process_group_id, plan, deployed, drop_queues)
+        elif not dry_run and moved:
+            self.nifi_client.start_process_group(process_group_id)
+
+        changes = self.summarize(plan)
+        if moved:
+            changes["flow_moved"] = True
+        return {
+            "process_group": group["component"],
+            "processors": processors,
+            "changes": changes
+        }
+
+    def find_flow_group(self, group_name: str) -> Optional[Dict[str, Any]]:
+        """Find the deployed process group of a flow under the CDC parent group"""
+        parent_pg_id = self.flow_builder._get_cdc_parent_group_id()
+        flow = self.nifi_client.get_process_group_flow(parent_pg_id)["processGroupFlow"]["flow"]
+        for group in flow.get("processGroups", []):
+            if group["component"]["name"] == group_name:
+                return group
+        return None
+
+    def adopt_root_flow_group(self, group_name: str, dry_run: bool = False) -> Optional[Dict[str, Any]]:
+        """Find a flow deployed directly under the root group, before flows were kept under the
+        CDC parent group, and move it there so it can use the shared services"""
+        root_pg_id = self.flow_builder.env_config["nifi_root_process_group_id"]
+        parent_pg_id = self.flow_builder._get_cdc_parent_group_id()
+        if parent_pg_id == root_pg_id:
+            return None
+        flow = self.nifi_client.get_process_group_flow(root_pg_id)["processGroupFlow"]["flow"]
+        group = next((group for group in flow.get("processGroups", [])
+                      if group["component"]["name"] == group_name), None)
+        if group is None or dry_run:
+            return group
+
+        logger.info(f"Moving CDC flow {group_name} from the root group under the CDC parent group")
+        self.nifi_client.stop_process_group(group["id"])
+        self.nifi_client.move_process_group(group["id"], root_pg_id, parent_pg_id)
+        return group
+
+    def fetch_deployed_flow(self, process_group_id: str) -> Dict[str, Any]:
+        """Read the processors, connections and services of a deployed flow"""
+        flow = self.nifi_client.get_process_group_flow(process_group_id)["processGroupFlow"]["flow"]
+        services = self.nifi_client.get_process_group_services(process_group_id)
+
+        return {
+            "processors": {p["component"]["name"]: p["component"] for p in flow.get("processors", [])},
+            "connections": [c["component"] for c in flow.get("connections", [])],
+            "queued": {c["component"]["id"]: ((c.get("status") or {}).get("aggregateSnapshot") or {})
+                       .get("flowFilesQueued", 0) for c in flow.get("connections", [])},
+            "services": {s["component"]["name"]: s["component"]
+                         for s in services.get("controllerServices", [])}
+        }
+
+    def diff(self, mapping_config: Dict[str, str], deployed: Dict[str, Any],
+             shared_service_ids: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Compute the minimal set of changes from the deployed flow to the desired one.
+
+        ``shared_service_ids`` holds the ids of the shared services processors reference.
+        """
+        plan = {
+            "services": {"delete": {}},
+            "processors": {"create": {}, "update": {}, "delete": {}, "enable": {}, "disable": {}},
+            "connections": {"create": [], "update": [], "delete": [], "queued": {}},
+            "processor_ids": {}
+        }
+
+        # Flows only reference shared services; services in the group are left over
+        # from flows deployed with their own connection pools
+        for name, current in deployed["services"].items():
+            plan["services"]["delete"][name] = current["id"]
+
+        # Processors
+        specs = self.flow_builder._cdc_processor_specs(mapping_config, dict(shared_service_ids or {}))
+        desired_names = {spec["name"] for spec in specs.values()}
+        for key, spec in specs.items():
+            current = deployed["processors"].get(spec["name"])
+            if current is not None and current.get("type") != spec["type"]:
+                # A different processor type cannot be reconfigured in place
+                plan["processors"]["delete"][spec["name"]] = current["id"]
+                current = None
+            if current is None:
+                plan["processors"]["create"][key] = spec
+                continue
+
+            plan["processor_ids"][key] = current["id"]
+            # Lanes are disabled when the mapping turns slicing on and enabled again when it turns it off
+            if (spec.get("state") == "DISABLED") != (current.get("state") == "DISABLED"):
+                plan["processors"]["disable" if spec.get("state") == "DISABLED" else "enable"][key] = current["id"]
+            current_config = current.get("config") or {}
+            changed_properties = self._changed_properties(
+                spec["properties"], current_config.get("properties") or {}
+            )
+            changed_config = self._changed_settings(spec.get("config") or {}, current_config, PROCESSOR_DEFAULTS)
+            if changed_properties or changed_config:
+                plan["processors"]["update"][key] = {
+                    "id": current["id"],
+                    "properties": changed_properties,
+                    "config": changed_config
+                }
+
+        for name, current in deployed["processors"].items():
+            if name not in desired_names:
+                plan["processors"]["delete"][name] = current["id"]
+
+        # Connections, keyed by (source stage, destination stage, relationships)
+        stage_by_id = {processor_id: key for key, processor_id in plan["processor_ids"].items()}
+        existing = set()
+        connection_specs = self.flow_builder._processor_connection_specs(specs, mapping_config)
+        desired = {
+            (source, destination, frozenset(relationships)): options
+            for source, destination, relationships, options in connection_specs
+        }
+        for connection in deployed["connections"]:
+            identity = (
+                stage_by_id.get(connection["source"]["id"]),
+                stage_by_id.get(connection["destination"]["id"]),
+                frozenset(connection.get("selectedRelationships") or [])
+            )
+            if identity in desired and identity not in existing:
+                existing.add(identity)
+                changed_options = self._changed_settings(desired[identity], connection, CONNECTION_DEFAULTS)
+                if changed_options:
+                    plan["connections"]["update"].append({"id": connection["id"], "options": changed_options})
+            else:
+                plan["connections"]["delete"].append(connection)
+                queued = deployed["queued"].get(connection["id"])
+                if queued:
+                    plan["connections"]["queued"][connection["id"]] = queued
+
+        for source, destination, relationships, options in connection_specs:
+            if (source, destination, frozenset(relationships)) not in existing:
+                plan["connections"]["create"].append((source, destination, relationships, options))
+
+        return plan
+
+    def apply(self, process_group_id: str, plan: Dict[str, Any],
+              deployed: Dict[str, Any], drop_queues: bool = False) -> Dict[str, Any]:
+        """Apply a reconciliation plan and restart the flow"""
+        client = self.nifi_client
+        queued = plan["connections"]["queued"]
+        if queued and not drop_queues:
+            # NiFi refuses to delete a connection holding FlowFiles
+            raise RuntimeError(f"{len(queued)} connections to delete still hold {sum(queued.values())} "
+                               f"FlowFiles; let them drain or drop them with drop_queues")
+        # Disabled processors (e.g. backfill lanes) can be reconfigured as they are;
+        # stopping them would enable them and the group start would then run them
+        disabled = {p["id"] for p in deployed["processors"].values() if p.get("state") == "DISABLED"}
+
+        to_stop = [processor_id for processor_id in self._processors_to_stop(plan) if processor_id not in disabled]
+        for processor_id in to_stop:
+            client.stop_processor(processor_id)
+        for processor_id in to_stop:
+            client.wait_for_processor_state(processor_id, "STOPPED")
+        for processor_id in plan["processors"]["disable"].values():
+            client.disable_processor(processor_id)
+
+        for connection_id in queued:
+            client.drop_connection_queue(connection_id)
+        for connection in plan["connections"]["delete"]:
+            client.delete_connection(connection["id"])
+        for processor_id in plan["processors"]["delete"].values():
+            client.delete_processor(processor_id)
+
+        processors = self._deployed_processors_by_key(plan, deployed)
+        for key, change in plan["processors"]["update"].items():
+            processors[key] = client.update_processor(
+                change["id"], change["properties"] or None, change["config"] or None
+            )["component"]
+
+        for key, spec in plan["processors"]["create"].items():
+            processors[key] = client.create_processor(
+                process_group_id,
+                spec["type"],
+                spec["name"],
+                spec["properties"],
+                spec["position"],
+                config=spec.get("config")
+            )["component"]
+            if spec.get("state") == "DISABLED":
+                client.disable_processor(processors[key]["id"])
+
+        for change in plan["connections"]["update"]:
+            client.update_connection(change["id"], change["options"])
+        for source, destination, relationships, options in plan["connections"]["create"]:
+            client.create_connection(
+                process_group_id, processors[source]["id"], processors[destination]["id"], relationships,
+                options=options or None
+            )
+
+        # Enabled processors are STOPPED and run with the group start below
+        for processor_id in plan["processors"]["enable"].values():
+            client.set_processor_run_status(processor_id, "STOPPED")
+
+        # Retire the flow's own services once its processors reference the shared ones
+        if plan["services"]["delete"]:
+            client.disable_process_group_services(process_group_id)
+            client.wait_for_process_group_services_state(process_group_id, "DISABLED")
+            for service_id in plan["services"]["delete"].values():
+                client.delete_controller_service(service_id)
+
+        client.start_process_group(process_group_id)
+        return processors
+
+    @staticmethod
+    def has_changes(plan: Dict[str, Any]) -> bool:
+        """Whether applying the plan would change anything"""
+        return any(summary for summary in FlowReconciler.summarize(plan).values())
+
+    @staticmethod
+    def summarize(plan: Dict[str, Any]) -> Dict[str, int]:
+        """Count the changes in a plan by kind"""
+        return {
+            "services_deleted": len(plan["services"]["delete"]),
+            "processors_created": len(plan["processors"]["create"]),
+            "processors_updated": len(plan["processors"]["update"]),
+            "processors_deleted": len(plan["processors"]["delete"]),
+            "processors_enabled": len(plan["processors"]["enable"]),
+            "processors_disabled": len(plan["processors"]["disable"]),
+            "connections_created": len(plan["connections"]["create"]),
+            "connections_updated": len(plan["connections"]["update"]),
+            "connections_deleted": len(plan["connections"]["delete"]),
+            "flowfiles_to_drop": sum(plan["connections"]["queued"].values())
+        }
+
+    @staticmethod
+    def _processors_to_stop(plan: Dict[str, Any]) -> List[str]:
+        """Processors that must be stopped before being updated, deleted, disconnected or disabled"""
+        ids = [change["id"] for change in plan["processors"]["update"].values()]
+        ids.extend(plan["processors"]["delete"].values())
+        ids.extend(plan["processors"]["disable"].values())
+        for connection in plan["connections"]["delete"]:
+            ids.extend([connection["source"]["id"], connection["destination"]["id"]])
+        return list(dict.fromkeys(ids))
+
+    @staticmethod
+    def _deployed_processors_by_key(plan: Dict[str, Any], deployed: Dict[str, Any]) -> Dict[str, Any]:
+        """Deployed processor components that are kept, keyed by stage"""
+        by_id = {component["id"]: component for component in deployed["processors"].values()}
+        return {key: by_id[processor_id] for key, processor_id in plan["processor_ids"].items()}
+
+    def _changed_properties(self, desired: Dict[str, str], current: Dict[str, str]) -> Dict[str, str]:
+        """Desired properties whose deployed value differs (sensitive values are masked by NiFi)"""
+        return {
+            name: value for name, value in desired.items()
+            if name not in SENSITIVE_PROPERTIES and not self._same_value(value, current.get(name))
+        }
+
+    def _changed_settings(self, desired: Dict[str, Any], current: Dict[str, Any],
+                          defaults: Dict[str, Any]) -> Dict[str, Any]:
+        """Desired settings whose deployed value differs; settings dropped from the mapping go back to the defaults"""
+        changed = {}
+        for name, value in dict(defaults, **desired).items():
+            if name not in desired and name not in current:
+                continue
+            # Prioritizers apply in order; other lists (relationships) are sets
+            if name == "prioritizers":
+                same = list(value) == list(current.get(name) or [])
+            else:
+                same = self._same_value(value, current.get(name))
+            if not same:
+                changed[name] = value
+        return changed
+
+    @staticmethod
+    def _same_value(desired: Any, current: Any) -> bool:
+        """Compare a desired and deployed value the way NiFi reports them"""
+        if isinstance(desired, list):
+            return sorted(desired) == sorted(current or [])
+        # NiFi reports unset properties as null and numbers in config as numbers
+        return str(desired if desired is not None else "") == str(current if current is not None else "")
@@ -0,0 +1,122 @@
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode
+
+# Datasources without db.type are Oracle, the only database the tool originally supported
+DEFAULT_DB_TYPE = "oracle"
+
+
+class JdbcDialect:
+    """How to connect to, pool and query one database type.
+
+    Datasource keys override the dialect defaults:
+      db.jdbc.url         - full JDBC URL instead of one built from db.host/db.port/...
+      db.jdbc.params      - extra URL parameters (a=1&b=2), appended after the batch flags
+      db.driver.class     - JDBC driver class
+      db.driver.locations - driver jar paths/URLs for the DBCP service (comma separated)
+    """
+
+    def __init__(self, name: str, nifi_database_type: str, url_template: Optional[str] = None,
+                 driver_class: Optional[str] = None, batch_params: Optional[Dict[str, str]] = None,
+                 timestamp_template: str = "TIMESTAMP '{value}'",
+                 pool_defaults: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.nifi_database_type = nifi_database_type
+        self.url_template = url_template
+        self.driver_class = driver_class
+        self.batch_params = batch_params or {}
+        self.timestamp_template = timestamp_template
+        self.pool_defaults = pool_defaults or {}
+
+    def jdbc_url(self, db_properties: Dict[str, str]) -> str:
+        """JDBC URL of a datasource, with the dialect's batch flags"""
+        if db_properties.get("db.jdbc.url"):
+            return db_properties["db.jdbc.url"]
+        if self.url_template is None:
+            raise ValueError(f"db.type={self.name} needs db.jdbc.url")
+
+        url = self.url_template.format(
+            host=db_properties.get("db.host"),
+            port=db_properties.get("db.port"),
+            service_name=db_properties.get("db.service.name"),
+            database=db_properties.get("db.name")
+        )
+        params = urlencode(self.batch_params)
+        extra = db_properties.get("db.jdbc.params")
+        params = "&".join(p for p in (params, extra) if p)
+        return f"{url}?{params}" if params else url
+
+    def driver(self, db_properties: Dict[str, str]) -> str:
+        """JDBC driver class of a datasource"""
+        driver_class = db_properties.get("db.driver.class") or db_properties.get(f"{self.name}.driver.class")
+        driver_class = driver_class or self.driver_class
+        if not driver_class:
+            raise ValueError(f"db.type={self.name} needs db.driver.class")
+        return driver_class
+
+    def timestamp_literal(self, value: str) -> str:
+        """SQL expression for a 'YYYY-MM-DD HH:MM:SS' timestamp"""
+        return self.timestamp_template.format(value=value)
+
+
+DIALECTS: Dict[str, JdbcDialect] = {}
+
+# Databases without a registered dialect: ANSI SQL and an explicit URL and driver
+GENERIC_DIALECT = JdbcDialect("generic", "Generic")
+
+
+def register_dialect(dialect: JdbcDialect):
+    """Add or replace the dialect used for datasources with db.type=<dialect.name>"""
+    DIALECTS[dialect.name] = dialect
+
+
+def get_dialect(db_type: Optional[str]) -> JdbcDialect:
+    """Dialect of a db.type, the generic dialect when none is registered"""
+    return DIALECTS.get(db_type or DEFAULT_DB_TYPE) or GENERIC_DIALECT
+
+
+def dialect_of(db_properties: Dict[str, Any]) -> JdbcDialect:
+    """Dialect of a datasource"""
+    return get_dialect(db_properties.get("db.type"))
+
+
+# Pool defaults validate and keep idle connections instead of closing and reopening them
+# (the churn seen in Oracle listener logs); MySQL connections are recycled before the
+# server's 8 hour wait_timeout closes them
+register_dialect(JdbcDialect(
+    "oracle", "Oracle 12+",
+    url_template="jdbc:oracle:thin:@{host}:{port}:{service_name}",
+    driver_class="oracle.jdbc.OracleDriver",
+    timestamp_template="TO_TIMESTAMP('{value}', 'YYYY-MM-DD HH24:MI:SS')",
+    pool_defaults={
+        "db.pool.validation.query": "SELECT 1 FROM DUAL",
+        "db.pool.eviction.interval": "5 mins",
+        "db.pool.min.evictable.idle": "30 mins",
+        "db.pool.max.lifetime": "8 hours",
+    }
+))
+register_dialect(JdbcDialect(
+    "postgresql", "PostgreSQL",
+    url_template="jdbc:postgresql://{host}:{port}/{database}",
+    driver_class="org.postgresql.Driver",
+    # Lets PutDatabaseRecord/PutSQL batches go out as multi-row INSERTs
+    batch_params={"reWriteBatchedInserts": "true"},
+    pool_defaults={
+        "db.pool.validation.query": "SELECT 1",
+        "db.pool.eviction.interval": "5 mins",
+        "db.pool.min.evictable.idle": "30 mins",
+        "db.pool.max.lifetime": "8 hours",
+    }
+))
+register_dialect(JdbcDialect(
+    "mysql", "MySQL",
+    url_template="jdbc:mysql://{host}:{port}/{database}",
+    driver_class="com.mysql.cj.jdbc.Driver",
+    # Lets PutDatabaseRecord/PutSQL batches go out as multi-row INSERTs
+    batch_params={"rewriteBatchedStatements": "true"},
+    pool_defaults={
+        "db.pool.validation.query": "SELECT 1",
+        "db.pool.eviction.interval": "5 mins",
+        "db.pool.min.evictable.idle": "30 mins",
+        "db.pool.max.lifetime": "7 hours",
+    }
+))
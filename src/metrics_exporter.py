@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRIC_PREFIX = "nificdc"
+
+# (metric, help, flow snapshot key) of the per-flow gauges
+FLOW_METRICS = [
+    ("flow_queued_flowfiles", "FlowFiles queued in the flow", "queued_count"),
+    ("flow_queued_bytes", "Bytes queued in the flow", "queued_bytes"),
+    ("flow_load_flowfiles_per_second", "FlowFiles loaded per second over the last 5 minutes", "throughput"),
+    ("flow_load_bytes_per_second", "Bytes loaded per second over the last 5 minutes", "bytes_per_second"),
+    ("flow_drain_seconds", "Seconds the load stage needs to drain the queue at its current rate", "lag_seconds"),
+    ("flow_max_value_lag_seconds", "Seconds the newest extracted cdc.column value trails the wall clock",
+     "max_value_lag_seconds"),
+    ("flow_active_threads", "Active threads in the flow", "active_threads"),
+]
+# (metric, help, stage counter) of the per-stage gauges
+STAGE_METRICS = [
+    ("stage_flowfiles_in", "FlowFiles received by the stage over the last 5 minutes", "flowfiles_in"),
+    ("stage_flowfiles_out", "FlowFiles sent by the stage over the last 5 minutes", "flowfiles_out"),
+    ("stage_bytes_read", "Bytes read by the stage over the last 5 minutes", "bytes_read"),
+    ("stage_bytes_written", "Bytes written by the stage over the last 5 minutes", "bytes_written"),
+    ("stage_active_threads", "Active threads of the stage", "active_threads"),
+]
+# (metric, help, connection key) of the per-connection gauges
+CONNECTION_METRICS = [
+    ("connection_queued_flowfiles", "FlowFiles queued in the connection", "queued_count"),
+    ("connection_queued_bytes", "Bytes queued in the connection", "queued_bytes"),
+    ("connection_back_pressure_ratio", "Queued FlowFiles relative to the back pressure object threshold",
+     "percent_use_count"),
+    ("connection_back_pressure_bytes_ratio", "Queued bytes relative to the back pressure size threshold",
+     "percent_use_bytes"),
+]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_openmetrics(flows: Dict[str, Dict[str, Any]], up: bool = True,
+                       polled_at: Optional[float] = None) -> str:
+    """OpenMetrics text exposition of a FleetMonitor snapshot"""
+    families: List[Tuple[str, str, List[str]]] = []
+
+    def family(name: str, help_text: str, samples: List[Tuple[Dict[str, Any], Any]]):
+        lines = [f"{METRIC_PREFIX}_{name}{_labels(labels) if labels else ''} {float(value)}"
+                 for labels, value in samples if value is not None]
+        families.append((name, help_text, lines))
+
+    family("up", "Whether the last poll of the NiFi status succeeded", [({}, 1 if up else 0)])
+    if polled_at is not None:
+        family("last_poll_timestamp_seconds", "Time of the last successful poll", [({}, polled_at)])
+
+    for name, help_text, key in FLOW_METRICS:
+        family(name, help_text, [({"mapping": mapping}, flow.get(key))
+                                 for mapping, flow in sorted(flows.items())])
+    for name, help_text, key in STAGE_METRICS:
+        family(name, help_text, [({"mapping": mapping, "stage": stage}, counters[key])
+                                 for mapping, flow in sorted(flows.items())
+                                 for stage, counters in sorted(flow.get("stages", {}).items())])
+    for name, help_text, key in CONNECTION_METRICS:
+        scale = 100 if key.startswith("percent_") else 1
+        family(name, help_text, [
+            ({"mapping": mapping, "connection": c["name"], "source": c["source"],
+              "destination": c["destination"]}, c[key] / scale)
+            for mapping, flow in sorted(flows.items()) for c in flow.get("connections", [])
+        ])
+    family("flow_bulletins", "Bulletins posted by the flow since the previous poll",
+           [({"mapping": mapping}, len(flow.get("bulletins", []))) for mapping, flow in sorted(flows.items())])
+
+    text = []
+    for name, help_text, lines in families:
+        text.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        text.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        text.extend(lines)
+    text.append("# EOF")
+    return "\n".join(text) + "\n"
+
+
+class MetricsExporter:
+    """Serve per-mapping CDC metrics over HTTP for Prometheus.
+
+    A background thread polls the fleet every monitor interval and renders the
+    exposition once; scrapes only return the rendered text and never call NiFi.
+    """
+
+    def __init__(self, monitor, host: str = "0.0.0.0", port: int = 9405):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self._payload = render_openmetrics({}, up=False).encode()
+        self._payload_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def payload(self) -> bytes:
+        with self._payload_lock:
+            return self._payload
+
+    def update(self, flows: Dict[str, Dict[str, Any]], up: bool = True):
+        """Render a new snapshot for the following scrapes"""
+        payload = render_openmetrics(flows, up, self.monitor.polled_at).encode()
+        with self._payload_lock:
+            self._payload = payload
+
+    def _on_poll_error(self, error: Exception):
+        # Keep serving the last known values, flagged as stale
+        self.update(self.monitor.flows, up=False)
+
+    def start(self) -> ThreadingHTTPServer:
+        """Start polling and serving in background threads"""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.payload
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self.monitor.watch, args=(self.update,),
+                         kwargs={"on_error": self._on_poll_error}, daemon=True).start()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Serving CDC metrics on http://{self.host}:{self.port}/metrics")
+        return self._server
+
+    def serve_forever(self):
+        """Serve until interrupted"""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,34 +1,416 @@
 import requests
+import base64
 import json
-from typing import Dict, Any, Optional
+import logging
+import random
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Callable, Tuple
 import time
 
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Responses telling that NiFi did not process a request, which may then be sent again
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# Methods NiFi applies idempotently. A POST creates a component, so it is only resent
+# when NiFi refused it (429/503) or the connection was never established
+IDEMPOTENT_METHODS = {"get", "put", "delete"}
+MAX_RETRY_DELAY = 30.0
+# Responses from a node that is down or overloaded; other cluster nodes are used meanwhile
+NODE_FAILURE_STATUS_CODES = {502, 503, 504}
+NODE_COOLDOWN = 30.0
+# Tokens are renewed this many seconds before they expire. NiFi issues 12 hour tokens
+# by default, assumed when a token carries no readable expiry
+TOKEN_REFRESH_MARGIN = 60.0
+DEFAULT_TOKEN_LIFETIME = 12 * 3600.0
+
+# Collections whose next path segment is a component id, templated as {id} in endpoint names
+ID_COLLECTIONS = {"process-groups", "processors", "connections", "controller-services", "input-ports",
+                  "output-ports", "funnels", "labels", "remote-process-groups", "flowfile-queues"}
+NON_ID_SEGMENTS = {"upload", "import"}
+UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}")
+
+# Called with the call record of a request: before it is sent, and after it completed or failed
+RequestHook = Callable[[Dict[str, Any]], None]
+
+# Labels (such as flow and phase) of the requests made within request_context()
+_request_labels: ContextVar[Dict[str, str]] = ContextVar("nifi_request_labels", default={})
+
+
+@contextmanager
+def request_context(**labels: str):
+    """Label the NiFi requests made within the block, including those of asyncio.to_thread calls"""
+    token = _request_labels.set(dict(_request_labels.get(), **labels))
+    try:
+        yield
+    finally:
+        _request_labels.reset(token)
+
+
+def endpoint_template(path: str) -> str:
+    """Endpoint of a request path with its component ids replaced, e.g. /processors/{id}/run-status"""
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    templated = []
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else ""
+        if UUID_PATTERN.fullmatch(segment) or (
+                previous in ID_COLLECTIONS and segment not in ID_COLLECTIONS | NON_ID_SEGMENTS):
+            segment = "{id}"
+        templated.append(segment)
+    return "/" + "/".join(templated)
+
+
+class TokenBucket:
+    """Client-side rate limiter allowing ``rate`` requests per second in bursts of up to ``burst``"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, waiting until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter applying a default (connect, read) timeout to requests sent without one"""
+    
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
 
 class NiFiAPIClient:
-    def __init__(self, base_url: str, username: Optional[str] = None, password: Optional[str] = None):
-        self.base_url = base_url.rstrip('/')
+    def __init__(self, base_url: str, username: Optional[str] = None, password: Optional[str] = None,
+                 timeout: float = 30.0, retry_count: int = 3, retry_delay: float = 1.0,
+                 rate_limit: Optional[float] = None, pool_size: int = 10,
+                 client_cert: Optional[str] = None, client_key: Optional[str] = None,
+                 ca_cert: Optional[str] = None,
+                 request_hooks: Optional[List[Tuple[Optional[RequestHook], Optional[RequestHook]]]] = None):
+        # base_url may list several cluster nodes (comma separated); requests are spread over them
+        self.node_urls = [url.strip().rstrip('/') for url in base_url.split(',') if url.strip()]
+        self.base_url = self.node_urls[0]
         self.session = requests.Session()
         self.username = username
         self.password = password
+        # Latest known revision per component id, learned from every response
+        self._revisions: Dict[str, Dict[str, Any]] = {}
+        
+        # A hung node fails a request after the timeout instead of blocking it forever
+        self.timeout = (min(10.0, timeout), timeout)
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self._rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.configure_pool(pool_size)
+        
+        # Mutual TLS: the client certificate authenticates instead of username/password
+        if client_cert:
+            self.session.cert = (client_cert, client_key) if client_key else client_cert
+        if ca_cert:
+            self.session.verify = ca_cert
+        
+        # Nodes sign their own tokens, so a token is kept per node
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._auth_lock = threading.Lock()
+        self._node_lock = threading.Lock()
+        self._next_node_index = 0
+        self._node_down_until: Dict[str, float] = {}
+        # (pre, post) callbacks run around every request, see add_request_hook
+        self._request_hooks: List[Tuple[Optional[RequestHook], Optional[RequestHook]]] = list(request_hooks or [])
         
         if username and password:
             self._authenticate()
     
-    def _authenticate(self):
-        """Authenticate with NiFi if credentials are provided"""
-        auth_url = f"{self.base_url}/access/token"
-        response = self.session.post(auth_url, data={
-            'username': self.username,
-            'password': self.password
-        })
-        if response.status_code == 201:
-            token = response.text
+    @classmethod
+    def from_env_config(cls, env_config: Dict[str, str], **kwargs) -> "NiFiAPIClient":
+        """Create a client from ConfigParser.get_env_config() (times there are in milliseconds)"""
+        return cls(
+            env_config["nifi_api_base_url"],
+            env_config.get("nifi_api_username"),
+            env_config.get("nifi_api_password"),
+            timeout=int(env_config.get("nifi_api_timeout") or 30000) / 1000,
+            retry_count=int(env_config.get("api_retry_count") or 3),
+            retry_delay=int(env_config.get("api_retry_delay") or 1000) / 1000,
+            rate_limit=float(env_config.get("api_rate_limit") or 0) or None,
+            pool_size=int(env_config.get("connection_pool_size") or 10),
+            client_cert=env_config.get("nifi_api_client_cert_path") or None,
+            client_key=env_config.get("nifi_api_client_key_path") or None,
+            ca_cert=env_config.get("nifi_api_ca_cert_path") or None,
+            **kwargs
+        )
+    
+    def configure_pool(self, pool_size: int):
+        """Keep up to ``pool_size`` connections to NiFi alive; further concurrent requests wait for one"""
+        self.pool_size = pool_size
+        adapter = TimeoutHTTPAdapter(self.timeout, pool_connections=pool_size,
+                                     pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+    
+    def _authenticate(self, node_url: Optional[str] = None) -> Optional[str]:
+        """Get a token from a node (the first one by default) with the configured credentials"""
+        node_url = node_url or self.base_url
+        with self._traced("post", f"{node_url}/access/token") as call:
+            response = self.session.post(f"{node_url}/access/token", data={
+                'username': self.username,
+                'password': self.password
+            })
+            call["status"] = response.status_code
+        if response.status_code != 201:
+            logger.warning(f"Authentication with {node_url} failed: HTTP {response.status_code}")
+            self._tokens.pop(node_url, None)
+            if node_url == self.base_url:
+                self.session.headers.pop('Authorization', None)
+            return None
+        
+        token = response.text
+        self._tokens[node_url] = (token, time.time() + self._token_lifetime(token))
+        if node_url == self.base_url:
             self.session.headers['Authorization'] = f'Bearer {token}'
+        return token
+    
+    @staticmethod
+    def _token_lifetime(token: str) -> float:
+        """Seconds until a JWT expires, read from its (unverified) exp claim"""
+        try:
+            payload = token.split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+            return float(claims['exp']) - time.time()
+        except (IndexError, KeyError, TypeError, ValueError):
+            return DEFAULT_TOKEN_LIFETIME
+    
+    def _token_for(self, node_url: str, renew: bool = False) -> Optional[str]:
+        """A valid token for a node, authenticating again when it is missing, expiring or rejected"""
+        if not (self.username and self.password):
+            return None
+        with self._auth_lock:
+            token, expires_at = self._tokens.get(node_url, (None, 0.0))
+            if renew or token is None or expires_at - time.time() < TOKEN_REFRESH_MARGIN:
+                token = self._authenticate(node_url)
+            return token
+    
+    def _next_node(self) -> str:
+        """Next node in round-robin order, skipping nodes that failed recently"""
+        with self._node_lock:
+            now = time.monotonic()
+            count = len(self.node_urls)
+            for offset in range(count):
+                node_url = self.node_urls[(self._next_node_index + offset) % count]
+                if self._node_down_until.get(node_url, 0.0) <= now:
+                    self._next_node_index = (self._next_node_index + offset + 1) % count
+                    return node_url
+            # Every node failed recently: try the one that will recover first
+            return min(self.node_urls, key=lambda url: self._node_down_until[url])
+    
+    def _mark_node(self, node_url: str, healthy: bool):
+        with self._node_lock:
+            if healthy:
+                self._node_down_until.pop(node_url, None)
+            else:
+                self._node_down_until[node_url] = time.monotonic() + NODE_COOLDOWN
     
     def _get_client_id(self) -> str:
         """Get client ID for requests that require it"""
         return f"nifi-cdc-client-{int(time.time())}"
     
+    def add_request_hook(self, pre: Optional[RequestHook] = None, post: Optional[RequestHook] = None):
+        """Run callbacks around every request. Both get the call record: method, url, endpoint
+        (with ids templated), labels from request_context(), started (epoch seconds) and, for post,
+        status, elapsed, retries and error. Wait loops are reported as WAIT calls spanning their polls.
+        """
+        self._request_hooks.append((pre, post))
+    
+    def _run_hooks(self, index: int, call: Dict[str, Any]):
+        for hook in self._request_hooks:
+            if hook[index] is None:
+                continue
+            try:
+                hook[index](call)
+            except Exception:
+                logger.exception("NiFi request hook failed")
+    
+    @contextmanager
+    def _traced(self, method: str, url: str):
+        """Report a call to the request hooks, yielding its record for the caller to complete"""
+        if not self._request_hooks:
+            yield {}
+            return
+        path = next((url[len(node):] for node in self.node_urls if url.startswith(node)), url)
+        call = {
+            "method": method.upper(),
+            "url": url,
+            "endpoint": f"{method.upper()} {endpoint_template(path)}",
+            "labels": _request_labels.get(),
+            "thread": threading.get_ident(),
+            "started": time.time(),
+            "status": None,
+            "retries": 0,
+            "elapsed": None,
+            "error": None
+        }
+        self._run_hooks(0, call)
+        started = time.monotonic()
+        try:
+            yield call
+        except BaseException as e:
+            call["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            call["elapsed"] = time.monotonic() - started
+            self._run_hooks(1, call)
+    
+    def _request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """Send a request, raise on HTTP errors and remember any revisions in the response.
+        
+        Each attempt goes to the next healthy cluster node. Transient failures are retried
+        up to retry_count times with jittered exponential backoff, and an expired or
+        rejected token is renewed once.
+        """
+        with self._traced(method, url) as call:
+            return self._send(method, url, call, **kwargs)
+    
+    def _send(self, method: str, url: str, call: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else None
+        attempt = 0
+        renew_token = False
+        while True:
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            # A request resent with a renewed token goes to the node that rejected the old one
+            if not renew_token:
+                node_url = self._next_node() if path is not None else self.base_url
+            node_kwargs = kwargs
+            token = self._token_for(node_url, renew_token)
+            if token and node_url != self.base_url:
+                node_kwargs = dict(kwargs, headers=dict(kwargs.get("headers") or {},
+                                                        Authorization=f"Bearer {token}"))
+            request_url = node_url + path if path is not None else url
+            try:
+                response = getattr(self.session, method)(request_url, **node_kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._mark_node(node_url, False)
+                # A POST that failed mid-flight may have created its component
+                retryable = method in IDEMPOTENT_METHODS or isinstance(e, requests.ConnectTimeout)
+                if not retryable or attempt >= self.retry_count:
+                    raise
+                delay, reason = self._backoff(attempt), str(e)
+            else:
+                status = call["status"] = response.status_code
+                self._mark_node(node_url, status not in NODE_FAILURE_STATUS_CODES)
+                if status == 401 and token and not renew_token:
+                    logger.info(f"Token rejected by {node_url}; authenticating again")
+                    renew_token = True
+                    continue
+                renew_token = False
+                retryable = status in RETRYABLE_STATUS_CODES and (method in IDEMPOTENT_METHODS or status in (429, 503))
+                if not retryable or attempt >= self.retry_count:
+                    response.raise_for_status()
+                    result = response.json()
+                    self._remember_revisions(result)
+                    return result
+                delay, reason = self._backoff(attempt, response.headers.get("Retry-After")), f"HTTP {status}"
+            
+            attempt += 1
+            call["retries"] = attempt
+            logger.warning(f"{method.upper()} {request_url} failed ({reason}); retry {attempt}/{self.retry_count} "
+                           f"in {delay:.1f}s")
+            time.sleep(delay)
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before a retry: exponential with full jitter, or what NiFi asked for in Retry-After"""
+        if isinstance(retry_after, str) and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        return random.uniform(0, min(self.retry_delay * 2 ** attempt, MAX_RETRY_DELAY))
+    
+    def _remember_revisions(self, entity: Any):
+        """Cache component revisions from an entity, a flow or an entity listing"""
+        if not isinstance(entity, dict):
+            return
+        
+        revision = entity.get("revision")
+        component_id = entity.get("id") or (entity.get("component") or {}).get("id")
+        if isinstance(revision, dict) and component_id:
+            cached = self._revisions.get(component_id)
+            # Responses may arrive out of order under concurrency; never go backwards
+            if cached is None or revision.get("version", 0) >= cached.get("version", 0):
+                self._revisions[component_id] = revision
+        
+        flow = (entity.get("processGroupFlow") or {}).get("flow") or {}
+        for listing in (entity, flow):
+            for key in ("processors", "connections", "processGroups", "controllerServices"):
+                children = listing.get(key)
+                if isinstance(children, list):
+                    for child in children:
+                        self._remember_revisions(child)
+    
+    def _fetch_revision(self, url: str) -> Dict[str, Any]:
+        """Read the current revision of a component from NiFi"""
+        return self._request("get", url)["revision"]
+    
+    def _update_component(self, component_path: str, component_id: str,
+                          component: Dict[str, Any]) -> Dict[str, Any]:
+        """PUT a component update using the cached revision"""
+        url = f"{self.base_url}/{component_path}/{component_id}"
+        return self._with_revision(
+            component_id, url,
+            lambda revision: self._request("put", url, json={"revision": revision, "component": component})
+        )
+    
+    def _delete_component(self, component_path: str, component_id: str) -> Dict[str, Any]:
+        """DELETE a component using the cached revision"""
+        url = f"{self.base_url}/{component_path}/{component_id}"
+        result = self._with_revision(
+            component_id, url,
+            lambda revision: self._request("delete", url, params={
+                "version": revision.get("version", 0),
+                "clientId": revision.get("clientId") or self._get_client_id()
+            })
+        )
+        self._revisions.pop(component_id, None)
+        return result
+    
+    def _with_revision(self, component_id: str, url: str,
+                       send: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Send a revisioned request with the cached revision, refreshing it on 409 conflicts.
+        
+        The first conflict is retried at once; further ones (up to retry_count) back off first.
+        """
+        revision = self._revisions.get(component_id) or self._fetch_revision(url)
+        
+        attempts = max(1, self.retry_count)
+        for attempt in range(attempts + 1):
+            try:
+                return send(revision)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 409 or attempt == attempts:
+                    raise
+                # Someone else (or a bulk operation) changed the component; retry with a fresh revision
+                self._revisions.pop(component_id, None)
+                if attempt:
+                    time.sleep(self._backoff(attempt - 1))
+                revision = self._fetch_revision(url)
+    
     def create_process_group(self, parent_id: str, name: str) -> Dict[str, Any]:
         """Create a new process group"""
         url = f"{self.base_url}/process-groups/{parent_id}/process-groups"
@@ -40,35 +422,35 @@ class NiFiAPIClient:
             }
         }
         
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("post", url, json=payload)
     
     def create_processor(self, process_group_id: str, processor_type: str, 
                         name: str, properties: Dict[str, str], 
-                        position: Dict[str, float] = None) -> Dict[str, Any]:
-        """Create a new processor in a process group"""
+                        position: Dict[str, float] = None,
+                        config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Create a new processor in a process group, optionally overriding its config (scheduling etc.)"""
         url = f"{self.base_url}/process-groups/{process_group_id}/processors"
         
         if position is None:
             position = {"x": 0, "y": 0}
         
+        processor_config = {
+            "properties": properties,
+            "autoTerminatedRelationships": []
+        }
+        processor_config.update(config or {})
+        
         payload = {
             "revision": {"version": 0},
             "component": {
                 "type": processor_type,
                 "name": name,
                 "position": position,
-                "config": {
-                    "properties": properties,
-                    "autoTerminatedRelationships": []
-                }
+                "config": processor_config
             }
         }
         
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("post", url, json=payload)
     
     def create_controller_service(self, process_group_id: str, service_type: str,
                                  name: str, properties: Dict[str, str]) -> Dict[str, Any]:
@@ -84,35 +466,42 @@ class NiFiAPIClient:
             }
         }
         
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("post", url, json=payload)
     
     def enable_controller_service(self, service_id: str):
         """Enable a controller service"""
+        return self._update_component("controller-services", service_id, {
+            "id": service_id,
+            "state": "ENABLED"
+        })
+    
+    def disable_controller_service(self, service_id: str) -> Dict[str, Any]:
+        """Disable a controller service whose referencing processors are stopped"""
+        return self._update_component("controller-services", service_id, {
+            "id": service_id,
+            "state": "DISABLED"
+        })
+    
+    def get_controller_service(self, service_id: str) -> Dict[str, Any]:
+        """Get a controller service, including the components referencing it"""
         url = f"{self.base_url}/controller-services/{service_id}"
-        
-        # First get the current revision
-        response = self.session.get(url)
-        response.raise_for_status()
-        current = response.json()
-        
-        # Enable the service
-        payload = {
-            "revision": current["revision"],
-            "component": {
-                "id": service_id,
-                "state": "ENABLED"
-            }
-        }
-        
-        response = self.session.put(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("get", url)
+    
+    def delete_controller_service(self, service_id: str) -> Dict[str, Any]:
+        """Delete a disabled controller service that nothing references"""
+        return self._delete_component("controller-services", service_id)
+    
+    def update_controller_service(self, service_id: str, properties: Dict[str, str]) -> Dict[str, Any]:
+        """Update properties of a (disabled) controller service"""
+        return self._update_component("controller-services", service_id, {
+            "id": service_id,
+            "properties": properties
+        })
     
     def create_connection(self, process_group_id: str, source_id: str, 
-                         destination_id: str, relationships: list) -> Dict[str, Any]:
-        """Create a connection between processors"""
+                         destination_id: str, relationships: list,
+                         options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Create a connection between processors, optionally overriding its settings (load balancing etc.)"""
         url = f"{self.base_url}/process-groups/{process_group_id}/connections"
         
         payload = {
@@ -134,36 +523,264 @@ class NiFiAPIClient:
                 "backPressureObjectThreshold": "10000"
             }
         }
+        payload["component"].update(options or {})
         
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("post", url, json=payload)
+    
+    def update_connection(self, connection_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Update the settings (back-pressure, load balancing, prioritizers) of a connection"""
+        component = dict(options)
+        component["id"] = connection_id
+        return self._update_component("connections", connection_id, component)
     
     def start_processor(self, processor_id: str):
         """Start a processor"""
-        url = f"{self.base_url}/processors/{processor_id}"
+        return self._update_component("processors", processor_id, {
+            "id": processor_id,
+            "state": "RUNNING"
+        })
+    
+    def stop_processor(self, processor_id: str):
+        """Stop a processor"""
+        return self._update_component("processors", processor_id, {
+            "id": processor_id,
+            "state": "STOPPED"
+        })
+    
+    def set_processor_run_status(self, processor_id: str, state: str) -> Dict[str, Any]:
+        """Set the run status of a processor (RUNNING, STOPPED, DISABLED or RUN_ONCE)"""
+        url = f"{self.base_url}/processors/{processor_id}/run-status"
+        return self._with_revision(
+            processor_id, f"{self.base_url}/processors/{processor_id}",
+            lambda revision: self._request("put", url, json={"revision": revision, "state": state})
+        )
+    
+    def run_processor_once(self, processor_id: str) -> Dict[str, Any]:
+        """Trigger a stopped processor exactly once; it returns to STOPPED when done"""
+        return self.set_processor_run_status(processor_id, "RUN_ONCE")
+    
+    def disable_processor(self, processor_id: str) -> Dict[str, Any]:
+        """Disable a stopped processor so process group starts leave it alone"""
+        return self.set_processor_run_status(processor_id, "DISABLED")
+    
+    def update_processor(self, processor_id: str, properties: Optional[Dict[str, str]] = None,
+                         config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Update properties and/or scheduling configuration of a stopped processor"""
+        component_config = dict(config or {})
+        if properties is not None:
+            component_config["properties"] = properties
         
-        # Get current revision
-        response = self.session.get(url)
-        response.raise_for_status()
-        current = response.json()
+        return self._update_component("processors", processor_id, {
+            "id": processor_id,
+            "config": component_config
+        })
+    
+    def delete_processor(self, processor_id: str) -> Dict[str, Any]:
+        """Delete a stopped processor that has no connections"""
+        return self._delete_component("processors", processor_id)
+    
+    def delete_process_group(self, process_group_id: str) -> Dict[str, Any]:
+        """Delete a stopped process group and everything in it"""
+        return self._delete_component("process-groups", process_group_id)
+    
+    def delete_connection(self, connection_id: str) -> Dict[str, Any]:
+        """Delete a connection with an empty queue"""
+        return self._delete_component("connections", connection_id)
+    
+    def drop_connection_queue(self, connection_id: str, timeout: float = 60.0) -> Dict[str, Any]:
+        """Drop every FlowFile queued in a connection and wait for the drop request to finish"""
+        url = f"{self.base_url}/flowfile-queues/{connection_id}/drop-requests"
+        drop_url = f"{url}/{self._request('post', url)['dropRequest']['id']}"
+        try:
+            return self._wait_for(drop_url, lambda current: current["dropRequest"].get("finished"),
+                                  f"the queue of connection {connection_id} to be dropped", timeout)
+        finally:
+            self._request("delete", drop_url)
+    
+    def move_process_group(self, process_group_id: str, parent_id: str, new_parent_id: str) -> Dict[str, Any]:
+        """Move a stopped process group under another parent group through a snippet, as the UI does"""
+        def move(revision: Dict[str, Any]) -> Dict[str, Any]:
+            snippet = self._request("post", f"{self.base_url}/snippets", json={"snippet": {
+                "parentGroupId": parent_id,
+                "processGroups": {process_group_id: revision}
+            }})["snippet"]
+            return self._request("put", f"{self.base_url}/snippets/{snippet['id']}", json={"snippet": {
+                "id": snippet["id"],
+                "parentGroupId": new_parent_id
+            }})
         
-        # Start the processor
+        result = self._with_revision(process_group_id, f"{self.base_url}/process-groups/{process_group_id}", move)
+        self._revisions.pop(process_group_id, None)
+        return result
+    
+    def schedule_process_group(self, process_group_id: str, state: str) -> Dict[str, Any]:
+        """Schedule every processor in a process group and its descendants (RUNNING or STOPPED)"""
+        url = f"{self.base_url}/flow/process-groups/{process_group_id}"
         payload = {
-            "revision": current["revision"],
-            "component": {
-                "id": processor_id,
-                "state": "RUNNING"
-            }
+            "id": process_group_id,
+            "state": state
+        }
+        
+        return self._request("put", url, json=payload)
+    
+    def start_process_group(self, process_group_id: str) -> Dict[str, Any]:
+        """Start all processors in a process group with a single request"""
+        return self.schedule_process_group(process_group_id, "RUNNING")
+    
+    def stop_process_group(self, process_group_id: str) -> Dict[str, Any]:
+        """Stop all processors in a process group with a single request"""
+        return self.schedule_process_group(process_group_id, "STOPPED")
+    
+    def activate_process_group_services(self, process_group_id: str, state: str) -> Dict[str, Any]:
+        """Enable or disable every controller service in a process group and its descendants"""
+        url = f"{self.base_url}/flow/process-groups/{process_group_id}/controller-services"
+        payload = {
+            "id": process_group_id,
+            "state": state
         }
         
-        response = self.session.put(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return self._request("put", url, json=payload)
+    
+    def enable_process_group_services(self, process_group_id: str) -> Dict[str, Any]:
+        """Enable all controller services in a process group with a single request"""
+        return self.activate_process_group_services(process_group_id, "ENABLED")
+    
+    def disable_process_group_services(self, process_group_id: str) -> Dict[str, Any]:
+        """Disable all controller services in a process group with a single request"""
+        return self.activate_process_group_services(process_group_id, "DISABLED")
+    
+    def wait_for_controller_service_state(self, service_id: str, state: str,
+                                          timeout: float = 60.0) -> Dict[str, Any]:
+        """Poll a controller service until it reaches the given state (e.g. ENABLED)"""
+        url = f"{self.base_url}/controller-services/{service_id}"
+        return self._wait_for(
+            url,
+            lambda current: current["component"].get("state") == state,
+            f"controller service {service_id} to become {state}",
+            timeout
+        )
+    
+    def wait_for_processor_state(self, processor_id: str, state: str,
+                                 timeout: float = 60.0) -> Dict[str, Any]:
+        """Poll a processor until it reaches the given state (e.g. RUNNING).
+        
+        A processor only counts as STOPPED once its last active thread has finished,
+        since NiFi rejects configuration changes until then.
+        """
+        url = f"{self.base_url}/processors/{processor_id}"
+        
+        def reached(current):
+            if current["component"].get("state") != state:
+                return False
+            if state == "STOPPED":
+                snapshot = (current.get("status") or {}).get("aggregateSnapshot") or {}
+                return not snapshot.get("activeThreadCount")
+            return True
+        
+        return self._wait_for(url, reached, f"processor {processor_id} to become {state}", timeout)
+    
+    def wait_for_process_group_drained(self, process_group_id: str, timeout: float = 60.0) -> Dict[str, Any]:
+        """Poll a process group until no FlowFiles are queued anywhere in it"""
+        url = f"{self.base_url}/flow/process-groups/{process_group_id}/status?recursive=false"
+        return self._wait_for(
+            url,
+            lambda current: not current["processGroupStatus"]["aggregateSnapshot"].get("flowFilesQueued"),
+            f"the queues of process group {process_group_id} to drain",
+            timeout
+        )
+    
+    def wait_for_process_group_services_state(self, process_group_id: str, state: str,
+                                              timeout: float = 60.0) -> Dict[str, Any]:
+        """Poll the controller services of a process group until all reach the given state"""
+        url = (f"{self.base_url}/flow/process-groups/{process_group_id}/controller-services"
+               "?includeAncestorGroups=false&includeDescendantGroups=true")
+        return self._wait_for(
+            url,
+            lambda current: all(
+                service["component"].get("state") == state
+                for service in current.get("controllerServices", [])
+            ),
+            f"controller services of process group {process_group_id} to become {state}",
+            timeout
+        )
+    
+    def _wait_for(self, url: str, condition: Callable[[Dict[str, Any]], bool],
+                  description: str, timeout: float,
+                  poll_interval: float = 0.1, max_poll_interval: float = 2.0) -> Dict[str, Any]:
+        """Poll an entity with exponential backoff until condition holds or the deadline passes"""
+        deadline = time.monotonic() + timeout
+        
+        with self._traced("wait", url):
+            while True:
+                current = self._request("get", url)
+                if condition(current):
+                    return current
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    errors = self._collect_validation_errors(current)
+                    detail = f" (validation errors: {errors})" if errors else ""
+                    raise TimeoutError(f"Timed out after {timeout}s waiting for {description}{detail}")
+                
+                time.sleep(min(poll_interval, remaining))
+                poll_interval = min(poll_interval * 2, max_poll_interval)
+    
+    @staticmethod
+    def _collect_validation_errors(entity: Dict[str, Any]) -> list:
+        """Gather validation errors from a component entity or a list of services"""
+        components = [entity.get("component", {})]
+        components.extend(service.get("component", {}) for service in entity.get("controllerServices", []))
+        errors = []
+        for component in components:
+            errors.extend(component.get("validationErrors") or [])
+        return errors
     
     def get_process_group(self, process_group_id: str) -> Dict[str, Any]:
         """Get process group details"""
         url = f"{self.base_url}/process-groups/{process_group_id}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        return self._request("get", url)
+    
+    def upload_process_group(self, parent_id: str, name: str,
+                             flow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a process group with all of its contents from a flow definition in one request"""
+        url = f"{self.base_url}/process-groups/{parent_id}/process-groups/upload"
+        form = {
+            "groupName": name,
+            "positionX": "0",
+            "positionY": "0",
+            "clientId": self._get_client_id()
+        }
+        files = {"file": ("flow.json", json.dumps(flow_definition), "application/json")}
+        
+        return self._request("post", url, data=form, files=files)
+    
+    def get_process_group_services(self, process_group_id: str) -> Dict[str, Any]:
+        """List the controller services defined directly in a process group"""
+        url = (f"{self.base_url}/flow/process-groups/{process_group_id}/controller-services"
+               "?includeAncestorGroups=false&includeDescendantGroups=false")
+        return self._request("get", url)
+    
+    def get_process_group_status(self, process_group_id: str, recursive: bool = False) -> Dict[str, Any]:
+        """Get the status (queues, 5 minute counters, run states) of a process group and, if
+        recursive, of everything beneath it in a single request"""
+        url = (f"{self.base_url}/flow/process-groups/{process_group_id}/status"
+               f"?recursive={'true' if recursive else 'false'}")
+        return self._request("get", url)
+    
+    def get_processor_state(self, processor_id: str) -> Dict[str, Any]:
+        """Get the stored state of a processor (e.g. the max values QueryDatabaseTable has seen)"""
+        url = f"{self.base_url}/processors/{processor_id}/state"
+        return self._request("get", url)
+    
+    def get_bulletin_board(self, after: Optional[int] = None, limit: Optional[int] = None,
+                           source_id: Optional[str] = None, group_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get the bulletins of the last five minutes, only those newer than bulletin id ``after``
+        and posted by component ``source_id`` or within process group ``group_id`` if given"""
+        params = {key: value for key, value in (("after", after), ("limit", limit), ("sourceId", source_id),
+                                                ("groupId", group_id)) if value is not None}
+        return self._request("get", f"{self.base_url}/flow/bulletin-board", params=params)
+    
+    def get_process_group_flow(self, process_group_id: str) -> Dict[str, Any]:
+        """Get the flow (child groups, processors, connections) of a process group"""
+        url = f"{self.base_url}/flow/process-groups/{process_group_id}"
+        return self._request("get", url)
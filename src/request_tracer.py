@@ -0,0 +1,108 @@
+import json
+import threading
+from typing import Dict, Any, List, Optional
+
+# Label of requests made outside request_context(flow=...)
+UNLABELED = "-"
+
+
+class RequestTracer:
+    """Record every NiFi request and break the time down per flow, phase and endpoint.
+
+    Pass ``tracer.hook`` in the request_hooks of NiFiAPIClient (or to add_request_hook).
+    WAIT calls are wait loops; their time includes the polls made within them.
+    """
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def hook(self):
+        """(pre, post) request hook recording completed calls"""
+        return None, self.record
+
+    def record(self, call: Dict[str, Any]):
+        with self._lock:
+            self.calls.append(dict(call))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Requests, request/wait time, retries and errors per flow, with per phase and per endpoint totals"""
+        flows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            labels = call.get("labels") or {}
+            flow = flows.setdefault(labels.get("flow", UNLABELED), {
+                "requests": 0, "request_time": 0.0, "wait_time": 0.0, "retries": 0, "errors": 0,
+                "started": call["started"], "finished": call["started"], "phases": {}, "endpoints": {}
+            })
+            flow["started"] = min(flow["started"], call["started"])
+            flow["finished"] = max(flow["finished"], call["started"] + call["elapsed"])
+
+            phase = flow["phases"].setdefault(labels.get("phase", UNLABELED),
+                                              {"requests": 0, "request_time": 0.0, "wait_time": 0.0})
+            if call["method"] == "WAIT":
+                flow["wait_time"] += call["elapsed"]
+                phase["wait_time"] += call["elapsed"]
+            else:
+                flow["requests"] += 1
+                flow["request_time"] += call["elapsed"]
+                flow["retries"] += call.get("retries") or 0
+                flow["errors"] += 1 if call.get("error") else 0
+                phase["requests"] += 1
+                phase["request_time"] += call["elapsed"]
+
+            endpoint = flow["endpoints"].setdefault(call["endpoint"], {"count": 0, "total": 0.0, "max": 0.0})
+            endpoint["count"] += 1
+            endpoint["total"] += call["elapsed"]
+            endpoint["max"] = max(endpoint["max"], call["elapsed"])
+
+        for flow in flows.values():
+            flow["elapsed"] = flow.pop("finished") - flow.pop("started")
+        return flows
+
+    def format_summary(self, top: int = 5) -> str:
+        """Human readable timing breakdown with the slowest endpoints of each flow"""
+        lines = []
+        for name, flow in sorted(self.summary().items()):
+            lines.append(f"{name}: {flow['elapsed']:.2f}s, {flow['requests']} requests ({flow['request_time']:.2f}s), "
+                         f"{flow['wait_time']:.2f}s waiting, {flow['retries']} retries, {flow['errors']} errors")
+            for phase, totals in flow["phases"].items():
+                lines.append(f"  phase {phase}: {totals['requests']} requests ({totals['request_time']:.2f}s), "
+                             f"{totals['wait_time']:.2f}s waiting")
+            slowest = sorted(flow["endpoints"].items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+            for endpoint, totals in slowest:
+                lines.append(f"  {endpoint}: {totals['count']} x avg {totals['total'] / totals['count']:.3f}s, "
+                             f"max {totals['max']:.3f}s, total {totals['total']:.2f}s")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Calls as Chrome trace events (chrome://tracing, Perfetto): one process per flow, one row per thread"""
+        with self._lock:
+            calls = list(self.calls)
+        origin = min((call["started"] for call in calls), default=0.0)
+        flow_ids: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        for call in calls:
+            labels = call.get("labels") or {}
+            flow = labels.get("flow", UNLABELED)
+            if flow not in flow_ids:
+                flow_ids[flow] = len(flow_ids) + 1
+                events.append({"name": "process_name", "ph": "M", "pid": flow_ids[flow],
+                               "args": {"name": flow}})
+            events.append({
+                "name": call["endpoint"],
+                "cat": labels.get("phase", UNLABELED),
+                "ph": "X",
+                "ts": (call["started"] - origin) * 1e6,
+                "dur": call["elapsed"] * 1e6,
+                "pid": flow_ids[flow],
+                "tid": call.get("thread", 0),
+                "args": {key: call.get(key) for key in ("url", "status", "retries", "error")}
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str, indent: Optional[int] = None):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, indent=indent)
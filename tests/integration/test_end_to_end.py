@@ -64,7 +64,7 @@ class TestEndToEndCDCFlow:
                     "component": {
                         "id": "extract-111",
                         "name": "Extract CDC Data",
-                        "type": "org.apache.nifi.processors.standard.ExecuteSQL",
+                        "type": "org.apache.nifi.processors.standard.QueryDatabaseTable",
                         "state": "RUNNING"
                     }
                 },
@@ -111,6 +111,16 @@ class TestEndToEndCDCFlow:
                     "id": "conn-999",
                     "selectedRelationships": ["success"]
                 }
+            },
+            "root_flow": {
+                "processGroupFlow": {
+                    "id": "root",
+                    "flow": {
+                        "processGroups": [
+                            {"id": "cdc-parent-001", "component": {"id": "cdc-parent-001", "name": "Test-CDC-Flows"}}
+                        ]
+                    }
+                }
             }
         }
     
@@ -134,16 +144,12 @@ class TestEndToEndCDCFlow:
             mock_session.return_value.post.side_effect = [
                 auth_response,  # Authentication
                 Mock(json=lambda: mock_api_responses["process_group"], status_code=201),  # Create process group
-                Mock(json=lambda: mock_api_responses["source_dbcp"], status_code=201),     # Create source DBCP
-                Mock(json=lambda: mock_api_responses["target_dbcp"], status_code=201),     # Create target DBCP
                 Mock(json=lambda: mock_api_responses["processors"][0], status_code=201),   # Create extract processor
                 Mock(json=lambda: mock_api_responses["processors"][1], status_code=201),   # Create convert processor
                 Mock(json=lambda: mock_api_responses["processors"][2], status_code=201),   # Create convert SQL processor
                 Mock(json=lambda: mock_api_responses["processors"][3], status_code=201),   # Create load processor
                 Mock(json=lambda: mock_api_responses["processors"][4], status_code=201),   # Create log processor
-                Mock(json=lambda: mock_api_responses["connection"], status_code=201),      # Create connections (multiple)
-                Mock(json=lambda: mock_api_responses["connection"], status_code=201),
-                Mock(json=lambda: mock_api_responses["connection"], status_code=201),
+                Mock(json=lambda: mock_api_responses["connection"], status_code=201),      # Create connections (3 success + 3 failure)
                 Mock(json=lambda: mock_api_responses["connection"], status_code=201),
                 Mock(json=lambda: mock_api_responses["connection"], status_code=201),
                 Mock(json=lambda: mock_api_responses["connection"], status_code=201),
@@ -151,20 +157,25 @@ class TestEndToEndCDCFlow:
                 Mock(json=lambda: mock_api_responses["connection"], status_code=201),
             ]
             
-            # Setup GET responses for enabling services and starting processors
+            # Shared services were already provisioned under the parent group by an earlier flow
+            shared_specs = CDCFlowBuilder(config_parser, Mock())._shared_service_specs(
+                config_parser.parse_mapping("test_mapping")
+            )
+            shared_ids = {"source_dbcp": "source-dbcp-456", "target_dbcp": "target-dbcp-789"}
+            parent_services = {"controllerServices": [
+                {"component": {"id": shared_ids.get(key, f"{key}-001"), "name": spec["name"], "state": "ENABLED"}}
+                for key, spec in shared_specs.items()
+            ]}
+            
+            # Setup GET responses for the CDC parent lookup and the shared services
             mock_session.return_value.get.side_effect = [
-                Mock(json=lambda: mock_api_responses["source_dbcp"], status_code=200),
-                Mock(json=lambda: mock_api_responses["target_dbcp"], status_code=200),
-                Mock(json=lambda: mock_api_responses["processors"][0], status_code=200),
-                Mock(json=lambda: mock_api_responses["processors"][1], status_code=200),
-                Mock(json=lambda: mock_api_responses["processors"][2], status_code=200),
-                Mock(json=lambda: mock_api_responses["processors"][3], status_code=200),
-                Mock(json=lambda: mock_api_responses["processors"][4], status_code=200),
+                Mock(json=lambda: mock_api_responses["root_flow"], status_code=200),      # Find CDC parent group
+                Mock(json=lambda: parent_services, status_code=200),                      # Find shared services
             ]
             
-            # Setup PUT responses
+            # Setup PUT response for the bulk start
             mock_session.return_value.put.return_value = Mock(
-                json=lambda: {"component": {"state": "ENABLED"}},
+                json=lambda: {"id": "cdc-pg-123", "state": "ENABLED"},
                 status_code=200
             )
             
@@ -190,8 +201,20 @@ class TestEndToEndCDCFlow:
             assert len(result["processors"]) == 5
             
             # Verify API calls were made
-            assert mock_session.return_value.post.call_count >= 9  # PG + 2 DBCP + 5 processors + connections
-            assert mock_session.return_value.put.call_count >= 7   # 2 DBCP enable + 5 processor start
+            assert mock_session.return_value.post.call_count >= 7  # PG + 5 processors + connections
+            put_urls = [c[0][0] for c in mock_session.return_value.put.call_args_list]
+            assert put_urls == ["http://test-nifi:8080/nifi-api/flow/process-groups/cdc-pg-123"]
+            assert mock_session.return_value.post.call_args_list[1][0][0] == \
+                "http://test-nifi:8080/nifi-api/process-groups/cdc-parent-001/process-groups"
+            # The fixture mapping uses cdc.mode=incremental
+            extract_payload = mock_session.return_value.post.call_args_list[2][1]["json"]
+            assert extract_payload["component"]["type"] == "org.apache.nifi.processors.standard.QueryDatabaseTable"
+            assert extract_payload["component"]["config"]["schedulingPeriod"] == "5000 ms"
+            convert_payload = mock_session.return_value.post.call_args_list[3][1]["json"]
+            assert convert_payload["component"]["config"]["properties"] == {
+                "record-reader": "record_reader-001",
+                "record-writer": "record_writer-001"
+            }
     
     def test_should_handle_configuration_errors_gracefully(self, test_env_setup):
         """Test error handling for missing configuration files"""
@@ -0,0 +1,96 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+from pathlib import Path
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from async_nifi_api_client import AsyncNiFiAPIClient
+from nifi_api_client import NiFiAPIClient
+
+
+class TestAsyncNiFiAPIClient:
+    
+    @pytest.fixture
+    def sync_client(self):
+        """Create synchronous NiFi API client without authentication"""
+        return NiFiAPIClient("http://test-nifi:8080/nifi-api")
+    
+    @pytest.fixture
+    def async_client(self, sync_client):
+        """Create async client wrapping the synchronous one"""
+        client = AsyncNiFiAPIClient.from_client(sync_client, pool_size=4)
+        yield client
+        client.close()
+    
+    def test_should_size_connection_pool_on_shared_session(self, sync_client, async_client):
+        # Act
+        adapter = sync_client.session.get_adapter("http://test-nifi:8080/nifi-api")
+        
+        # Assert
+        assert async_client.pool_size == 4
+        assert adapter._pool_maxsize == 4
+        assert async_client.base_url == "http://test-nifi:8080/nifi-api"
+    
+    def test_should_create_own_client_from_base_url(self):
+        # Act
+        client = AsyncNiFiAPIClient("http://test-nifi:8080/nifi-api/", pool_size=2)
+        client.close()
+        
+        # Assert
+        assert client.nifi_client.base_url == "http://test-nifi:8080/nifi-api"
+        assert client.pool_size == 2
+    
+    def test_should_delegate_calls_to_sync_client(self, sync_client, async_client):
+        # Arrange
+        with patch.object(sync_client, 'create_processor', return_value={"component": {"id": "p-1"}}) as mock_create:
+            # Act
+            result = asyncio.run(async_client.create_processor(
+                "pg-1", "org.apache.nifi.processors.standard.LogAttribute", "Log", {}, {"x": 1, "y": 2}
+            ))
+        
+        # Assert
+        assert result["component"]["id"] == "p-1"
+        mock_create.assert_called_once_with(
+            "pg-1", "org.apache.nifi.processors.standard.LogAttribute", "Log", {}, {"x": 1, "y": 2}, config=None
+        )
+    
+    def test_should_run_independent_calls_concurrently(self, sync_client, async_client):
+        # Arrange
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_create(process_group_id, source_id, destination_id, relationships, options=None):
+            with lock:
+                active.append(source_id)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(source_id)
+            return {"component": {"id": f"conn-{source_id}"}}
+        
+        async def create_all():
+            return await asyncio.gather(*[
+                async_client.create_connection("pg-1", f"src-{i}", "dst", ["success"])
+                for i in range(4)
+            ])
+        
+        with patch.object(sync_client, 'create_connection', side_effect=slow_create):
+            # Act
+            results = asyncio.run(create_all())
+        
+        # Assert
+        assert [r["component"]["id"] for r in results] == [f"conn-src-{i}" for i in range(4)]
+        assert max(peak) > 1
+    
+    def test_should_propagate_errors_from_sync_client(self, sync_client, async_client):
+        # Arrange
+        with patch.object(sync_client, 'enable_controller_service', side_effect=RuntimeError("boom")):
+            # Act & Assert
+            with pytest.raises(RuntimeError):
+                asyncio.run(async_client.enable_controller_service("svc-1"))
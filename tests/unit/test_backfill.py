@@ -0,0 +1,199 @@
+import pytest
+from unittest.mock import Mock, call
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from backfill import BackfillScheduler, parse_slice_duration, window_slices
+from cdc_flow_builder import CDCFlowBuilder
+from config_parser import ConfigParser
+from nifi_api_client import NiFiAPIClient
+
+
+MAPPING = {
+    "mapping.name": "Test Oracle to Oracle CDC",
+    "source.datasource": "test_source",
+    "target.datasource": "test_target",
+    "source.table": "SCOTT.EMP_1",
+    "target.table": "SCOTT.EMP_2",
+    "cdc.column": "LAST_UPDATE_TIME",
+    "cdc.incremental.from": "2025-07-07 00:00:00",
+    "cdc.incremental.to": "2025-07-07 05:00:00",
+    "cdc.window.slice": "2h",
+    "cdc.window.concurrency": "2",
+    "cdc.pipeline": "record",
+    "cdc.load.mode": "upsert"
+}
+
+
+class TestBackfillScheduler:
+
+    @pytest.fixture
+    def mock_config_parser(self):
+        """Create mock config parser returning the sliced mapping"""
+        mock_parser = Mock(spec=ConfigParser)
+        mock_parser.get_env_config.return_value = {
+            "nifi_root_process_group_id": "root",
+            "nifi_cdc_process_group_name": ""
+        }
+        mock_parser.parse_mapping.return_value = dict(MAPPING)
+        mock_parser.parse_datasource.return_value = {"db.type": "oracle"}
+        return mock_parser
+
+    @pytest.fixture
+    def mock_nifi_client(self):
+        """Create mock NiFi API client serving a deployed flow with two extract lanes"""
+        mock_client = Mock(spec=NiFiAPIClient)
+        mock_client.get_process_group_flow.side_effect = lambda pg_id: {
+            "root": {"processGroupFlow": {"flow": {"processGroups": [
+                {"id": "pg-1", "component": {"id": "pg-1", "name": "Test Oracle to Oracle CDC"}}
+            ]}}},
+            "pg-1": {"processGroupFlow": {"flow": {"processors": [
+                {"component": {"id": "lane-1", "name": "Extract CDC Data", "state": "DISABLED"}},
+                {"component": {"id": "lane-2", "name": "Extract CDC Data 2", "state": "DISABLED"}},
+                {"component": {"id": "load-1", "name": "Load to Target", "state": "RUNNING"}}
+            ]}}}
+        }[pg_id]
+        mock_client.get_process_group_services.return_value = {"controllerServices": []}
+        mock_client.get_bulletin_board.return_value = {"bulletinBoard": {"bulletins": []}}
+        return mock_client
+
+    @pytest.fixture
+    def scheduler(self, mock_config_parser, mock_nifi_client, tmp_path):
+        """Create a scheduler keeping its state in a temporary directory"""
+        return BackfillScheduler(CDCFlowBuilder(mock_config_parser, mock_nifi_client), str(tmp_path))
+
+    def test_should_parse_slice_durations(self):
+        # Act & Assert
+        assert parse_slice_duration("30m") == timedelta(minutes=30)
+        assert parse_slice_duration("1h") == timedelta(hours=1)
+        assert parse_slice_duration("2d") == timedelta(days=2)
+        with pytest.raises(ValueError, match="cdc.window.slice"):
+            parse_slice_duration("1 week")
+
+    def test_should_split_window_into_slices(self):
+        # Act
+        slices = window_slices(datetime(2025, 7, 7, 0), datetime(2025, 7, 7, 5), timedelta(hours=2))
+
+        # Assert
+        assert slices == [
+            (datetime(2025, 7, 7, 0), datetime(2025, 7, 7, 2)),
+            (datetime(2025, 7, 7, 2), datetime(2025, 7, 7, 4)),
+            (datetime(2025, 7, 7, 4), datetime(2025, 7, 7, 5))
+        ]
+
+    def test_should_run_each_slice_once_on_a_lane(self, scheduler, mock_nifi_client, tmp_path):
+        # Act
+        summary = scheduler.run("test_mapping")
+
+        # Assert
+        assert summary == {"mapping": "test_mapping", "slices": 3, "skipped": 0, "finished": 3, "failed": []}
+        assert mock_nifi_client.run_processor_once.call_count == 3
+        assert {c[0][0] for c in mock_nifi_client.run_processor_once.call_args_list} <= {"lane-1", "lane-2"}
+
+        queries = sorted(c[0][1]["SQL select query"] for c in mock_nifi_client.update_processor.call_args_list)
+        assert "LAST_UPDATE_TIME < TO_TIMESTAMP('2025-07-07 02:00:00'" in queries[0]
+        assert "LAST_UPDATE_TIME <= TO_TIMESTAMP('2025-07-07 05:00:00'" in queries[2]
+
+        # Lanes are only enabled for the duration of the backfill
+        mock_nifi_client.set_processor_run_status.assert_has_calls(
+            [call("lane-1", "STOPPED"), call("lane-2", "STOPPED")]
+        )
+        mock_nifi_client.disable_processor.assert_has_calls([call("lane-1"), call("lane-2")])
+        mock_nifi_client.wait_for_process_group_drained.assert_called_with("pg-1", scheduler.slice_timeout)
+
+        state = json.loads((tmp_path / "test_mapping.json").read_text())
+        assert len(state["finished"]) == 3
+
+    def test_should_resume_after_last_finished_slice(self, scheduler, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.run_processor_once.side_effect = [None, RuntimeError("NiFi unavailable"), None]
+        first = scheduler.run("test_mapping")
+        mock_nifi_client.run_processor_once.reset_mock(side_effect=True)
+
+        # Act
+        second = scheduler.run("test_mapping")
+
+        # Assert
+        assert first["finished"] == 2 and len(first["failed"]) == 1
+        assert second == {"mapping": "test_mapping", "slices": 3, "skipped": 2, "finished": 1, "failed": []}
+        mock_nifi_client.run_processor_once.assert_called_once()
+
+    def test_should_start_over_when_window_changes(self, scheduler, mock_config_parser, mock_nifi_client):
+        # Arrange
+        scheduler.run("test_mapping")
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.window.slice": "1h"})
+        mock_nifi_client.run_processor_once.reset_mock()
+
+        # Act
+        summary = scheduler.run("test_mapping")
+
+        # Assert
+        assert summary["skipped"] == 0
+        assert mock_nifi_client.run_processor_once.call_count == 5
+
+    def test_should_require_slicing_configuration(self, scheduler, mock_config_parser):
+        # Arrange
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.window.slice": ""})
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            scheduler.run("test_mapping")
+    
+    def test_should_reject_multi_table_mapping(self, scheduler, mock_config_parser):
+        # Arrange
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"table.emp.source": "SCOTT.EMP"})
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="single-table"):
+            scheduler.run("test_mapping")
+
+    def test_should_fail_slices_with_error_bulletins(self, scheduler, mock_nifi_client, tmp_path):
+        # Arrange: the load stage rejects the rows of every slice
+        mock_nifi_client.get_bulletin_board.side_effect = lambda after=None, **kwargs: {"bulletinBoard": {
+            "bulletins": [{"id": 10, "sourceId": "load-1", "bulletin": {
+                "level": "ERROR", "sourceName": "Load to Target", "message": "ORA-00001"
+            }}] if after is not None else [{"id": 9, "sourceId": "load-1"}]
+        }}
+
+        # Act
+        summary = scheduler.run("test_mapping")
+
+        # Assert
+        assert summary["finished"] == 0 and len(summary["failed"]) == 3
+        mock_nifi_client.get_bulletin_board.assert_any_call(after=9, group_id="pg-1")
+        assert not (tmp_path / "test_mapping.json").exists()
+
+    def test_should_ignore_bulletins_of_other_lanes_and_warnings(self, scheduler, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.get_bulletin_board.return_value = {"bulletinBoard": {"bulletins": [
+            {"id": 12, "sourceId": "lane-2", "bulletin": {"level": "ERROR", "message": "ORA-00942"}},
+            {"id": 13, "sourceId": "lane-1", "bulletin": {"level": "WARNING", "message": "slow"}}
+        ]}}
+        window_slice = (datetime(2025, 7, 7, 0), datetime(2025, 7, 7, 2))
+
+        # Act & Assert
+        scheduler.run_slice("lane-1", dict(MAPPING), window_slice, group_id="pg-1", lanes=["lane-1", "lane-2"])
+        with pytest.raises(RuntimeError, match="ORA-00942"):
+            scheduler.run_slice("lane-2", dict(MAPPING), window_slice, group_id="pg-1",
+                                lanes=["lane-1", "lane-2"])
+
+    def test_should_stop_lanes_before_disabling_them(self, scheduler, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.disable_processor.side_effect = [RuntimeError("lane-1 is still running"), None]
+
+        # Act
+        summary = scheduler.run("test_mapping")
+
+        # Assert: a lane that cannot be disabled does not hide the summary
+        assert summary["finished"] == 3
+        lane_calls = [c for c in mock_nifi_client.method_calls if c[1][:1] == ("lane-2",)]
+        assert [c[0] for c in lane_calls[-3:]] == [
+            "set_processor_run_status", "wait_for_processor_state", "disable_processor"
+        ]
+        assert lane_calls[-2] == call.wait_for_processor_state("lane-2", "STOPPED", scheduler.slice_timeout)
+        mock_nifi_client.disable_processor.assert_has_calls([call("lane-1"), call("lane-2")])
@@ -1,7 +1,11 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock, call
+from unittest.mock import Mock, AsyncMock, patch, MagicMock, call
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import asyncio
+import json
 import sys
+import requests
 
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
@@ -9,6 +13,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 from cdc_flow_builder import CDCFlowBuilder
 from config_parser import ConfigParser
 from nifi_api_client import NiFiAPIClient
+from async_nifi_api_client import AsyncNiFiAPIClient
+from flow_definition import component_identifier
 
 
 class TestCDCFlowBuilder:
@@ -79,10 +85,13 @@ class TestCDCFlowBuilder:
             "component": {"id": "test-pg-123", "name": "Test CDC Flow"}
         }
         
-        mock_client.create_controller_service.side_effect = [
-            {"component": {"id": "source-dbcp-456", "name": "test_source_DBCP"}},
-            {"component": {"id": "target-dbcp-789", "name": "test_target_DBCP"}}
-        ]
+        service_ids = {"test_source_DBCP": "source-dbcp-456", "test_target_DBCP": "target-dbcp-789"}
+        mock_client.create_controller_service.side_effect = lambda pg, service_type, name, properties: {
+            "component": {"id": service_ids.get(name, service_type.rsplit(".", 1)[-1]), "name": name}
+        }
+        
+        # No shared record services exist yet
+        mock_client.get_process_group_services.return_value = {"controllerServices": []}
         
         mock_client.create_processor.side_effect = [
             {"component": {"id": "extract-proc-111", "name": "Extract CDC Data"}},
@@ -96,6 +105,14 @@ class TestCDCFlowBuilder:
             "component": {"id": "conn-666"}
         }
         
+        # Existing CDC parent group under root
+        mock_client.get_process_group_flow.return_value = {
+            "processGroupFlow": {"flow": {"processGroups": [
+                {"id": "other-pg-000", "component": {"id": "other-pg-000", "name": "Other Flows"}},
+                {"id": "cdc-parent-001", "component": {"id": "cdc-parent-001", "name": "CDC-Flows"}}
+            ]}}
+        }
+        
         return mock_client
     
     @pytest.fixture
@@ -114,11 +131,19 @@ class TestCDCFlowBuilder:
         assert result["target_dbcp"]["id"] == "target-dbcp-789"
         assert len(result["processors"]) == 5
         
-        # Verify process group creation
-        mock_nifi_client.create_process_group.assert_called_once_with("root", "Test Oracle to Oracle CDC")
+        # Verify process group creation under the CDC parent group
+        mock_nifi_client.create_process_group.assert_called_once_with("cdc-parent-001", "Test Oracle to Oracle CDC")
         
-        # Verify controller services creation
-        assert mock_nifi_client.create_controller_service.call_count == 2
+        # Verify controller services creation: all shared under the parent group
+        created = [(c[0][0], c[0][1]) for c in mock_nifi_client.create_controller_service.call_args_list]
+        assert created == [
+            ("cdc-parent-001", "org.apache.nifi.dbcp.DBCPConnectionPool"),
+            ("cdc-parent-001", "org.apache.nifi.dbcp.DBCPConnectionPool"),
+            ("cdc-parent-001", "org.apache.nifi.avro.AvroReader"),
+            ("cdc-parent-001", "org.apache.nifi.json.JsonRecordSetWriter")
+        ]
+        convert_call = mock_nifi_client.create_processor.call_args_list[1]
+        assert convert_call[0][3] == {"record-reader": "AvroReader", "record-writer": "JsonRecordSetWriter"}
         
         # Verify processors creation
         assert mock_nifi_client.create_processor.call_count == 5
@@ -126,8 +151,9 @@ class TestCDCFlowBuilder:
         # Verify connections creation (3 success + 4 failure connections)
         assert mock_nifi_client.create_connection.call_count == 7
         
-        # Verify processors started
-        assert mock_nifi_client.start_processor.call_count == 5
+        # Verify processors started with one bulk request
+        mock_nifi_client.start_process_group.assert_called_once_with("test-pg-123")
+        mock_nifi_client.start_processor.assert_not_called()
     
     def test_should_create_cdc_process_group(self, flow_builder, mock_nifi_client):
         # Act
@@ -135,11 +161,46 @@ class TestCDCFlowBuilder:
         
         # Assert
         assert result["id"] == "test-pg-123"
-        mock_nifi_client.create_process_group.assert_called_with("root", "Test Group")
+        mock_nifi_client.get_process_group_flow.assert_called_once_with("root")
+        mock_nifi_client.create_process_group.assert_called_with("cdc-parent-001", "Test Group")
+    
+    def test_should_create_cdc_parent_group_when_missing(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.get_process_group_flow.return_value = {
+            "processGroupFlow": {"flow": {"processGroups": []}}
+        }
+        mock_nifi_client.create_process_group.side_effect = [
+            {"component": {"id": "cdc-parent-new", "name": "CDC-Flows"}},
+            {"component": {"id": "test-pg-123", "name": "Group A"}},
+            {"component": {"id": "test-pg-124", "name": "Group B"}}
+        ]
+        
+        # Act
+        flow_builder._create_cdc_process_group("Group A")
+        flow_builder._create_cdc_process_group("Group B")
+        
+        # Assert
+        assert mock_nifi_client.create_process_group.call_args_list == [
+            call("root", "CDC-Flows"),
+            call("cdc-parent-new", "Group A"),
+            call("cdc-parent-new", "Group B")
+        ]
+        mock_nifi_client.get_process_group_flow.assert_called_once()
+    
+    def test_should_create_flows_under_root_without_parent_group_name(self, flow_builder, mock_nifi_client):
+        # Arrange
+        flow_builder.env_config["nifi_cdc_process_group_name"] = ""
+        
+        # Act
+        flow_builder._create_cdc_process_group("Test Group")
+        
+        # Assert
+        mock_nifi_client.get_process_group_flow.assert_not_called()
+        mock_nifi_client.create_process_group.assert_called_once_with("root", "Test Group")
     
     def test_should_create_dbcp_service_with_correct_properties(self, flow_builder, mock_config_parser, mock_nifi_client):
         # Arrange
-        db_config = {
+        mock_config_parser.parse_datasource.side_effect = lambda name: {
             "db.username": "scott",
             "db.password": "tiger",
             "oracle.driver.class": "oracle.jdbc.OracleDriver",
@@ -147,22 +208,110 @@ class TestCDCFlowBuilder:
         }
         
         # Act
-        result = flow_builder._create_dbcp_service("test-pg-123", "Test DBCP", db_config)
+        specs = flow_builder._dbcp_service_specs({"source.datasource": "test_source",
+                                                  "target.datasource": "test_target"})
         
         # Assert
-        mock_nifi_client.create_controller_service.assert_called_once()
-        call_args = mock_nifi_client.create_controller_service.call_args
-        
-        assert call_args[0][0] == "test-pg-123"
-        assert call_args[0][1] == "org.apache.nifi.dbcp.DBCPConnectionPool"
-        assert call_args[0][2] == "Test DBCP"
+        assert specs["source_dbcp"]["type"] == "org.apache.nifi.dbcp.DBCPConnectionPool"
+        assert specs["source_dbcp"]["name"] == "test_source_DBCP"
+        assert specs["target_dbcp"]["name"] == "test_target_DBCP"
         
-        properties = call_args[0][3]
+        properties = specs["source_dbcp"]["properties"]
         assert properties["Database User"] == "scott"
         assert properties["Password"] == "tiger"
         assert properties["Database Driver Class Name"] == "oracle.jdbc.OracleDriver"
         assert properties["Max Total Connections"] == "20"
     
+    def test_should_pass_all_pool_settings_to_dbcp(self, flow_builder):
+        # Arrange
+        db_config = {
+            "db.type": "oracle",
+            "db.pool.size": "20",
+            "db.pool.max.idle": "10",
+            "db.pool.min.idle": "2",
+            "db.pool.max.wait": "30000",
+            "db.pool.max.lifetime": "4 hours"
+        }
+        
+        # Act
+        properties = flow_builder._dbcp_pool_properties(db_config)
+        
+        # Assert
+        assert properties == {
+            "Max Total Connections": "20",
+            "dbcp-max-idle-conns": "10",
+            "dbcp-min-idle-conns": "2",
+            "Max Wait Time": "30000 millis",
+            "Validation-query": "SELECT 1 FROM DUAL",
+            "dbcp-time-between-eviction-runs": "5 mins",
+            "dbcp-min-evictable-idle-time": "30 mins",
+            "dbcp-max-conn-lifetime": "4 hours"
+        }
+    
+    def test_should_default_pool_settings_per_database_type(self, flow_builder):
+        # Act
+        mysql = flow_builder._dbcp_pool_properties({"db.type": "mysql", "db.pool.size": "8"})
+        generic = flow_builder._dbcp_pool_properties({"db.type": "db2"})
+        
+        # Assert
+        assert mysql["Validation-query"] == "SELECT 1"
+        assert mysql["dbcp-max-conn-lifetime"] == "7 hours"
+        assert mysql["dbcp-max-idle-conns"] == "8"
+        assert generic == {"Max Total Connections": "10", "dbcp-max-idle-conns": "10"}
+    
+    @pytest.mark.parametrize("key,value", [
+        ("db.pool.size", "ten"),
+        ("db.pool.max.idle", "50"),
+        ("db.pool.min.idle", "20"),
+        ("db.pool.max.wait", "30 fortnights")
+    ])
+    def test_should_reject_invalid_pool_settings(self, flow_builder, key, value):
+        # Act & Assert
+        with pytest.raises(ValueError, match=key):
+            flow_builder._dbcp_pool_properties({"db.type": "oracle", "db.pool.size": "10", key: value})
+    
+    def test_should_use_dialect_of_postgresql_datasources(self, flow_builder, mock_config_parser):
+        # Arrange
+        postgresql = {
+            "db.type": "postgresql",
+            "db.username": "cdc",
+            "db.password": "secret",
+            "db.driver.locations": "/opt/nifi/drivers/postgresql.jar"
+        }
+        mock_config_parser.parse_datasource.side_effect = lambda name: dict(postgresql)
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{"cdc.pipeline": "record"})
+        
+        # Act
+        dbcp = flow_builder._dbcp_service_properties(postgresql)
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Assert
+        assert dbcp["Database Driver Class Name"] == "org.postgresql.Driver"
+        assert dbcp["database-driver-locations"] == "/opt/nifi/drivers/postgresql.jar"
+        assert dbcp["Validation-query"] == "SELECT 1"
+        query = specs["extract"]["properties"]["SQL select query"]
+        assert "LAST_UPDATE_TIME >= TIMESTAMP '2025-07-07 15:00:00'" in query
+        assert "TO_TIMESTAMP" not in query
+        assert specs["load"]["properties"]["db-type"] == "PostgreSQL"
+    
+    def test_should_validate_mappings_without_calling_nifi(self, flow_builder, mock_config_parser, mock_nifi_client):
+        # Arrange
+        valid = mock_config_parser.parse_mapping("test_mapping")
+        mock_config_parser.validate_mapping.side_effect = lambda name: ["cdc.batch.size must be a whole number"] \
+            if name == "bad_file" else []
+        mock_config_parser.parse_mapping.side_effect = lambda name: dict(valid, **{"cdc.pipeline": "bulk"}) \
+            if name == "bad_pipeline" else dict(valid)
+        
+        # Act
+        errors = flow_builder.validate_mappings(["good", "bad_file", "bad_pipeline"])
+        
+        # Assert
+        assert errors == {
+            "bad_file": ["cdc.batch.size must be a whole number"],
+            "bad_pipeline": ["Unsupported cdc.pipeline: bulk (expected one of sql, record)"]
+        }
+        assert mock_nifi_client.mock_calls == []
+    
     def test_should_create_cdc_processors_with_correct_configuration(self, flow_builder, mock_nifi_client):
         # Arrange
         mapping_config = {
@@ -223,6 +372,589 @@ class TestCDCFlowBuilder:
                         if call[0][3] == ["failure"]]
         assert len(failure_calls) == 4
     
+    def test_should_create_record_pipeline_when_selected(self, flow_builder, mock_config_parser, mock_nifi_client):
+        # Arrange
+        mock_config_parser.parse_mapping.return_value["cdc.pipeline"] = "record"
+        mock_nifi_client.create_processor.side_effect = [
+            {"component": {"id": "extract-proc-111", "name": "Extract CDC Data"}},
+            {"component": {"id": "load-proc-444", "name": "Load to Target",
+                           "type": "org.apache.nifi.processors.standard.PutDatabaseRecord"}},
+            {"component": {"id": "log-proc-555", "name": "Log Errors"}}
+        ]
+        
+        # Act
+        result = flow_builder.create_cdc_flow("test_mapping")
+        
+        # Assert
+        assert set(result["processors"]) == {"extract", "load", "log_error"}
+        
+        extract_call, load_call, _ = mock_nifi_client.create_processor.call_args_list
+        assert extract_call[0][1] == "org.apache.nifi.processors.standard.ExecuteSQLRecord"
+        assert extract_call[0][3]["esqlrecord-record-writer"] == "AvroRecordSetWriter"
+        assert load_call[0][1] == "org.apache.nifi.processors.standard.PutDatabaseRecord"
+        assert load_call[0][3]["put-db-record-record-reader"] == "AvroReader"
+        assert load_call[0][3]["put-db-record-dcbp-service"] == "target-dbcp-789"
+        assert load_call[0][3]["put-db-record-schema-name"] == "SCOTT"
+        assert load_call[0][3]["put-db-record-table-name"] == "EMP_2"
+        assert load_call[0][3]["db-type"] == "Oracle 12+"
+        assert load_call[1]["config"] == {"autoTerminatedRelationships": ["success"]}
+        
+        connections = [(c[0][1], c[0][2], c[0][3]) for c in mock_nifi_client.create_connection.call_args_list]
+        assert connections == [
+            ("extract-proc-111", "load-proc-444", ["success"]),
+            ("extract-proc-111", "log-proc-555", ["failure"]),
+            ("load-proc-444", "log-proc-555", ["failure"]),
+            ("load-proc-444", "load-proc-444", ["retry"])
+        ]
+    
+    def test_should_upsert_into_target_on_key_columns(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.pipeline": "record",
+            "cdc.load.mode": "upsert",
+            "cdc.load.key.columns": "EMP_ID, DEPT_ID"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Assert
+        load_properties = specs["load"]["properties"]
+        assert load_properties["put-db-record-statement-type"] == "UPSERT"
+        assert load_properties["put-db-record-update-keys"] == "EMP_ID,DEPT_ID"
+        assert load_properties["db-type"] == "Oracle 12+"
+    
+    def test_should_reject_upsert_that_cannot_be_generated(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{"cdc.load.mode": "upsert"})
+        mock_config_parser.parse_datasource.side_effect = lambda name: {"db.type": "db2"}
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="cdc.pipeline=record"):
+            flow_builder._cdc_processor_specs(mapping_config, {})
+        with pytest.raises(ValueError, match="db2"):
+            flow_builder._cdc_processor_specs(dict(mapping_config, **{"cdc.pipeline": "record"}), {})
+        with pytest.raises(ValueError, match="cdc.load.mode"):
+            flow_builder._cdc_processor_specs(dict(mapping_config, **{"cdc.load.mode": "merge"}), {})
+    
+    def test_should_extract_only_mapped_columns(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "column.EMP_ID": "",
+            "column.ENAME": "EMP_NAME",
+            "column.LAST_UPDATE_TIME": ""
+        })
+        
+        # Act
+        window_specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        incremental_specs = flow_builder._cdc_processor_specs(dict(mapping_config, **{"cdc.mode": "incremental"}), {})
+        
+        # Assert
+        query = window_specs["extract"]["properties"]["SQL select query"]
+        assert "SELECT EMP_ID, ENAME AS EMP_NAME, LAST_UPDATE_TIME FROM SCOTT.EMP_1" in query
+        assert incremental_specs["extract"]["properties"]["Columns to Return"] == \
+            "EMP_ID, ENAME AS EMP_NAME, LAST_UPDATE_TIME"
+    
+    def test_should_require_unchanged_cdc_column_for_incremental_projection(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.mode": "incremental",
+            "column.EMP_ID": ""
+        })
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="LAST_UPDATE_TIME"):
+            flow_builder._cdc_processor_specs(mapping_config, {})
+    
+    def test_should_derive_reader_schema_from_typed_columns(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.record.schema.access": "schema-text-property",
+            "column.EMP_ID": "EMP_ID:INTEGER",
+            "column.ENAME": "EMP_NAME:VARCHAR2(50)"
+        })
+        
+        # Act
+        reader = flow_builder._record_service_specs(mapping_config)["record_reader"]
+        
+        # Assert
+        schema = json.loads(reader["properties"]["schema-text"])
+        assert [field["name"] for field in schema["fields"]] == ["EMP_ID", "EMP_NAME"]
+    
+    def test_should_reject_unknown_pipeline_profile(self, flow_builder, mock_config_parser):
+        # Arrange
+        mock_config_parser.parse_mapping.return_value["cdc.pipeline"] = "bulk"
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="cdc.pipeline"):
+            flow_builder.create_cdc_flow("test_mapping")
+    
+    def test_should_poll_incrementally_with_query_database_table(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.mode": "incremental",
+            "cdc.polling.interval": "5000"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {"source_dbcp": "source-dbcp-456"})
+        connections = flow_builder._processor_connection_specs(specs)
+        
+        # Assert
+        extract = specs["extract"]
+        assert extract["type"] == "org.apache.nifi.processors.standard.QueryDatabaseTable"
+        assert extract["properties"] == {
+            "Database Connection Pooling Service": "source-dbcp-456",
+            "db-fetch-db-type": "Oracle 12+",
+            "Table Name": "SCOTT.EMP_1",
+            "Maximum-value Columns": "LAST_UPDATE_TIME",
+            "qdbt-max-rows": "1000",
+            "initial.maxvalue.LAST_UPDATE_TIME": "2025-07-07 15:00:00"
+        }
+        assert extract["config"] == {"schedulingPeriod": "5000 ms", "executionNode": "PRIMARY"}
+        # QueryDatabaseTable has no failure relationship
+        assert ("extract", "log_error", ["failure"], {}) not in connections
+        assert ("extract", "convert", ["success"], {}) in connections
+    
+    def test_should_poll_incrementally_into_record_pipeline(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.mode": "incremental",
+            "cdc.pipeline": "record"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {"record_writer": "writer-001"})
+        
+        # Assert
+        assert specs["extract"]["type"] == "org.apache.nifi.processors.standard.QueryDatabaseTableRecord"
+        assert specs["extract"]["properties"]["qdbtr-record-writer"] == "writer-001"
+        assert specs["extract"]["config"]["schedulingPeriod"] == "5000 ms"
+        with pytest.raises(ValueError, match="cdc.mode"):
+            flow_builder._cdc_processor_specs(dict(mapping_config, **{"cdc.mode": "stream"}), {})
+    
+    def test_should_fan_out_partitioned_extract(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.pipeline": "record",
+            "cdc.partition.column": "EMP_ID",
+            "cdc.partition.size": "50000"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {"source_dbcp": "source-dbcp-456",
+                                                                   "record_writer": "writer-001"})
+        connections = flow_builder._processor_connection_specs(specs)
+        
+        # Assert
+        generate = specs["generate"]
+        assert generate["type"] == "org.apache.nifi.processors.standard.GenerateTableFetch"
+        assert generate["properties"]["gen-table-fetch-partition-size"] == "50000"
+        assert generate["properties"]["gen-table-column-for-val-partitioning"] == "EMP_ID"
+        assert "LAST_UPDATE_TIME >= TO_TIMESTAMP('2025-07-07 15:00:00'" in generate["properties"]["db-fetch-where-clause"]
+        # The window is fetched once; later runs only page rows past the max value
+        assert generate["properties"]["Maximum-value Columns"] == "LAST_UPDATE_TIME"
+        assert generate["config"] == {"executionNode": "PRIMARY"}
+        
+        extract = specs["extract"]
+        assert extract["type"] == "org.apache.nifi.processors.standard.ExecuteSQLRecord"
+        assert "SQL select query" not in extract["properties"]
+        assert extract["config"]["concurrentlySchedulableTaskCount"] > 1
+        
+        assert connections[:2] == [
+            ("generate", "extract", ["success"], {"loadBalanceStrategy": "ROUND_ROBIN"}),
+            ("extract", "load", ["success"], {})
+        ]
+        assert ("generate", "log_error", ["failure"], {}) in connections
+    
+    def test_should_tune_processor_scheduling_per_stage(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.load.concurrency": "8",
+            "cdc.load.run.duration": "25",
+            "cdc.load.yield": "5 sec",
+            "cdc.convert.sql.schedule": "0 0/5 * * * ?",
+            "cdc.convert.sql.schedule.strategy": "cron_driven",
+            "cdc.log.error.penalty": "10 sec"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Assert
+        assert specs["load"]["config"] == {
+            "concurrentlySchedulableTaskCount": 8,
+            "runDurationMillis": 25,
+            "yieldDuration": "5 sec"
+        }
+        assert specs["convert_sql"]["config"] == {
+            "schedulingPeriod": "0 0/5 * * * ?",
+            "schedulingStrategy": "CRON_DRIVEN"
+        }
+        assert specs["log_error"]["config"] == {
+            "autoTerminatedRelationships": ["success"],
+            "penaltyDuration": "10 sec"
+        }
+        assert "config" not in specs["convert"]
+    
+    def test_should_let_stage_tuning_override_defaults(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.mode": "incremental",
+            "cdc.partition.size": "50000",
+            "cdc.extract.concurrency": "2",
+            "cdc.generate.schedule": "1 min"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Assert
+        assert specs["extract"]["config"] == {"concurrentlySchedulableTaskCount": 2}
+        assert specs["generate"]["config"]["schedulingPeriod"] == "1 min"
+        assert specs["generate"]["config"]["executionNode"] == "PRIMARY"
+    
+    @pytest.mark.parametrize("key,value", [
+        ("cdc.load.concurrency", "0"),
+        ("cdc.load.run.duration", "fast"),
+        ("cdc.load.schedule.strategy", "EVENT_DRIVEN"),
+        ("cdc.extract.execution.node", "SOME")
+    ])
+    def test_should_reject_invalid_stage_tuning(self, flow_builder, mock_config_parser, key, value):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{key: value})
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match=key):
+            flow_builder._cdc_processor_specs(mapping_config, {})
+    
+    def test_should_tune_connections_per_flow_and_stage(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.connection.backpressure.count": "50000",
+            "cdc.connection.backpressure.size": "4 GB",
+            "cdc.extract.connection.load.balance": "partition-by-attribute",
+            "cdc.extract.connection.load.balance.attribute": "partition.id",
+            "cdc.extract.connection.load.balance.compression": "compress_attributes_only",
+            "cdc.load.connection.prioritizers": "OldestFlowFileFirstPrioritizer, com.example.Custom"
+        })
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Act
+        connections = {
+            (source, destination): options
+            for source, destination, _, options in flow_builder._processor_connection_specs(specs, mapping_config)
+        }
+        
+        # Assert
+        assert connections[("extract", "convert")] == {
+            "backPressureObjectThreshold": 50000,
+            "backPressureDataSizeThreshold": "4 GB",
+            "loadBalanceStrategy": "PARTITION_BY_ATTRIBUTE",
+            "loadBalancePartitionAttribute": "partition.id",
+            "loadBalanceCompression": "COMPRESS_ATTRIBUTES_ONLY"
+        }
+        assert connections[("convert", "convert_sql")] == {
+            "backPressureObjectThreshold": 50000,
+            "backPressureDataSizeThreshold": "4 GB"
+        }
+        assert connections[("load", "log_error")]["prioritizers"] == [
+            "org.apache.nifi.prioritizer.OldestFlowFileFirstPrioritizer",
+            "com.example.Custom"
+        ]
+    
+    def test_should_reject_partitioning_without_attribute(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.connection.load.balance": "PARTITION_BY_ATTRIBUTE"
+        })
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="load.balance.attribute"):
+            flow_builder._processor_connection_specs(specs, mapping_config)
+        with pytest.raises(ValueError, match="cdc.connection.load.balance"):
+            flow_builder._processor_connection_specs(
+                specs, dict(mapping_config, **{"cdc.connection.load.balance": "RANDOM"})
+            )
+    
+    def test_should_create_disabled_backfill_lanes(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.window.slice": "1h",
+            "cdc.window.concurrency": "3",
+            "cdc.pipeline": "record",
+            "cdc.load.mode": "upsert"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {"source_dbcp": "source-dbcp-456"})
+        connections = flow_builder._processor_connection_specs(specs)
+        
+        # Assert
+        lanes = [key for key in specs if key.startswith("extract")]
+        assert lanes == ["extract", "extract_2", "extract_3"]
+        assert flow_builder.backfill_lane_names(mapping_config) == [
+            "Extract CDC Data", "Extract CDC Data 2", "Extract CDC Data 3"
+        ]
+        assert all(specs[key]["state"] == "DISABLED" for key in lanes)
+        assert all(specs[key]["type"] == "org.apache.nifi.processors.standard.ExecuteSQLRecord" for key in lanes)
+        for key in lanes:
+            assert (key, "load", ["success"], {}) in connections
+            assert (key, "log_error", ["failure"], {}) in connections
+    
+    def test_should_run_insert_backfills_one_slice_at_a_time(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{"cdc.window.slice": "1h"})
+        
+        # Act
+        lane_names = flow_builder.backfill_lane_names(mapping_config)
+        
+        # Assert
+        assert lane_names == ["Extract CDC Data"]
+        with pytest.raises(ValueError, match="cdc.window.concurrency > 1 requires cdc.load.mode=upsert"):
+            flow_builder.backfill_lane_names(dict(mapping_config, **{"cdc.window.concurrency": "2"}))
+    
+    def test_should_reject_slicing_of_multi_table_or_partitioned_mappings(self, flow_builder, mock_config_parser):
+        # Arrange
+        sliced = dict(mock_config_parser.parse_mapping("test_mapping"), **{"cdc.window.slice": "1h"})
+        mock_config_parser.validate_mapping.return_value = []
+        mock_config_parser.parse_mapping.side_effect = lambda name: {
+            "multi_table": dict(sliced, **{"table.dept.source": "SCOTT.DEPT"}),
+            "partitioned": dict(sliced, **{"cdc.partition.size": "50000"}),
+            "bad_slice": dict(sliced, **{"cdc.window.slice": "1x"})
+        }[name]
+        
+        # Act
+        errors = flow_builder.validate_mappings(["multi_table", "partitioned", "bad_slice"])
+        
+        # Assert
+        assert errors == {
+            "multi_table": ["cdc.window.slice is only supported for single-table mappings"],
+            "partitioned": ["cdc.window.slice cannot be combined with cdc.partition.column/cdc.partition.size"],
+            "bad_slice": ["Invalid cdc.window.slice: '1x' (expected e.g. 30m, 1h, 1d)"]
+        }
+    
+    def test_should_partition_incremental_extract_by_high_water_mark(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.mode": "incremental",
+            "cdc.partition.size": "50000"
+        })
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, {})
+        
+        # Assert
+        properties = specs["generate"]["properties"]
+        assert properties["Maximum-value Columns"] == "LAST_UPDATE_TIME"
+        assert properties["initial.maxvalue.LAST_UPDATE_TIME"] == "2025-07-07 15:00:00"
+        assert "db-fetch-where-clause" not in properties
+        assert "gen-table-column-for-val-partitioning" not in properties
+        assert specs["generate"]["config"]["schedulingPeriod"] == "5000 ms"
+        assert specs["extract"]["type"] == "org.apache.nifi.processors.standard.ExecuteSQL"
+        assert list(specs) == ["generate", "extract", "convert", "convert_sql", "load", "log_error"]
+    
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {"cdc.mode": "incremental"},
+        {"cdc.partition.size": "50000"}
+    ])
+    def test_should_reference_required_services_in_sql_pipeline(self, flow_builder, mock_config_parser, overrides):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **overrides)
+        service_ids = {key: f"{key}-id" for key in flow_builder._shared_service_specs(mapping_config)}
+        required = {
+            "GenerateTableFetch": ["Database Connection Pooling Service"],
+            "ExecuteSQL": ["Database Connection Pooling Service"],
+            "QueryDatabaseTable": ["Database Connection Pooling Service"],
+            "ConvertRecord": ["record-reader", "record-writer"],
+            "ConvertJSONToSQL": ["JDBC Connection Pool"],
+            "PutSQL": ["JDBC Connection Pool"],
+            "LogAttribute": []
+        }
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, service_ids)
+        
+        # Assert
+        for key, spec in specs.items():
+            for name in required[spec["type"].rsplit(".", 1)[-1]]:
+                assert spec["properties"].get(name) in service_ids.values(), f"{key}: {name}"
+        assert specs["convert_sql"]["properties"]["JDBC Connection Pool"] == "target_dbcp-id"
+    
+    def test_should_split_multi_table_mapping_into_table_configs(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "column.EMPNO": "EMP_ID",
+            "table.emp.source": "SCOTT.EMP",
+            "table.emp.target": "SCOTT.EMP_COPY",
+            "table.dept.source": "SCOTT.DEPT",
+            "table.dept.cdc.batch.size": "200",
+            "table.dept.column.DEPTNO": ""
+        })
+        
+        # Act
+        tables = flow_builder._table_configs(mapping_config)
+        
+        # Assert
+        assert list(tables) == ["emp", "dept"]
+        assert tables["emp"]["source.table"] == "SCOTT.EMP"
+        assert tables["emp"]["target.table"] == "SCOTT.EMP_COPY"
+        assert tables["emp"]["column.EMPNO"] == "EMP_ID"
+        assert tables["dept"]["target.table"] == "SCOTT.DEPT"
+        assert tables["dept"]["cdc.batch.size"] == "200"
+        assert "column.EMPNO" not in tables["dept"] and tables["dept"]["column.DEPTNO"] == ""
+        assert not any(key.startswith("table.") for table in tables.values() for key in table)
+        assert flow_builder._table_configs({"source.table": "SCOTT.EMP"}) == {"": {"source.table": "SCOTT.EMP"}}
+        
+        with pytest.raises(ValueError, match="whole mapping"):
+            flow_builder._table_configs(dict(mapping_config, **{"table.emp.source.datasource": "other"}))
+        with pytest.raises(ValueError, match="table.bonus.source"):
+            flow_builder._table_configs({"table.bonus.target": "SCOTT.BONUS"})
+    
+    def test_should_build_one_pipeline_per_table(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "table.emp.source": "SCOTT.EMP",
+            "table.dept.source": "SCOTT.DEPT",
+            "table.dept.cdc.pipeline": "record"
+        })
+        service_ids = {"source_dbcp": "src", "target_dbcp": "tgt",
+                       "emp/record_reader": "emp-reader", "emp/record_writer": "emp-writer",
+                       "dept/record_reader": "dept-reader", "dept/record_writer": "dept-writer"}
+        
+        # Act
+        specs = flow_builder._cdc_processor_specs(mapping_config, service_ids)
+        connections = flow_builder._processor_connection_specs(specs, mapping_config)
+        
+        # Assert
+        assert list(specs) == ["emp/extract", "emp/convert", "emp/convert_sql", "emp/load", "emp/log_error",
+                               "dept/extract", "dept/load", "dept/log_error"]
+        assert specs["emp/extract"]["name"] == "Extract CDC Data - emp"
+        assert "FROM SCOTT.DEPT" in specs["dept/extract"]["properties"]["SQL select query"]
+        assert specs["emp/convert"]["properties"]["record-reader"] == "emp-reader"
+        assert specs["dept/load"]["properties"]["put-db-record-record-reader"] == "dept-reader"
+        assert specs["dept/load"]["properties"]["put-db-record-dcbp-service"] == "tgt"
+        assert specs["dept/extract"]["position"]["y"] == specs["emp/extract"]["position"]["y"] + 600
+        # Tables never connect to each other
+        assert all(source.split("/")[0] == destination.split("/")[0]
+                   for source, destination, _, _ in connections)
+        assert ("emp/extract", "emp/convert", ["success"]) in [c[:3] for c in connections]
+        assert ("dept/extract", "dept/load", ["success"]) in [c[:3] for c in connections]
+    
+    def test_should_share_dbcp_across_tables_of_a_mapping(self, flow_builder, mock_config_parser, mock_nifi_client):
+        # Arrange
+        mock_config_parser.parse_mapping.return_value = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "table.emp.source": "SCOTT.EMP",
+            "table.dept.source": "SCOTT.DEPT"
+        })
+        mock_nifi_client.create_processor.side_effect = lambda pg, ptype, name, props, pos, config=None: {
+            "component": {"id": f"{name}-id", "name": name}
+        }
+        
+        # Act
+        result = flow_builder.create_cdc_flow("test_mapping")
+        
+        # Assert
+        created = [c[0][2] for c in mock_nifi_client.create_controller_service.call_args_list]
+        assert created.count("test_source_DBCP") == 1 and created.count("test_target_DBCP") == 1
+        assert len(result["processors"]) == 10
+        mock_nifi_client.create_process_group.assert_called_once()
+        loads = [c[0][3] for c in mock_nifi_client.create_processor.call_args_list if c[0][2].startswith("Load")]
+        assert [props["JDBC Connection Pool"] for props in loads] == ["target-dbcp-789", "target-dbcp-789"]
+    
+    def test_should_share_record_services_across_flows(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.create_processor.side_effect = lambda pg, ptype, name, props, pos, config=None: {
+            "component": {"id": f"{name}-id", "name": name}
+        }
+        
+        # Act
+        flow_builder.create_cdc_flow("test_mapping")
+        flow_builder.create_cdc_flow("other_mapping")
+        
+        # Assert
+        assert mock_nifi_client.create_controller_service.call_count == 4
+        mock_nifi_client.get_process_group_services.assert_called_once_with("cdc-parent-001")
+        mock_nifi_client.wait_for_controller_service_state.assert_has_calls([
+            call("source-dbcp-456", "ENABLED"), call("target-dbcp-789", "ENABLED"),
+            call("AvroReader", "ENABLED"), call("JsonRecordSetWriter", "ENABLED")
+        ])
+        # Every enable is issued before the first wait
+        method_names = [c[0] for c in mock_nifi_client.mock_calls]
+        enables = [i for i, name in enumerate(method_names) if name == "enable_controller_service"]
+        waits = [i for i, name in enumerate(method_names) if name == "wait_for_controller_service_state"]
+        assert len(enables) == 4 and max(enables) < min(waits)
+    
+    def test_should_reuse_existing_shared_services(self, flow_builder, mock_config_parser, mock_nifi_client):
+        # Arrange
+        specs = flow_builder._shared_service_specs(mock_config_parser.parse_mapping("test_mapping"))
+        mock_nifi_client.get_process_group_services.return_value = {"controllerServices": [
+            {"component": {"id": f"existing-{key}", "name": spec["name"],
+                           "state": "DISABLED" if key == "record_writer" else "ENABLED",
+                           "properties": dict(spec["properties"], Password="********")}}
+            for key, spec in specs.items()
+        ]}
+        
+        # Act
+        service_ids = flow_builder._ensure_shared_services(mock_config_parser.parse_mapping("test_mapping"))
+        
+        # Assert
+        assert service_ids == {key: f"existing-{key}" for key in specs}
+        mock_nifi_client.create_controller_service.assert_not_called()
+        mock_nifi_client.update_controller_service.assert_not_called()
+        mock_nifi_client.enable_controller_service.assert_called_once_with("existing-record_writer")
+    
+    def test_should_reconfigure_shared_pool_and_restart_its_processors(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.get_controller_service.return_value = {"component": {
+            "id": "dbcp-1",
+            "referencingComponents": [
+                {"id": "load-a", "component": {"referenceType": "Processor", "state": "RUNNING"}},
+                {"id": "load-b", "component": {"referenceType": "Processor", "state": "STOPPED"}}
+            ]
+        }}
+        
+        # Act
+        flow_builder._update_shared_service("dbcp-1", {"Max Total Connections": "20"})
+        
+        # Assert
+        assert [c for c in mock_nifi_client.mock_calls if c[0] != "get_controller_service"] == [
+            call.stop_processor("load-a"),
+            call.wait_for_processor_state("load-a", "STOPPED"),
+            call.disable_controller_service("dbcp-1"),
+            call.wait_for_controller_service_state("dbcp-1", "DISABLED"),
+            call.update_controller_service("dbcp-1", {"Max Total Connections": "20"}),
+            call.enable_controller_service("dbcp-1"),
+            call.wait_for_controller_service_state("dbcp-1", "ENABLED"),
+            call.start_processor("load-a")
+        ]
+    
+    def test_should_tune_record_reader_schema_access(self, flow_builder, mock_config_parser):
+        # Arrange
+        mapping_config = dict(mock_config_parser.parse_mapping("test_mapping"), **{
+            "cdc.record.schema.access": "schema-text-property",
+            "cdc.record.schema.text": '{"type": "record", "name": "EMP", "fields": []}',
+            "cdc.record.schema.cache.size": "50"
+        })
+        
+        # Act
+        specs = flow_builder._record_service_specs(mapping_config)
+        default_specs = flow_builder._record_service_specs(mock_config_parser.parse_mapping("test_mapping"))
+        
+        # Assert
+        assert specs["record_reader"]["properties"] == {
+            "schema-access-strategy": "schema-text-property",
+            "cache-size": "50",
+            "schema-text": '{"type": "record", "name": "EMP", "fields": []}'
+        }
+        assert specs["record_reader"]["name"] != default_specs["record_reader"]["name"]
+        assert specs["record_writer"]["name"] == default_specs["record_writer"]["name"]
+        
+        with pytest.raises(ValueError, match="cdc.record.schema.access"):
+            flow_builder._record_service_specs(dict(mapping_config, **{"cdc.record.schema.access": "guess"}))
+    
     def test_should_handle_missing_mapping_configuration(self, flow_builder, mock_config_parser):
         # Arrange
         mock_config_parser.parse_mapping.return_value = {}
@@ -240,11 +972,23 @@ class TestCDCFlowBuilder:
             flow_builder.create_cdc_flow("test_mapping")
         
         # Assert
-        # Verify both controller services were enabled
-        enable_calls = mock_nifi_client.enable_controller_service.call_args_list
-        assert len(enable_calls) == 2
-        assert enable_calls[0][0][0] == "source-dbcp-456"
-        assert enable_calls[1][0][0] == "target-dbcp-789"
+        # Only the newly created shared services are enabled; the flow has no services of its own
+        mock_nifi_client.enable_process_group_services.assert_not_called()
+        assert mock_nifi_client.enable_controller_service.call_args_list == [
+            call("source-dbcp-456"), call("target-dbcp-789"), call("AvroReader"), call("JsonRecordSetWriter")
+        ]
+    
+    def test_should_wait_for_services_enabled_before_starting_processors(self, flow_builder, mock_nifi_client):
+        # Act
+        flow_builder.create_cdc_flow("test_mapping")
+        
+        # Assert
+        method_names = [c[0] for c in mock_nifi_client.mock_calls]
+        waits = [i for i, name in enumerate(method_names) if name == "wait_for_controller_service_state"]
+        start = method_names.index("start_process_group")
+        creates = [i for i, name in enumerate(method_names) if name in ("create_processor", "create_connection")]
+        assert max(waits) < min(creates)
+        assert max(creates) < start
     
     def test_should_start_all_processors(self, flow_builder, mock_nifi_client):
         # Act
@@ -252,14 +996,213 @@ class TestCDCFlowBuilder:
             flow_builder.create_cdc_flow("test_mapping")
         
         # Assert
-        start_calls = mock_nifi_client.start_processor.call_args_list
-        assert len(start_calls) == 5
+        # One group-level schedule request replaces a GET+PUT per processor
+        mock_nifi_client.start_process_group.assert_called_once_with("test-pg-123")
+        mock_nifi_client.start_processor.assert_not_called()
+    
+    def test_should_start_all_cdc_flows_under_parent_group(self, flow_builder, mock_nifi_client):
+        # Act
+        flow_builder.start_all_cdc_flows()
+        
+        # Assert
+        mock_nifi_client.enable_process_group_services.assert_called_once_with("cdc-parent-001")
+        mock_nifi_client.wait_for_process_group_services_state.assert_called_once_with("cdc-parent-001", "ENABLED")
+        mock_nifi_client.start_process_group.assert_called_once_with("cdc-parent-001")
+    
+    def test_should_stop_all_cdc_flows_under_parent_group(self, flow_builder, mock_nifi_client):
+        # Act
+        flow_builder.stop_all_cdc_flows()
+        
+        # Assert
+        mock_nifi_client.stop_process_group.assert_called_once_with("cdc-parent-001")    
+    def test_should_create_multiple_cdc_flows_concurrently(self, flow_builder):
+        # Arrange
+        def fake_create(mapping_name):
+            if mapping_name == "broken_mapping":
+                raise ValueError("bad mapping")
+            return {"process_group": {"id": f"{mapping_name}-pg", "name": mapping_name}}
+        
+        # Act
+        with patch.object(flow_builder, 'create_cdc_flow', side_effect=fake_create):
+            summary = flow_builder.create_cdc_flows(
+                ["mapping_a", "broken_mapping", "mapping_b"], max_workers=2
+            )
+        
+        # Assert
+        assert [result["mapping"] for result in summary["results"]] == [
+            "mapping_a", "broken_mapping", "mapping_b"
+        ]
+        assert summary["succeeded"] == 2
+        assert summary["failed"] == 1
+        assert summary["results"][0]["flow"]["process_group"]["id"] == "mapping_a-pg"
+        assert summary["results"][1]["success"] is False
+        assert summary["results"][1]["error"] == "bad mapping"
+        assert summary["elapsed"] >= 0
+    
+    def test_should_default_batch_workers_to_max_concurrent_flows(self, flow_builder):
+        # Arrange
+        flow_builder.env_config["max_concurrent_flows"] = "3"
+        
+        # Act
+        with patch('cdc_flow_builder.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as mock_pool:
+            with patch.object(flow_builder, 'create_cdc_flow', return_value={}):
+                flow_builder.create_cdc_flows(["mapping_a"])
+        
+        # Assert
+        mock_pool.assert_called_once_with(max_workers=3)
+    
+    def test_should_create_cdc_flow_asynchronously(self, mock_config_parser, mock_nifi_client):
+        # Arrange
+        async_client = Mock(spec=AsyncNiFiAPIClient)
+        async_client.create_process_group = AsyncMock(return_value={
+            "component": {"id": "test-pg-123", "name": "Test CDC Flow"}
+        })
+        async_client.create_controller_service = AsyncMock(side_effect=[
+            {"component": {"id": "source-dbcp-456", "name": "test_source_DBCP"}},
+            {"component": {"id": "target-dbcp-789", "name": "test_target_DBCP"}}
+        ])
+        in_flight = []
+        peak = []
+        
+        async def create_processor(process_group_id, processor_type, name, properties, position, config=None):
+            in_flight.append(name)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(name)
+            return {"component": {"id": f"{name}-id", "name": name}}
+        
+        async_client.create_processor = AsyncMock(side_effect=create_processor)
+        async_client.create_connection = AsyncMock(return_value={"component": {"id": "conn-666"}})
+        async_client.enable_process_group_services = AsyncMock(return_value={})
+        async_client.wait_for_process_group_services_state = AsyncMock(return_value={})
+        async_client.start_process_group = AsyncMock(return_value={})
+        flow_builder = CDCFlowBuilder(mock_config_parser, mock_nifi_client, async_client)
+        
+        # Act
+        result = asyncio.run(flow_builder.create_cdc_flow_async("test_mapping"))
+        
+        # Assert
+        assert result["process_group"]["id"] == "test-pg-123"
+        assert result["source_dbcp"]["id"] == "source-dbcp-456"
+        assert result["target_dbcp"]["id"] == "target-dbcp-789"
+        assert result["processors"]["extract"]["id"] == "Extract CDC Data-id"
+        assert len(result["processors"]) == 5
+        assert max(peak) == 5
+        assert async_client.create_connection.await_count == 7
+        async_client.create_process_group.assert_awaited_once_with("cdc-parent-001", "Test Oracle to Oracle CDC")
+        async_client.enable_process_group_services.assert_not_awaited()
+        async_client.start_process_group.assert_awaited_once_with("test-pg-123")
+        mock_nifi_client.create_processor.assert_not_called()
+    
+    def test_should_wrap_sync_client_for_async_path_by_default(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.base_url = "http://test-nifi:8080/nifi-api"
+        mock_nifi_client.session = Mock()
+        
+        # Act
+        async_client = flow_builder._get_async_client()
+        async_client.close()
+        
+        # Assert
+        assert async_client.nifi_client is mock_nifi_client
+        assert flow_builder._get_async_client() is async_client
+    
+    def test_should_create_cdc_flow_from_uploaded_definition(self, flow_builder, mock_nifi_client):
+        # Arrange
+        name = "Test Oracle to Oracle CDC"
+        mock_nifi_client.upload_process_group.return_value = {
+            "component": {"id": "uploaded-pg-1", "name": name}
+        }
+        mock_nifi_client.get_process_group_flow.side_effect = [
+            # CDC parent group lookup
+            {"processGroupFlow": {"flow": {"processGroups": [
+                {"id": "cdc-parent-001", "component": {"id": "cdc-parent-001", "name": "CDC-Flows"}}
+            ]}}},
+            # Contents of the uploaded group
+            {"processGroupFlow": {"flow": {"processors": [
+                {"component": {"id": f"{key}-id", "name": f"instance {key}",
+                               "versionedComponentId": component_identifier(name, key)}}
+                for key in ["extract", "convert", "convert_sql", "load", "log_error"]
+            ]}}}
+        ]
+        mock_nifi_client.get_process_group_services.return_value = {"controllerServices": [
+            {"component": {"id": "src-svc", "name": "test_source_DBCP"}},
+            {"component": {"id": "tgt-svc", "name": "test_target_DBCP"}}
+        ]}
+        
+        # Act
+        result = flow_builder.create_cdc_flow_from_definition("test_mapping")
+        
+        # Assert
+        parent_id, group_name, definition = mock_nifi_client.upload_process_group.call_args[0]
+        assert parent_id == "cdc-parent-001"
+        assert group_name == name
+        assert len(definition["flowContents"]["processors"]) == 5
+        assert len(definition["flowContents"]["connections"]) == 7
+        assert definition["flowContents"]["controllerServices"] == []
+        assert sorted(s["name"] for s in definition["externalControllerServices"].values()) == sorted(
+            ["test_source_DBCP", "test_target_DBCP"]
+            + [c[0][2] for c in mock_nifi_client.create_controller_service.call_args_list]
+        )
+        assert result["process_group"]["id"] == "uploaded-pg-1"
+        assert result["processors"]["extract"]["id"] == "extract-id"
+        assert result["source_dbcp"]["id"] == "src-svc"
+        assert result["target_dbcp"]["id"] == "tgt-svc"
+        mock_nifi_client.create_processor.assert_not_called()
+        mock_nifi_client.create_connection.assert_not_called()
+        mock_nifi_client.update_controller_service.assert_not_called()
+        mock_nifi_client.enable_process_group_services.assert_not_called()
+        mock_nifi_client.start_process_group.assert_called_once_with("uploaded-pg-1")
+    
+    def test_should_fall_back_to_component_creation_when_upload_rejected(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.upload_process_group.side_effect = requests.HTTPError(
+            "405 Method Not Allowed", response=Mock(status_code=405, text="")
+        )
+        
+        # Act
+        result = flow_builder.create_cdc_flow_from_definition("test_mapping")
         
-        # Verify all processor IDs were started
-        started_ids = [call[0][0] for call in start_calls]
-        expected_ids = [
-            "extract-proc-111", "convert-proc-222", "convert-sql-proc-333",
-            "load-proc-444", "log-proc-555"
+        # Assert
+        assert result["process_group"]["id"] == "test-pg-123"
+        assert mock_nifi_client.create_processor.call_count == 5
+        assert mock_nifi_client.create_connection.call_count == 7
+    
+    def test_should_fail_when_uploaded_flow_is_incomplete(self, flow_builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.upload_process_group.return_value = {"component": {"id": "uploaded-pg-1"}}
+        mock_nifi_client.get_process_group_flow.side_effect = [
+            {"processGroupFlow": {"flow": {"processGroups": []}}},
+            {"processGroupFlow": {"flow": {"processors": []}}}
         ]
-        for proc_id in expected_ids:
-            assert proc_id in started_ids
\ No newline at end of file
+        mock_nifi_client.create_process_group.side_effect = None
+        mock_nifi_client.create_process_group.return_value = {"component": {"id": "cdc-parent-001"}}
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            flow_builder.create_cdc_flow_from_definition("test_mapping")
+        mock_nifi_client.delete_process_group.assert_called_once_with("uploaded-pg-1")
+        mock_nifi_client.start_process_group.assert_not_called()
+    
+    @pytest.mark.parametrize("status, text, falls_back", [
+        (404, "", True),
+        (400, "Unable to deserialize the flow snapshot", True),
+        (400, "Group name already in use", False),
+        (502, "Bad Gateway", False),
+        (504, "Gateway Timeout", False)
+    ])
+    def test_should_fall_back_only_when_upload_is_unsupported(self, flow_builder, mock_nifi_client,
+                                                              status, text, falls_back):
+        # Arrange
+        error = requests.HTTPError(f"{status} error", response=Mock(status_code=status, text=text))
+        mock_nifi_client.upload_process_group.side_effect = error
+        
+        # Act
+        if falls_back:
+            flow_builder.create_cdc_flow_from_definition("test_mapping")
+        else:
+            with pytest.raises(requests.HTTPError):
+                flow_builder.create_cdc_flow_from_definition("test_mapping")
+        
+        # Assert
+        assert mock_nifi_client.create_process_group.called == falls_back
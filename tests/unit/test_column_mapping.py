@@ -0,0 +1,75 @@
+import pytest
+from pathlib import Path
+import json
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from column_mapping import parse_column_mappings, select_list, avro_type, avro_schema
+
+
+class TestColumnMapping:
+    
+    @pytest.fixture
+    def mapping_config(self):
+        """Mapping projecting, renaming and casting columns"""
+        return {
+            "source.table": "SCOTT.EMP_1",
+            "column.EMP_ID": "",
+            "column.ENAME": "EMP_NAME",
+            "column.SAL": "SALARY:NUMBER(10, 2)",
+            "column.LAST_UPDATE_TIME": "LAST_UPDATE_TIME:TIMESTAMP",
+            "cdc.column": "LAST_UPDATE_TIME"
+        }
+    
+    def test_should_parse_columns_in_file_order(self, mapping_config):
+        # Act
+        columns = parse_column_mappings(mapping_config)
+        
+        # Assert
+        assert columns == [
+            ("EMP_ID", "EMP_ID", None),
+            ("ENAME", "EMP_NAME", None),
+            ("SAL", "SALARY", "NUMBER(10, 2)"),
+            ("LAST_UPDATE_TIME", "LAST_UPDATE_TIME", "TIMESTAMP")
+        ]
+    
+    def test_should_render_projection_with_casts_and_renames(self, mapping_config):
+        # Act
+        projection = select_list(parse_column_mappings(mapping_config))
+        
+        # Assert
+        assert projection == ("EMP_ID, ENAME AS EMP_NAME, CAST(SAL AS NUMBER(10, 2)) AS SALARY, "
+                              "CAST(LAST_UPDATE_TIME AS TIMESTAMP) AS LAST_UPDATE_TIME")
+        assert select_list([]) == "*"
+    
+    @pytest.mark.parametrize("key,value", [
+        ("column.EMP ID", "EMP_ID"),
+        ("column.ENAME", "EMP-NAME"),
+        ("column.SAL", "SALARY:NUMBER); DROP TABLE EMP_2; --")
+    ])
+    def test_should_reject_invalid_column_mappings(self, key, value):
+        # Act & Assert
+        with pytest.raises(ValueError, match="column"):
+            parse_column_mappings({key: value})
+    
+    def test_should_derive_avro_schema_from_typed_columns(self):
+        # Arrange
+        columns = [("EMP_ID", "EMP_ID", "INTEGER"), ("SAL", "SALARY", "NUMBER(10,2)"),
+                   ("PHOTO", "PHOTO", "BLOB"), ("ENAME", "EMP_NAME", "VARCHAR2(50)")]
+        
+        # Act
+        schema = json.loads(avro_schema("SCOTT.EMP_2", columns))
+        
+        # Assert
+        assert schema["name"] == "SCOTT_EMP_2"
+        assert schema["fields"] == [
+            {"name": "EMP_ID", "type": ["null", "int"]},
+            {"name": "SALARY", "type": ["null", "string"]},
+            {"name": "PHOTO", "type": ["null", "bytes"]},
+            {"name": "EMP_NAME", "type": ["null", "string"]}
+        ]
+        assert avro_type("interval day to second") == "string"
+        with pytest.raises(ValueError, match="ENAME"):
+            avro_schema("EMP", [("ENAME", "EMP_NAME", None)])
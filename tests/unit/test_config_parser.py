@@ -44,6 +44,17 @@ class TestConfigParser:
         assert result["source.table"] == "SCOTT.EMP_1"
         assert result["target.table"] == "SCOTT.EMP_2"
     
+    def test_should_list_mappings_matching_pattern(self, config_parser):
+        # Act
+        all_mappings = config_parser.list_mappings()
+        matching = config_parser.list_mappings("test_*")
+        not_matching = config_parser.list_mappings("prod_*")
+        
+        # Assert
+        assert all_mappings == ["test_mapping"]
+        assert matching == ["test_mapping"]
+        assert not_matching == []
+    
     def test_should_get_environment_configuration(self, config_parser):
         # Arrange - Set environment variables for test
         with patch.dict(os.environ, {
@@ -60,6 +71,8 @@ class TestConfigParser:
             assert result["nifi_api_password"] == "test_pass"
             assert result["nifi_root_process_group_id"] == "root"
             assert result["nifi_cdc_process_group_name"] == "CDC-Flows"
+            assert result["max_concurrent_flows"] == "5"
+            assert result["connection_pool_size"] == "10"
     
     def test_should_build_oracle_jdbc_url(self, config_parser):
         # Arrange
@@ -76,17 +89,32 @@ class TestConfigParser:
         # Assert
         assert result == "jdbc:oracle:thin:@localhost:1521:ORCL"
     
-    def test_should_return_empty_string_for_unsupported_database(self, config_parser):
+    def test_should_build_postgresql_jdbc_url_with_batch_rewrite(self, config_parser):
         # Arrange
         db_properties = {
-            "db.type": "postgresql"
+            "db.type": "postgresql",
+            "db.host": "pg-host",
+            "db.port": "5432",
+            "db.name": "offload"
         }
         
         # Act
         result = config_parser.build_jdbc_url(db_properties)
         
         # Assert
-        assert result == ""
+        assert result == "jdbc:postgresql://pg-host:5432/offload?reWriteBatchedInserts=true"
+    
+    def test_should_require_explicit_url_for_unsupported_database(self, config_parser):
+        # Arrange
+        db_properties = {
+            "db.type": "db2"
+        }
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match="db.jdbc.url"):
+            config_parser.build_jdbc_url(db_properties)
+        assert config_parser.build_jdbc_url(dict(db_properties, **{"db.jdbc.url": "jdbc:db2://h:50000/S"})) == \
+            "jdbc:db2://h:50000/S"
     
     def test_should_raise_error_when_datasource_file_not_found(self, config_parser):
         # Act & Assert
@@ -157,4 +185,52 @@ key2=value2
         
         # Assert
         assert result == {"key1": "value1", "key2": "value2"}
-        assert len(result) == 2
\ No newline at end of file
+        assert len(result) == 2
+    
+    def test_should_reparse_properties_only_when_file_changes(self, tmp_path):
+        # Arrange
+        (tmp_path / "datasources").mkdir()
+        datasource = tmp_path / "datasources" / "db.properties"
+        datasource.write_text("db.pool.size=10\n")
+        parser = ConfigParser(str(tmp_path))
+        first = parser.parse_datasource("db")
+        first["db.pool.size"] = "changed by caller"
+        
+        # Act
+        with patch("builtins.open", side_effect=AssertionError("file re-read")):
+            cached = parser.parse_datasource("db")
+        datasource.write_text("db.pool.size=20\n")
+        os.utime(datasource, ns=(datasource.stat().st_atime_ns, datasource.stat().st_mtime_ns + 10 ** 9))
+        changed = parser.parse_datasource("db")
+        
+        # Assert
+        assert cached == {"db.pool.size": "10"}
+        assert changed == {"db.pool.size": "20"}
+    
+    def test_should_validate_mapping_and_its_datasources_up_front(self, tmp_path):
+        # Arrange
+        (tmp_path / "mappings").mkdir()
+        (tmp_path / "datasources").mkdir()
+        (tmp_path / "datasources" / "src.properties").write_text("db.type=oracle\ndb.port=15x21\n")
+        (tmp_path / "mappings" / "bad.properties").write_text(
+            "source.datasource=src\ntarget.datasource=missing\nsource.table=EMP\n"
+            "cdc.batch.size=lots\ncdc.incremental.from=2025-07-07\n"
+        )
+        parser = ConfigParser(str(tmp_path))
+        
+        # Act
+        errors = parser.validate_mapping("bad")
+        
+        # Assert
+        assert errors == [
+            "cdc.batch.size must be a whole number, got 'lots'",
+            "cdc.incremental.from must be a 'YYYY-MM-DD HH:MM:SS' timestamp, got '2025-07-07'",
+            "source.datasource src: db.port must be a whole number, got '15x21'",
+            "target.datasource: datasource file not found: datasources/missing.properties"
+        ]
+        assert parser.validate_mapping("absent") == ["mapping file not found: mappings/absent.properties"]
+    
+    def test_should_accept_valid_fixture_mapping(self, config_parser):
+        # Act & Assert
+        assert config_parser.preload() == 3
+        assert config_parser.validate_mapping("test_mapping") == []
@@ -0,0 +1,174 @@
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from cdc_flow_builder import CDCFlowBuilder
+from config_parser import ConfigParser
+from fleet_monitor import FleetMonitor, _parse_max_value_time
+from nifi_api_client import NiFiAPIClient
+
+
+def processor(pid, ptype, run_status="Running", **counters):
+    return {"id": pid, "processorStatusSnapshot": dict(
+        {"id": pid, "name": pid, "type": ptype, "runStatus": run_status}, **counters
+    )}
+
+
+def flow_group(gid, name, queued, processors, connections=(), groups=()):
+    return {"id": gid, "processGroupStatusSnapshot": {
+        "id": gid, "name": name, "flowFilesQueued": queued, "bytesQueued": queued * 100,
+        "activeThreadCount": 1,
+        "processorStatusSnapshots": list(processors),
+        "connectionStatusSnapshots": [{"id": c["id"], "connectionStatusSnapshot": c} for c in connections],
+        "processGroupStatusSnapshots": list(groups)
+    }}
+
+
+STATUS = {"processGroupStatus": {"id": "cdc", "aggregateSnapshot": {
+    "id": "cdc", "name": "CDC-Flows",
+    "processGroupStatusSnapshots": [
+        flow_group("pg-emp", "EMP CDC", 30, [
+            processor("extract", "QueryDatabaseTableRecord", flowFilesOut=600),
+            processor("load", "PutDatabaseRecord", flowFilesIn=600, bytesRead=300000)
+        ], connections=[{"id": "c-1", "name": "", "sourceName": "Extract CDC Data",
+                         "destinationName": "Load to Target", "flowFilesQueued": 30, "bytesQueued": 3000,
+                         "percentUseCount": 12, "percentUseBytes": 40}]),
+        flow_group("pg-dept", "DEPT CDC", 5, [
+            processor("load-dept", "PutSQL", run_status="Stopped", flowFilesIn=0)
+        ], groups=[flow_group("pg-nested", "Nested", 0, [])]),
+        flow_group("pg-manual", "Manual Flow", 0, [])
+    ]
+}}}
+
+
+class TestFleetMonitor:
+
+    @pytest.fixture
+    def mock_config_parser(self):
+        """Create mock config parser with two mappings"""
+        mock_parser = Mock(spec=ConfigParser)
+        mock_parser.get_env_config.return_value = {
+            "nifi_root_process_group_id": "root",
+            "nifi_cdc_process_group_name": ""
+        }
+        mock_parser.list_mappings.return_value = ["dept", "emp"]
+        mock_parser.parse_mapping.side_effect = lambda name: {
+            "emp": {"mapping.name": "EMP CDC"},
+            "dept": {"mapping.name": "DEPT CDC"}
+        }[name]
+        return mock_parser
+
+    @pytest.fixture
+    def mock_nifi_client(self):
+        """Create mock NiFi API client serving the recursive status and the bulletin board"""
+        mock_client = Mock(spec=NiFiAPIClient)
+        mock_client.get_process_group_status.return_value = STATUS
+        mock_client.get_bulletin_board.return_value = {"bulletinBoard": {"bulletins": [
+            {"id": 7, "groupId": "pg-nested", "bulletin": {
+                "level": "ERROR", "sourceName": "Load", "message": "ORA-00001", "timestamp": "10:00:00 KST"
+            }},
+            {"id": 5, "groupId": "other-group", "bulletin": {"level": "WARNING", "message": "elsewhere"}}
+        ]}}
+        return mock_client
+
+    @pytest.fixture
+    def monitor(self, mock_config_parser, mock_nifi_client):
+        """Create a monitor over the mocked fleet"""
+        return FleetMonitor(CDCFlowBuilder(mock_config_parser, mock_nifi_client), interval=0)
+
+    def test_should_poll_whole_fleet_with_one_status_request(self, monitor, mock_nifi_client):
+        # Act
+        flows = monitor.poll()
+
+        # Assert
+        mock_nifi_client.get_process_group_status.assert_called_once_with("root", recursive=True)
+        assert set(flows) == {"emp", "dept", "Manual Flow"}
+        assert flows["Manual Flow"]["mapping"] is None
+        assert monitor.get("emp") is flows["emp"]
+
+    def test_should_report_queue_depth_throughput_and_lag(self, monitor):
+        # Act
+        emp = monitor.poll()["emp"]
+
+        # Assert
+        assert emp["queued_count"] == 30 and emp["queued_bytes"] == 3000
+        assert emp["extracted_flowfiles"] == 600 and emp["loaded_flowfiles"] == 600
+        assert emp["throughput"] == 2.0
+        assert emp["bytes_per_second"] == 1000.0
+        assert emp["lag_seconds"] == 15.0
+        assert emp["max_queue_percent"] == 40
+        assert emp["run_status"] == {"Running": 2}
+        assert emp["stages"]["extract"]["flowfiles_out"] == 600
+        assert emp["stages"]["load"] == {"flowfiles_in": 600, "flowfiles_out": 0, "bytes_read": 300000,
+                                         "bytes_written": 0, "active_threads": 0}
+        assert emp["connections"] == [{
+            "name": "Extract CDC Data -> Load to Target", "source": "Extract CDC Data",
+            "destination": "Load to Target", "queued_count": 30, "queued_bytes": 3000,
+            "percent_use_count": 12, "percent_use_bytes": 40
+        }]
+        assert "max_value_lag_seconds" not in emp
+
+    def test_should_report_stalled_flow_without_lag(self, monitor):
+        # Act
+        dept = monitor.poll()["dept"]
+
+        # Assert
+        assert dept["throughput"] == 0
+        assert dept["lag_seconds"] is None
+        assert dept["run_status"] == {"Stopped": 1}
+
+    def test_should_attach_new_bulletins_to_their_flow(self, monitor, mock_nifi_client):
+        # Act
+        flows = monitor.poll()
+        monitor.poll()
+
+        # Assert
+        assert flows["dept"]["bulletins"] == [
+            {"timestamp": "10:00:00 KST", "level": "ERROR", "source": "Load", "message": "ORA-00001"}
+        ]
+        assert flows["emp"]["bulletins"] == []
+        assert mock_nifi_client.get_bulletin_board.call_args_list[-1][1] == {"after": 7}
+
+    def test_should_keep_last_snapshot_when_poll_fails(self, monitor, mock_nifi_client):
+        # Arrange
+        snapshots = []
+        mock_nifi_client.get_process_group_status.side_effect = [STATUS, RuntimeError("NiFi unavailable")]
+
+        # Act
+        with patch('fleet_monitor.time.sleep'):
+            monitor.watch(snapshots.append, cycles=2)
+
+        # Assert
+        assert len(snapshots) == 1
+        assert set(monitor.flows) == {"emp", "dept", "Manual Flow"}
+
+    def test_should_report_max_value_lag_of_incremental_extracts(self, monitor, mock_nifi_client):
+        # Arrange
+        monitor.track_max_values = True
+        newest = (datetime.now() - timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S.0")
+        mock_nifi_client.get_processor_state.return_value = {"componentState": {
+            "clusterState": {"state": [{"key": "scott.emp_1@!@last_update_time", "value": newest}]},
+            "localState": {"state": []}
+        }}
+
+        # Act
+        flows = monitor.poll()
+
+        # Assert: only flows with an incremental extract read processor state
+        mock_nifi_client.get_processor_state.assert_called_once_with("extract")
+        assert flows["emp"]["max_value_lag_seconds"] == pytest.approx(600, abs=5)
+        assert flows["dept"]["max_value_lag_seconds"] is None
+
+    def test_should_parse_max_values_with_optional_fractional_seconds(self):
+        # Act & Assert
+        assert _parse_max_value_time("2025-07-07 15:00:00") == datetime(2025, 7, 7, 15)
+        assert _parse_max_value_time("2025-07-07 15:00:00.0") == datetime(2025, 7, 7, 15)
+        assert _parse_max_value_time("2025-07-07 15:00:00.123456789") == \
+            datetime(2025, 7, 7, 15, 0, 0, 123456)
+        with pytest.raises(ValueError):
+            _parse_max_value_time("12345")
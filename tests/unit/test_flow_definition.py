@@ -0,0 +1,131 @@
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from flow_definition import render_flow_definition, component_identifier, bundle_for
+
+
+class TestFlowDefinition:
+    
+    @pytest.fixture
+    def services(self):
+        """DBCP service specs"""
+        return {
+            "source_dbcp": {
+                "type": "org.apache.nifi.dbcp.DBCPConnectionPool",
+                "name": "testdb1_DBCP",
+                "properties": {
+                    "Database Connection URL": "jdbc:oracle:thin:@localhost:1521:ORCL",
+                    "Database User": "scott",
+                    "Password": "tiger"
+                }
+            }
+        }
+    
+    @pytest.fixture
+    def processors(self):
+        """Two processor specs wired to the source service"""
+        return {
+            "extract": {
+                "type": "org.apache.nifi.processors.standard.ExecuteSQL",
+                "name": "Extract CDC Data",
+                "properties": {
+                    "Database Connection Pooling Service": component_identifier("My Flow", "source_dbcp")
+                },
+                "position": {"x": 100, "y": 100},
+                "config": {"concurrentlySchedulableTaskCount": 4}
+            },
+            "log_error": {
+                "type": "org.apache.nifi.processors.standard.LogAttribute",
+                "name": "Log Errors",
+                "properties": {"Log Level": "error"},
+                "position": {"x": 700, "y": 300}
+            }
+        }
+    
+    def test_should_generate_deterministic_identifiers(self):
+        # Act & Assert
+        assert component_identifier("My Flow", "extract") == component_identifier("My Flow", "extract")
+        assert component_identifier("My Flow", "extract") != component_identifier("Other Flow", "extract")
+    
+    def test_should_render_complete_flow_contents(self, services, processors):
+        # Act
+        definition = render_flow_definition("My Flow", services, processors,
+                                            [("extract", "log_error", ["failure"], {})])
+        
+        # Assert
+        contents = definition["flowContents"]
+        assert contents["name"] == "My Flow"
+        assert contents["identifier"] == component_identifier("My Flow", "process_group")
+        assert len(contents["controllerServices"]) == 1
+        assert len(contents["processors"]) == 2
+        assert len(contents["connections"]) == 1
+    
+    def test_should_reference_services_and_processors_by_versioned_identifier(self, services, processors):
+        # Act
+        contents = render_flow_definition("My Flow", services, processors,
+                                          [("extract", "log_error", ["failure"], {})])["flowContents"]
+        
+        # Assert
+        service = contents["controllerServices"][0]
+        extract = contents["processors"][0]
+        connection = contents["connections"][0]
+        assert extract["properties"]["Database Connection Pooling Service"] == service["identifier"]
+        assert connection["source"]["id"] == extract["identifier"]
+        assert connection["destination"]["id"] == contents["processors"][1]["identifier"]
+        assert connection["selectedRelationships"] == ["failure"]
+        assert connection["backPressureObjectThreshold"] == 10000
+    
+    def test_should_apply_processor_config_over_defaults(self, services, processors):
+        # Act
+        contents = render_flow_definition("My Flow", services, processors, [])["flowContents"]
+        
+        # Assert
+        assert contents["processors"][0]["concurrentlySchedulableTaskCount"] == 4
+        assert contents["processors"][1]["concurrentlySchedulableTaskCount"] == 1
+        assert contents["processors"][0]["scheduledState"] == "ENABLED"
+        assert contents["processors"][0]["bundle"]["artifact"] == "nifi-standard-nar"
+    
+    def test_should_name_connection_settings_as_flow_definitions_do(self, services, processors):
+        # Arrange
+        connections = [("extract", "log_error", ["failure"], {
+            "loadBalanceStrategy": "PARTITION_BY_ATTRIBUTE", "loadBalancePartitionAttribute": "partition.id"
+        })]
+        
+        # Act
+        connection = render_flow_definition("My Flow", services, processors, connections)["flowContents"][
+            "connections"][0]
+        
+        # Assert
+        assert connection["partitioningAttribute"] == "partition.id"
+        assert "loadBalancePartitionAttribute" not in connection
+    
+    def test_should_omit_sensitive_properties(self, services, processors):
+        # Act
+        contents = render_flow_definition("My Flow", services, processors, [])["flowContents"]
+        
+        # Assert
+        properties = contents["controllerServices"][0]["properties"]
+        assert "Password" not in properties
+        assert properties["Database User"] == "scott"
+        assert services["source_dbcp"]["properties"]["Password"] == "tiger"
+    
+    def test_should_declare_external_services_by_name(self, services, processors):
+        # Act
+        definition = render_flow_definition("My Flow", services, processors, [],
+                                            {"record_reader": "CDC AvroReader 1a2b3c4d"})
+        
+        # Assert
+        reader_id = component_identifier("My Flow", "record_reader")
+        assert definition["externalControllerServices"] == {
+            reader_id: {"identifier": reader_id, "name": "CDC AvroReader 1a2b3c4d"}
+        }
+        assert len(definition["flowContents"]["controllerServices"]) == 1
+    
+    def test_should_raise_for_unknown_bundle(self):
+        # Act & Assert
+        with pytest.raises(ValueError):
+            bundle_for("com.example.CustomProcessor")
@@ -0,0 +1,450 @@
+import pytest
+from unittest.mock import Mock, call
+from pathlib import Path
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from cdc_flow_builder import CDCFlowBuilder
+from config_parser import ConfigParser
+from flow_reconciler import FlowReconciler
+from nifi_api_client import NiFiAPIClient
+
+
+MAPPING = {
+    "mapping.name": "Test Oracle to Oracle CDC",
+    "source.datasource": "test_source",
+    "target.datasource": "test_target",
+    "source.table": "SCOTT.EMP_1",
+    "target.table": "SCOTT.EMP_2",
+    "cdc.column": "LAST_UPDATE_TIME",
+    "cdc.incremental.from": "2025-07-07 15:00:00",
+    "cdc.incremental.to": "2025-07-07 16:00:00",
+    "cdc.batch.size": "1000"
+}
+
+DATASOURCE = {
+    "db.type": "oracle",
+    "db.host": "192.168.3.13",
+    "db.port": "1521",
+    "db.service.name": "ORCL",
+    "db.username": "scott",
+    "db.password": "tiger",
+    "db.pool.size": "10"
+}
+
+
+class TestFlowReconciler:
+    
+    @pytest.fixture
+    def mock_config_parser(self):
+        """Create mock config parser returning the test mapping"""
+        mock_parser = Mock(spec=ConfigParser)
+        mock_parser.get_env_config.return_value = {
+            "nifi_root_process_group_id": "root",
+            "nifi_cdc_process_group_name": ""
+        }
+        mock_parser.parse_mapping.return_value = dict(MAPPING)
+        mock_parser.parse_datasource.side_effect = lambda name: dict(DATASOURCE)
+        mock_parser.build_jdbc_url.return_value = "jdbc:oracle:thin:@192.168.3.13:1521:ORCL"
+        return mock_parser
+    
+    @pytest.fixture
+    def mock_nifi_client(self):
+        """Create mock NiFi API client"""
+        mock_client = Mock(spec=NiFiAPIClient)
+        mock_client.update_processor.side_effect = lambda pid, properties=None, config=None: {
+            "component": {"id": pid}
+        }
+        mock_client.create_processor.side_effect = lambda pg, ptype, name, props, pos, config=None: {
+            "component": {"id": f"new-{name}", "name": name, "type": ptype}
+        }
+        return mock_client
+    
+    @pytest.fixture
+    def builder(self, mock_config_parser, mock_nifi_client):
+        """Create CDC flow builder with mocks"""
+        return CDCFlowBuilder(mock_config_parser, mock_nifi_client)
+    
+    @pytest.fixture
+    def deployed(self, builder):
+        """Build a deployed flow exactly matching the mapping, with its shared services in the root group"""
+        services = builder._shared_service_specs(MAPPING)
+        service_components = {
+            spec["name"]: {"id": f"{key}-id", "name": spec["name"], "state": "ENABLED",
+                           "properties": dict(spec["properties"], Password="********")}
+            for key, spec in services.items()
+        }
+        specs = builder._cdc_processor_specs(MAPPING, {key: f"{key}-id" for key in services})
+        processors = {
+            spec["name"]: {"id": f"{key}-id", "name": spec["name"], "type": spec["type"], "state": "RUNNING",
+                           "config": dict(spec.get("config") or {}, properties=dict(spec["properties"]))}
+            for key, spec in specs.items()
+        }
+        connections = [
+            {"id": f"conn-{source}-{destination}", "source": {"id": f"{source}-id"},
+             "destination": {"id": f"{destination}-id"}, "selectedRelationships": relationships}
+            for source, destination, relationships, _ in builder._processor_connection_specs(specs)
+        ]
+        return {"services": service_components, "group_services": {},
+                "processors": processors, "connections": connections}
+    
+    def _serve(self, mock_nifi_client, deployed):
+        """Make the mock client return the deployed flow"""
+        mock_nifi_client.get_process_group_flow.side_effect = lambda pg_id: {
+            "root": {"processGroupFlow": {"flow": {"processGroups": [
+                {"id": "pg-1", "component": {"id": "pg-1", "name": "Test Oracle to Oracle CDC"}}
+            ]}}},
+            "pg-1": {"processGroupFlow": {"flow": {
+                "processors": [{"component": c} for c in deployed["processors"].values()],
+                "connections": [{"component": c, "status": {"aggregateSnapshot": {
+                    "flowFilesQueued": c.get("queued", 0)
+                }}} for c in deployed["connections"]]
+            }}}
+        }[pg_id]
+        mock_nifi_client.get_process_group_services.side_effect = lambda pg_id: {
+            "controllerServices": [{"component": c} for c in deployed[
+                "services" if pg_id == "root" else "group_services"
+            ].values()]
+        }
+    
+    def test_should_do_nothing_when_flow_matches_mapping(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert not any(result["changes"].values())
+        assert result["process_group"]["id"] == "pg-1"
+        assert result["processors"]["extract"]["id"] == "extract-id"
+        mock_nifi_client.update_processor.assert_not_called()
+        mock_nifi_client.stop_processor.assert_not_called()
+        mock_nifi_client.create_processor.assert_not_called()
+        mock_nifi_client.create_connection.assert_not_called()
+        mock_nifi_client.start_process_group.assert_not_called()
+    
+    def test_should_update_only_changed_processor_properties(self, builder, mock_nifi_client,
+                                                             mock_config_parser, deployed):
+        # Arrange
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.batch.size": "5000"})
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["processors_updated"] == 2
+        assert mock_nifi_client.stop_processor.call_args_list == [call("extract-id"), call("load-id")]
+        assert mock_nifi_client.update_processor.call_args_list == [
+            call("extract-id", {"Max Rows Per Flow File": "5000"}, None),
+            call("load-id", {"Batch Size": "5000"}, None)
+        ]
+        mock_nifi_client.delete_connection.assert_not_called()
+        mock_nifi_client.create_processor.assert_not_called()
+        mock_nifi_client.stop_process_group.assert_not_called()
+        mock_nifi_client.start_process_group.assert_called_once_with("pg-1")
+    
+    def test_should_update_and_reset_stage_tuning(self, builder, mock_nifi_client,
+                                                  mock_config_parser, deployed):
+        # Arrange
+        deployed["processors"]["Convert to JSON"]["config"].update(
+            concurrentlySchedulableTaskCount=4, yieldDuration="1 sec"
+        )
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.load.concurrency": "8"})
+        
+        # Act
+        FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert mock_nifi_client.update_processor.call_args_list == [
+            call("convert-id", None, {"concurrentlySchedulableTaskCount": 1}),
+            call("load-id", None, {"concurrentlySchedulableTaskCount": 8})
+        ]
+    
+    def test_should_update_connection_settings_in_place(self, builder, mock_nifi_client,
+                                                        mock_config_parser, deployed):
+        # Arrange
+        for connection in deployed["connections"]:
+            connection.update(backPressureObjectThreshold=10000, loadBalanceStrategy="DO_NOT_LOAD_BALANCE")
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{
+            "cdc.load.connection.backpressure.count": "500"
+        })
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["connections_updated"] == 1
+        mock_nifi_client.update_connection.assert_called_once_with(
+            "conn-load-log_error", {"backPressureObjectThreshold": 500}
+        )
+        mock_nifi_client.create_connection.assert_not_called()
+        mock_nifi_client.delete_connection.assert_not_called()
+        mock_nifi_client.stop_processor.assert_not_called()
+    
+    def test_should_not_update_partitioned_connections_matching_mapping(self, builder, mock_nifi_client,
+                                                                       mock_config_parser, deployed):
+        # Arrange: NiFi reports the partition attribute as loadBalancePartitionAttribute
+        for connection in deployed["connections"]:
+            if connection["source"]["id"] == "extract-id":
+                connection.update(loadBalanceStrategy="PARTITION_BY_ATTRIBUTE",
+                                  loadBalancePartitionAttribute="partition.id")
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{
+            "cdc.extract.connection.load.balance": "PARTITION_BY_ATTRIBUTE",
+            "cdc.extract.connection.load.balance.attribute": "partition.id"
+        })
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["connections_updated"] == 0
+        mock_nifi_client.update_connection.assert_not_called()
+    
+    def test_should_create_missing_connection_only(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["connections"] = [c for c in deployed["connections"] if c["id"] != "conn-load-log_error"]
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["connections_created"] == 1
+        mock_nifi_client.create_connection.assert_called_once_with("pg-1", "load-id", "log_error-id", ["failure"],
+                                                                   options=None)
+        mock_nifi_client.update_processor.assert_not_called()
+    
+    def test_should_delete_unexpected_processor_and_its_connections(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["processors"]["Debug"] = {"id": "debug-id", "name": "Debug", "type": "x.LogAttribute",
+                                           "config": {"properties": {}}}
+        deployed["connections"].append({"id": "conn-debug", "source": {"id": "extract-id"},
+                                        "destination": {"id": "debug-id"}, "selectedRelationships": ["success"]})
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        mock_nifi_client.delete_connection.assert_called_once_with("conn-debug")
+        mock_nifi_client.delete_processor.assert_called_once_with("debug-id")
+        stopped = [c[0][0] for c in mock_nifi_client.stop_processor.call_args_list]
+        assert set(stopped) == {"debug-id", "extract-id"}
+    
+    def test_should_reconfigure_shared_pools_in_place(self, builder, mock_nifi_client,
+                                                      mock_config_parser, deployed):
+        # Arrange
+        self._serve(mock_nifi_client, deployed)
+        mock_nifi_client.get_controller_service.side_effect = lambda service_id: {"component": {
+            "id": service_id,
+            "referencingComponents": [{"id": "load-id", "component": {
+                "referenceType": "Processor", "state": "RUNNING"
+            }}] if service_id == "target_dbcp-id" else []
+        }}
+        mock_config_parser.parse_datasource.side_effect = lambda name: dict(DATASOURCE, **{"db.pool.size": "20"})
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert not any(result["changes"].values())
+        assert mock_nifi_client.update_controller_service.call_args_list == [
+            call("source_dbcp-id", {"Max Total Connections": "20", "dbcp-max-idle-conns": "20"}),
+            call("target_dbcp-id", {"Max Total Connections": "20", "dbcp-max-idle-conns": "20"})
+        ]
+        # Only the processor running on the target pool is stopped while it is reconfigured
+        mock_nifi_client.stop_processor.assert_called_once_with("load-id")
+        assert mock_nifi_client.mock_calls.index(call.stop_processor("load-id")) < \
+            mock_nifi_client.mock_calls.index(call.disable_controller_service("target_dbcp-id"))
+        mock_nifi_client.start_processor.assert_called_once_with("load-id")
+        mock_nifi_client.stop_process_group.assert_not_called()
+    
+    def test_should_delete_leftover_group_services(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["group_services"] = {
+            "Source DBCP": {"id": "old-dbcp-id", "name": "Source DBCP", "state": "ENABLED", "properties": {}}
+        }
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["services_deleted"] == 1
+        method_names = [c[0] for c in mock_nifi_client.mock_calls]
+        assert method_names.index("disable_process_group_services") < method_names.index("delete_controller_service")
+        mock_nifi_client.delete_controller_service.assert_called_once_with("old-dbcp-id")
+        mock_nifi_client.start_process_group.assert_called_once_with("pg-1")
+    
+    def test_should_recreate_processor_when_type_changes(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["processors"]["Load to Target"]["type"] = "org.apache.nifi.processors.standard.PutDatabaseRecord"
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        mock_nifi_client.delete_processor.assert_called_once_with("load-id")
+        assert mock_nifi_client.create_processor.call_args[0][2] == "Load to Target"
+        assert result["processors"]["load"]["id"] == "new-Load to Target"
+        created = {(c[0][1], c[0][2]) for c in mock_nifi_client.create_connection.call_args_list}
+        assert created == {("convert_sql-id", "new-Load to Target"), ("new-Load to Target", "log_error-id")}
+    
+    def test_should_not_apply_changes_in_dry_run(self, builder, mock_nifi_client, mock_config_parser, deployed):
+        # Arrange
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.batch.size": "5000"})
+        
+        # Act
+        result = builder.reconcile_cdc_flow("test_mapping", dry_run=True)
+        
+        # Assert
+        assert result["changes"]["processors_updated"] == 2
+        mock_nifi_client.update_processor.assert_not_called()
+        mock_nifi_client.stop_processor.assert_not_called()
+    
+    def test_should_create_flow_when_not_deployed(self, builder, mock_nifi_client):
+        # Arrange
+        mock_nifi_client.get_process_group_flow.return_value = {"processGroupFlow": {"flow": {"processGroups": []}}}
+        builder.create_cdc_flow = Mock(return_value={"process_group": {"id": "pg-new"}, "processors": {}})
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        builder.create_cdc_flow.assert_called_once_with("test_mapping")
+        assert result["changes"] == {"create_flow": True}
+    
+    def test_should_not_create_shared_services_in_dry_run(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        for spec in builder._record_service_specs(MAPPING).values():
+            del deployed["services"][spec["name"]]
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = builder.reconcile_cdc_flow("test_mapping", dry_run=True)
+        
+        # Assert
+        assert result["changes"]["processors_updated"] == 1
+        mock_nifi_client.create_controller_service.assert_not_called()
+        mock_nifi_client.enable_controller_service.assert_not_called()
+    
+    def test_should_disable_running_extract_when_slicing_is_added(self, builder, mock_nifi_client,
+                                                                  mock_config_parser, deployed):
+        # Arrange
+        self._serve(mock_nifi_client, deployed)
+        mock_config_parser.parse_mapping.return_value = dict(MAPPING, **{"cdc.window.slice": "1h"})
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["processors_disabled"] == 1
+        assert mock_nifi_client.mock_calls.index(call.wait_for_processor_state("extract-id", "STOPPED")) < \
+            mock_nifi_client.mock_calls.index(call.disable_processor("extract-id"))
+    
+    def test_should_enable_extract_when_slicing_is_removed(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["processors"]["Extract CDC Data"]["state"] = "DISABLED"
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["processors_enabled"] == 1
+        mock_nifi_client.set_processor_run_status.assert_called_once_with("extract-id", "STOPPED")
+        mock_nifi_client.stop_processor.assert_not_called()
+        assert mock_nifi_client.mock_calls.index(call.set_processor_run_status("extract-id", "STOPPED")) < \
+            mock_nifi_client.mock_calls.index(call.start_process_group("pg-1"))
+    
+    def test_should_refuse_to_delete_connection_holding_flowfiles(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["connections"].append({"id": "conn-stale", "source": {"id": "extract-id"},
+                                        "destination": {"id": "load-id"}, "selectedRelationships": ["failure"],
+                                        "queued": 42})
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        plan = builder.reconcile_cdc_flow("test_mapping", dry_run=True)
+        with pytest.raises(RuntimeError, match="42 FlowFiles"):
+            FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert plan["changes"]["flowfiles_to_drop"] == 42
+        mock_nifi_client.stop_processor.assert_not_called()
+        mock_nifi_client.delete_connection.assert_not_called()
+    
+    def test_should_drop_queued_flowfiles_when_asked(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        deployed["connections"].append({"id": "conn-stale", "source": {"id": "extract-id"},
+                                        "destination": {"id": "load-id"}, "selectedRelationships": ["failure"],
+                                        "queued": 42})
+        self._serve(mock_nifi_client, deployed)
+        
+        # Act
+        FlowReconciler(builder).reconcile("test_mapping", drop_queues=True)
+        
+        # Assert
+        assert mock_nifi_client.mock_calls.index(call.drop_connection_queue("conn-stale")) < \
+            mock_nifi_client.mock_calls.index(call.delete_connection("conn-stale"))
+        assert mock_nifi_client.mock_calls.index(call.wait_for_processor_state("extract-id", "STOPPED")) < \
+            mock_nifi_client.mock_calls.index(call.drop_connection_queue("conn-stale"))
+    
+    def test_should_move_flow_deployed_under_root_group(self, builder, mock_nifi_client, deployed):
+        # Arrange: the flow was deployed before flows were kept under the CDC parent group
+        builder.env_config["nifi_cdc_process_group_name"] = "CDC-Flows"
+        self._serve(mock_nifi_client, deployed)
+        served = mock_nifi_client.get_process_group_flow.side_effect
+        mock_nifi_client.get_process_group_flow.side_effect = lambda pg_id: {
+            "root": {"processGroupFlow": {"flow": {"processGroups": [
+                {"id": "cdc-1", "component": {"id": "cdc-1", "name": "CDC-Flows"}},
+                {"id": "pg-1", "component": {"id": "pg-1", "name": "Test Oracle to Oracle CDC"}}
+            ]}}},
+            "cdc-1": {"processGroupFlow": {"flow": {"processGroups": []}}}
+        }.get(pg_id) or served(pg_id)
+        mock_nifi_client.get_process_group_services.side_effect = lambda pg_id: {
+            "controllerServices": [{"component": c} for c in deployed[
+                "services" if pg_id == "cdc-1" else "group_services"
+            ].values()]
+        }
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping")
+        
+        # Assert
+        assert result["changes"]["flow_moved"] is True
+        assert result["process_group"]["id"] == "pg-1"
+        mock_nifi_client.create_process_group.assert_not_called()
+        assert mock_nifi_client.mock_calls.index(call.stop_process_group("pg-1")) < \
+            mock_nifi_client.mock_calls.index(call.move_process_group("pg-1", "root", "cdc-1"))
+        mock_nifi_client.start_process_group.assert_called_once_with("pg-1")
+    
+    def test_should_not_move_root_flow_in_dry_run(self, builder, mock_nifi_client, deployed):
+        # Arrange
+        builder.env_config["nifi_cdc_process_group_name"] = "CDC-Flows"
+        self._serve(mock_nifi_client, deployed)
+        served = mock_nifi_client.get_process_group_flow.side_effect
+        mock_nifi_client.get_process_group_flow.side_effect = lambda pg_id: {
+            "root": {"processGroupFlow": {"flow": {"processGroups": [
+                {"id": "cdc-1", "component": {"id": "cdc-1", "name": "CDC-Flows"}},
+                {"id": "pg-1", "component": {"id": "pg-1", "name": "Test Oracle to Oracle CDC"}}
+            ]}}},
+            "cdc-1": {"processGroupFlow": {"flow": {"processGroups": []}}}
+        }.get(pg_id) or served(pg_id)
+        
+        # Act
+        result = FlowReconciler(builder).reconcile("test_mapping", dry_run=True)
+        
+        # Assert
+        assert result["changes"]["flow_moved"] is True
+        mock_nifi_client.move_process_group.assert_not_called()
+        mock_nifi_client.stop_process_group.assert_not_called()
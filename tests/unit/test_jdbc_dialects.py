@@ -0,0 +1,67 @@
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from jdbc_dialects import JdbcDialect, DIALECTS, GENERIC_DIALECT, dialect_of, get_dialect, register_dialect
+
+
+class TestJdbcDialects:
+    
+    def test_should_default_to_oracle_without_db_type(self):
+        # Act & Assert
+        assert dialect_of({}).name == "oracle"
+        assert get_dialect("postgresql").nifi_database_type == "PostgreSQL"
+        assert get_dialect("db2") is GENERIC_DIALECT
+    
+    def test_should_build_mysql_url_with_batch_flags_and_extra_params(self):
+        # Arrange
+        db_properties = {
+            "db.type": "mysql",
+            "db.host": "mysql-host",
+            "db.port": "3306",
+            "db.name": "offload",
+            "db.jdbc.params": "useSSL=false"
+        }
+        
+        # Act
+        url = dialect_of(db_properties).jdbc_url(db_properties)
+        
+        # Assert
+        assert url == "jdbc:mysql://mysql-host:3306/offload?rewriteBatchedStatements=true&useSSL=false"
+    
+    def test_should_resolve_driver_class(self):
+        # Act & Assert
+        assert get_dialect("postgresql").driver({}) == "org.postgresql.Driver"
+        assert get_dialect("oracle").driver({"oracle.driver.class": "oracle.jdbc.driver.OracleDriver"}) == \
+            "oracle.jdbc.driver.OracleDriver"
+        assert get_dialect("mysql").driver({"db.driver.class": "org.mariadb.jdbc.Driver"}) == \
+            "org.mariadb.jdbc.Driver"
+        with pytest.raises(ValueError, match="db.driver.class"):
+            GENERIC_DIALECT.driver({})
+    
+    def test_should_write_timestamps_in_dialect_sql(self):
+        # Act & Assert
+        assert get_dialect("oracle").timestamp_literal("2025-07-07 00:00:00") == \
+            "TO_TIMESTAMP('2025-07-07 00:00:00', 'YYYY-MM-DD HH24:MI:SS')"
+        assert get_dialect("postgresql").timestamp_literal("2025-07-07 00:00:00") == \
+            "TIMESTAMP '2025-07-07 00:00:00'"
+    
+    def test_should_register_custom_dialect(self):
+        # Arrange
+        dialect = JdbcDialect("db2", "Generic", url_template="jdbc:db2://{host}:{port}/{database}",
+                              driver_class="com.ibm.db2.jcc.DB2Driver")
+        
+        # Act
+        register_dialect(dialect)
+        try:
+            url = dialect_of({"db.type": "db2", "db.host": "h", "db.port": "50000", "db.name": "SAMPLE"}).jdbc_url(
+                {"db.host": "h", "db.port": "50000", "db.name": "SAMPLE"}
+            )
+        finally:
+            del DIALECTS["db2"]
+        
+        # Assert
+        assert url == "jdbc:db2://h:50000/SAMPLE"
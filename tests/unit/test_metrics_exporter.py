@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import Mock
+from pathlib import Path
+import urllib.request
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from fleet_monitor import FleetMonitor
+from metrics_exporter import MetricsExporter, render_openmetrics, CONTENT_TYPE
+
+
+FLOWS = {
+    "emp": {
+        "queued_count": 30, "queued_bytes": 3000, "throughput": 2.0, "bytes_per_second": 1000.0,
+        "lag_seconds": 15.0, "max_value_lag_seconds": 600.0, "active_threads": 1,
+        "stages": {"load": {"flowfiles_in": 600, "flowfiles_out": 0, "bytes_read": 300000,
+                            "bytes_written": 0, "active_threads": 1}},
+        "connections": [{"name": "Extract CDC Data -> Load to Target", "source": "Extract CDC Data",
+                         "destination": "Load to Target", "queued_count": 30, "queued_bytes": 3000,
+                         "percent_use_count": 12, "percent_use_bytes": 40}],
+        "bulletins": [{"level": "ERROR"}]
+    },
+    "dept \"old\"": {
+        "queued_count": 5, "queued_bytes": 500, "throughput": 0.0, "bytes_per_second": 0.0,
+        "lag_seconds": None, "active_threads": 0, "stages": {}, "connections": [], "bulletins": []
+    }
+}
+
+
+class TestMetricsExporter:
+
+    @pytest.fixture
+    def mock_monitor(self):
+        """Create mock monitor whose watch loop publishes one snapshot"""
+        monitor = Mock(spec=FleetMonitor)
+        monitor.flows = FLOWS
+        monitor.polled_at = 1751900000.0
+        monitor.watch.side_effect = lambda callback, on_error=None: callback(FLOWS)
+        return monitor
+
+    def test_should_render_per_mapping_metrics(self):
+        # Act
+        text = render_openmetrics(FLOWS, polled_at=1751900000.0)
+
+        # Assert
+        lines = text.splitlines()
+        assert "nificdc_up 1.0" in lines
+        assert 'nificdc_flow_queued_flowfiles{mapping="emp"} 30.0' in lines
+        assert 'nificdc_flow_max_value_lag_seconds{mapping="emp"} 600.0' in lines
+        assert 'nificdc_stage_flowfiles_in{mapping="emp",stage="load"} 600.0' in lines
+        assert ('nificdc_connection_back_pressure_ratio{mapping="emp",connection="Extract CDC Data -> '
+                'Load to Target",source="Extract CDC Data",destination="Load to Target"} 0.12') in lines
+        assert 'nificdc_flow_bulletins{mapping="emp"} 1.0' in lines
+        assert "# TYPE nificdc_flow_drain_seconds gauge" in lines
+        assert text.endswith("# EOF\n")
+
+    def test_should_skip_unknown_values_and_escape_labels(self):
+        # Act
+        lines = render_openmetrics(FLOWS).splitlines()
+
+        # Assert
+        assert 'nificdc_flow_queued_flowfiles{mapping="dept \\"old\\""} 5.0' in lines
+        assert not any(line.startswith('nificdc_flow_drain_seconds{mapping="dept') for line in lines)
+        assert not any(line.startswith('nificdc_flow_max_value_lag_seconds{mapping="dept') for line in lines)
+
+    def test_should_serve_rendered_snapshot_without_polling_on_scrape(self, mock_monitor):
+        # Arrange
+        exporter = MetricsExporter(mock_monitor, "127.0.0.1", 0)
+        exporter.start()
+
+        try:
+            # Act
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+            with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+                response.read()
+        finally:
+            exporter.stop()
+
+        # Assert
+        assert content_type == CONTENT_TYPE
+        assert 'nificdc_flow_queued_flowfiles{mapping="emp"} 30.0' in body
+        mock_monitor.watch.assert_called_once()
+
+    def test_should_flag_stale_metrics_after_failed_poll(self, mock_monitor):
+        # Arrange
+        exporter = MetricsExporter(mock_monitor)
+
+        # Act
+        exporter._on_poll_error(RuntimeError("NiFi unavailable"))
+
+        # Assert
+        lines = exporter.payload.decode().splitlines()
+        assert "nificdc_up 0.0" in lines
+        assert 'nificdc_flow_queued_flowfiles{mapping="emp"} 30.0' in lines
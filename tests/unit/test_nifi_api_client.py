@@ -1,5 +1,7 @@
 import pytest
+import base64
 import json
+import time
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 import sys
@@ -8,7 +10,7 @@ import requests
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
-from nifi_api_client import NiFiAPIClient
+from nifi_api_client import NiFiAPIClient, TokenBucket, endpoint_template, request_context
 
 
 class TestNiFiAPIClient:
@@ -124,6 +126,25 @@ class TestNiFiAPIClient:
             call_args = mock_post.call_args
             assert call_args[1]["json"]["component"]["position"] == {"x": 100, "y": 200}
     
+    def test_should_create_processor_with_config_overrides(self, client, mock_responses):
+        # Arrange
+        with patch.object(client.session, 'post') as mock_post:
+            mock_post.return_value.json.return_value = mock_responses["processor_response"]
+            mock_post.return_value.status_code = 201
+            
+            # Act
+            client.create_processor(
+                "test-pg-123",
+                "org.apache.nifi.processors.standard.LogAttribute",
+                "Log Errors",
+                {"Log Level": "error"},
+                config={"autoTerminatedRelationships": ["success"]}
+            )
+            
+            # Assert
+            config = mock_post.call_args[1]["json"]["component"]["config"]
+            assert config == {"properties": {"Log Level": "error"}, "autoTerminatedRelationships": ["success"]}
+    
     def test_should_create_controller_service(self, client, mock_responses):
         # Arrange
         with patch.object(client.session, 'post') as mock_post:
@@ -167,6 +188,371 @@ class TestNiFiAPIClient:
                 mock_get.assert_called_once()
                 mock_put.assert_called_once()
     
+    def test_should_use_cached_revision_from_create_response(self, client, mock_responses):
+        # Arrange
+        with patch.object(client.session, 'post') as mock_post:
+            mock_post.return_value.json.return_value = mock_responses["controller_service_response"]
+            client.create_controller_service("test-pg-123", "org.apache.nifi.dbcp.DBCPConnectionPool", "Test DBCP", {})
+        
+        with patch.object(client.session, 'get') as mock_get:
+            with patch.object(client.session, 'put') as mock_put:
+                mock_put.return_value.json.return_value = {
+                    "revision": {"version": 2},
+                    "component": {"id": "test-dbcp-789", "state": "ENABLING"}
+                }
+                
+                # Act
+                client.enable_controller_service("test-dbcp-789")
+        
+        # Assert
+        mock_get.assert_not_called()
+        assert mock_put.call_args[1]["json"]["revision"] == {"version": 1}
+        assert client._revisions["test-dbcp-789"] == {"version": 2}
+    
+    def test_should_refresh_revision_once_on_conflict(self, client):
+        # Arrange
+        client._revisions["test-proc-456"] = {"version": 1}
+        conflict = Mock(status_code=409)
+        conflict.raise_for_status.side_effect = requests.HTTPError("409 Conflict", response=conflict)
+        success = Mock(status_code=200)
+        success.json.return_value = {"revision": {"version": 6}, "component": {"id": "test-proc-456", "state": "RUNNING"}}
+        current = Mock(status_code=200)
+        current.json.return_value = {"revision": {"version": 5}, "component": {"id": "test-proc-456"}}
+        
+        with patch.object(client.session, 'put', side_effect=[conflict, success]) as mock_put:
+            with patch.object(client.session, 'get', return_value=current) as mock_get:
+                # Act
+                result = client.start_processor("test-proc-456")
+        
+        # Assert
+        assert result["component"]["state"] == "RUNNING"
+        mock_get.assert_called_once()
+        assert mock_put.call_args_list[0][1]["json"]["revision"] == {"version": 1}
+        assert mock_put.call_args_list[1][1]["json"]["revision"] == {"version": 5}
+        assert client._revisions["test-proc-456"] == {"version": 6}
+    
+    def test_should_not_retry_non_conflict_errors(self, client):
+        # Arrange
+        client._revisions["test-proc-456"] = {"version": 1}
+        error = Mock(status_code=400)
+        error.raise_for_status.side_effect = requests.HTTPError("400 Bad Request", response=error)
+        
+        with patch.object(client.session, 'put', return_value=error) as mock_put:
+            # Act & Assert
+            with pytest.raises(requests.HTTPError):
+                client.start_processor("test-proc-456")
+        
+        mock_put.assert_called_once()
+    
+    def test_should_retry_transient_errors_with_backoff(self, client):
+        # Arrange
+        unavailable = Mock(status_code=503, headers={})
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+        
+        with patch.object(client.session, 'get', side_effect=[
+            requests.ReadTimeout("read timed out"), unavailable, ok
+        ]) as mock_get, patch('nifi_api_client.time.sleep') as mock_sleep:
+            # Act
+            result = client.get_process_group("pg-1")
+        
+        # Assert
+        assert result == {"component": {"id": "pg-1"}}
+        assert mock_get.call_count == 3
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 1.0 and 0 <= delays[1] <= 2.0
+    
+    def test_should_give_up_after_retry_count(self, client):
+        # Arrange
+        unavailable = Mock(status_code=502, headers={})
+        unavailable.raise_for_status.side_effect = requests.HTTPError("502 Bad Gateway", response=unavailable)
+        
+        with patch.object(client.session, 'get', return_value=unavailable) as mock_get, \
+                patch('nifi_api_client.time.sleep'):
+            # Act & Assert
+            with pytest.raises(requests.HTTPError):
+                client.get_process_group("pg-1")
+        
+        assert mock_get.call_count == client.retry_count + 1
+    
+    def test_should_only_resend_post_when_nifi_refused_it(self, client):
+        # Arrange
+        throttled = Mock(status_code=429, headers={"Retry-After": "2"})
+        created = Mock(status_code=201)
+        created.json.return_value = {"component": {"id": "pg-new"}}
+        
+        with patch.object(client.session, 'post', side_effect=[throttled, created]) as mock_post, \
+                patch('nifi_api_client.time.sleep') as mock_sleep:
+            # Act
+            client.create_process_group("root", "Test")
+        with patch.object(client.session, 'post', side_effect=requests.ReadTimeout("read timed out")) as timed_out:
+            # Assert: a POST that may have been applied is not sent twice
+            with pytest.raises(requests.ReadTimeout):
+                client.create_process_group("root", "Test")
+        
+        assert mock_post.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
+        timed_out.assert_called_once()
+    
+    def test_should_back_off_on_repeated_revision_conflicts(self, client):
+        # Arrange
+        client._revisions["test-proc-456"] = {"version": 1}
+        conflict = Mock(status_code=409)
+        conflict.raise_for_status.side_effect = requests.HTTPError("409 Conflict", response=conflict)
+        success = Mock(status_code=200)
+        success.json.return_value = {"revision": {"version": 9}, "component": {"id": "test-proc-456"}}
+        current = Mock(status_code=200)
+        current.json.return_value = {"revision": {"version": 8}, "component": {"id": "test-proc-456"}}
+        
+        with patch.object(client.session, 'put', side_effect=[conflict, conflict, success]) as mock_put, \
+                patch.object(client.session, 'get', return_value=current), \
+                patch('nifi_api_client.time.sleep') as mock_sleep:
+            # Act
+            client.start_processor("test-proc-456")
+        
+        # Assert
+        assert mock_put.call_count == 3
+        mock_sleep.assert_called_once()
+        assert client._revisions["test-proc-456"] == {"version": 9}
+    
+    def test_should_limit_request_rate_with_token_bucket(self):
+        # Arrange
+        bucket = TokenBucket(rate=10, burst=2)
+        
+        with patch('nifi_api_client.time.sleep') as mock_sleep:
+            # Act
+            bucket.acquire()
+            bucket.acquire()
+            mock_sleep.side_effect = lambda seconds: setattr(bucket, "_tokens", 1)
+            bucket.acquire()
+        
+        # Assert: the burst passes at once, the next request waits for a token
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(0.1, abs=0.01)
+    
+    def test_should_configure_client_from_environment(self):
+        # Act
+        client = NiFiAPIClient.from_env_config({
+            "nifi_api_base_url": "http://test-nifi:8080/nifi-api",
+            "nifi_api_timeout": "5000",
+            "api_retry_count": "5",
+            "api_retry_delay": "250",
+            "api_rate_limit": "20",
+            "connection_pool_size": "32"
+        })
+        
+        # Assert
+        adapter = client.session.get_adapter("http://test-nifi:8080/nifi-api")
+        assert adapter.timeout == (5.0, 5.0)
+        assert adapter._pool_maxsize == 32 and adapter._pool_block
+        assert client.retry_count == 5 and client.retry_delay == 0.25
+        assert client._rate_limiter.rate == 20.0
+    
+    def test_should_refresh_token_before_it_expires(self):
+        # Arrange
+        def jwt(exp):
+            payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+            return f"header.{payload}.signature"
+        
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+        with patch('requests.Session.post') as mock_post:
+            mock_post.return_value = Mock(status_code=201, text=jwt(time.time() + 30))
+            client = NiFiAPIClient("http://test-nifi:8080/nifi-api", "test_user", "test_pass")
+            mock_post.return_value = Mock(status_code=201, text=jwt(time.time() + 3600))
+            
+            with patch.object(client.session, 'get', return_value=ok):
+                # Act
+                client.get_process_group("pg-1")
+                client.get_process_group("pg-1")
+        
+        # Assert: the token expiring within a minute is renewed once, the new one is reused
+        assert mock_post.call_count == 2
+        assert client.session.headers['Authorization'] == f"Bearer {mock_post.return_value.text}"
+    
+    def test_should_authenticate_again_when_token_is_rejected(self, authenticated_client):
+        # Arrange
+        rejected = Mock(status_code=401)
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+        
+        with patch.object(authenticated_client.session, 'get', side_effect=[rejected, ok]) as mock_get, \
+                patch.object(authenticated_client.session, 'post',
+                             return_value=Mock(status_code=201, text="renewed-token")) as mock_post:
+            # Act
+            result = authenticated_client.get_process_group("pg-1")
+        
+        # Assert
+        assert result == {"component": {"id": "pg-1"}}
+        assert mock_get.call_count == 2
+        mock_post.assert_called_once()
+        assert authenticated_client.session.headers['Authorization'] == 'Bearer renewed-token'
+    
+    def test_should_spread_requests_over_cluster_nodes(self):
+        # Arrange
+        client = NiFiAPIClient("http://nifi-1:8080/nifi-api, http://nifi-2:8080/nifi-api/")
+        ok = Mock(status_code=200)
+        ok.json.return_value = {}
+        
+        with patch.object(client.session, 'get', return_value=ok) as mock_get:
+            # Act
+            for _ in range(3):
+                client.get_process_group("pg-1")
+        
+        # Assert
+        assert client.base_url == "http://nifi-1:8080/nifi-api"
+        assert [c[0][0] for c in mock_get.call_args_list] == [
+            "http://nifi-1:8080/nifi-api/process-groups/pg-1",
+            "http://nifi-2:8080/nifi-api/process-groups/pg-1",
+            "http://nifi-1:8080/nifi-api/process-groups/pg-1"
+        ]
+    
+    def test_should_skip_failed_node_until_cooldown_ends(self):
+        # Arrange
+        client = NiFiAPIClient("http://nifi-1:8080/nifi-api,http://nifi-2:8080/nifi-api")
+        ok = Mock(status_code=200)
+        ok.json.return_value = {}
+        
+        with patch.object(client.session, 'get', side_effect=[requests.ConnectionError("refused"), ok, ok, ok]) \
+                as mock_get, patch('nifi_api_client.time.sleep'):
+            # Act
+            client.get_process_group("pg-1")
+            client.get_process_group("pg-1")
+            client.get_process_group("pg-1")
+        
+        # Assert: after nifi-1 failed, every request goes to nifi-2
+        urls = [c[0][0] for c in mock_get.call_args_list]
+        assert urls[0].startswith("http://nifi-1")
+        assert all(url.startswith("http://nifi-2") for url in urls[1:])
+    
+    def test_should_send_each_node_its_own_token(self):
+        # Arrange
+        tokens = iter(["token-1", "token-2"])
+        with patch('requests.Session.post') as mock_post:
+            mock_post.side_effect = lambda url, data: Mock(status_code=201, text=next(tokens))
+            client = NiFiAPIClient("http://nifi-1:8080/nifi-api,http://nifi-2:8080/nifi-api",
+                                   "test_user", "test_pass")
+            ok = Mock(status_code=200)
+            ok.json.return_value = {}
+            
+            with patch.object(client.session, 'get', return_value=ok) as mock_get:
+                # Act
+                client.get_process_group("pg-1")
+                client.get_process_group("pg-1")
+        
+        # Assert
+        assert [c[0][0] for c in mock_post.call_args_list] == [
+            "http://nifi-1:8080/nifi-api/access/token",
+            "http://nifi-2:8080/nifi-api/access/token"
+        ]
+        assert client.session.headers['Authorization'] == 'Bearer token-1'
+        assert mock_get.call_args_list[1][1]["headers"] == {"Authorization": "Bearer token-2"}
+    
+    def test_should_configure_mutual_tls_from_environment(self):
+        # Act
+        client = NiFiAPIClient.from_env_config({
+            "nifi_api_base_url": "https://test-nifi:8443/nifi-api",
+            "nifi_api_client_cert_path": "/certs/client.pem",
+            "nifi_api_client_key_path": "/certs/client.key",
+            "nifi_api_ca_cert_path": "/certs/ca.pem"
+        })
+        
+        # Assert
+        assert client.session.cert == ("/certs/client.pem", "/certs/client.key")
+        assert client.session.verify == "/certs/ca.pem"
+    
+    def test_should_template_component_ids_in_endpoints(self):
+        # Act & Assert
+        assert endpoint_template("/processors/test-proc-456/run-status") == "/processors/{id}/run-status"
+        assert endpoint_template("/process-groups/root/process-groups/upload") == \
+            "/process-groups/{id}/process-groups/upload"
+        assert endpoint_template("/flow/process-groups/pg-1/controller-services?includeAncestorGroups=false") == \
+            "/flow/process-groups/{id}/controller-services"
+        assert endpoint_template("/flow/bulletin-board") == "/flow/bulletin-board"
+    
+    def test_should_run_request_hooks_with_labels_status_and_retries(self, client):
+        # Arrange
+        started, finished = [], []
+        client.add_request_hook(pre=started.append, post=finished.append)
+        unavailable = Mock(status_code=503, headers={})
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+        
+        with patch.object(client.session, 'get', side_effect=[unavailable, ok]), \
+                patch('nifi_api_client.time.sleep'):
+            # Act
+            with request_context(flow="emp", phase="processors"):
+                client.get_process_group("pg-1")
+        
+        # Assert
+        assert len(started) == len(finished) == 1
+        call = finished[0]
+        assert call["endpoint"] == "GET /process-groups/{id}"
+        assert call["labels"] == {"flow": "emp", "phase": "processors"}
+        assert call["status"] == 200 and call["retries"] == 1
+        assert call["elapsed"] >= 0 and call["error"] is None
+    
+    def test_should_report_failed_requests_and_waits_to_hooks(self, client):
+        # Arrange
+        finished = []
+        client.add_request_hook(post=finished.append)
+        client._revisions["test-proc-456"] = {"version": 1}
+        stopped = Mock(status_code=200)
+        stopped.json.return_value = {"component": {"state": "STOPPED"}}
+        
+        with patch.object(client.session, 'get', return_value=stopped), \
+                patch.object(client.session, 'put', side_effect=requests.ConnectionError("refused")), \
+                patch('nifi_api_client.time.sleep'):
+            # Act
+            client.wait_for_processor_state("test-proc-456", "STOPPED")
+            with pytest.raises(requests.ConnectionError):
+                client.update_processor("test-proc-456", {"a": "b"})
+        
+        # Assert: the wait spans its poll, the failed PUT carries its error
+        assert [call["endpoint"] for call in finished][:2] == ["GET /processors/{id}", "WAIT /processors/{id}"]
+        assert finished[-1]["error"] == "ConnectionError: refused"
+        assert finished[-1]["retries"] == client.retry_count
+    
+    def test_should_keep_requests_working_when_a_hook_fails(self, client):
+        # Arrange
+        client.add_request_hook(post=Mock(side_effect=RuntimeError("broken hook")))
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+        
+        with patch.object(client.session, 'get', return_value=ok):
+            # Act
+            result = client.get_process_group("pg-1")
+        
+        # Assert
+        assert result == {"component": {"id": "pg-1"}}
+    
+    def test_should_remember_revisions_from_flow_listings_without_going_backwards(self, client):
+        # Arrange
+        client._revisions["proc-1"] = {"version": 7}
+        
+        # Act
+        client._remember_revisions({
+            "processGroupFlow": {"flow": {
+                "processors": [
+                    {"id": "proc-1", "revision": {"version": 3}},
+                    {"id": "proc-2", "revision": {"version": 4}}
+                ],
+                "connections": [{"id": "conn-1", "revision": {"version": 1}}]
+            }}
+        })
+        client._remember_revisions({"controllerServices": [
+            {"revision": {"version": 2}, "component": {"id": "svc-1"}}
+        ]})
+        
+        # Assert
+        assert client._revisions == {
+            "proc-1": {"version": 7},
+            "proc-2": {"version": 4},
+            "conn-1": {"version": 1},
+            "svc-1": {"version": 2}
+        }
+    
     def test_should_create_connection(self, client, mock_responses):
         # Arrange
         with patch.object(client.session, 'post') as mock_post:
@@ -185,6 +571,45 @@ class TestNiFiAPIClient:
             assert result["component"]["id"] == "test-conn-111"
             assert result["component"]["selectedRelationships"] == ["success"]
     
+    def test_should_create_load_balanced_connection(self, client, mock_responses):
+        # Arrange
+        with patch.object(client.session, 'post') as mock_post:
+            mock_post.return_value.json.return_value = mock_responses["connection_response"]
+            mock_post.return_value.status_code = 201
+            
+            # Act
+            client.create_connection(
+                "test-pg-123",
+                "test-proc-456",
+                "test-proc-457",
+                ["success"],
+                options={"loadBalanceStrategy": "ROUND_ROBIN"}
+            )
+            
+            # Assert
+            component = mock_post.call_args[1]["json"]["component"]
+            assert component["loadBalanceStrategy"] == "ROUND_ROBIN"
+            assert component["backPressureObjectThreshold"] == "10000"
+    
+    def test_should_update_connection_settings(self, client, mock_responses):
+        # Arrange
+        with patch.object(client.session, 'get') as mock_get:
+            with patch.object(client.session, 'put') as mock_put:
+                mock_get.return_value.json.return_value = mock_responses["connection_response"]
+                mock_get.return_value.status_code = 200
+                mock_put.return_value.json.return_value = mock_responses["connection_response"]
+                mock_put.return_value.status_code = 200
+                
+                # Act
+                client.update_connection("conn-1", {"backPressureObjectThreshold": 500})
+                
+                # Assert
+                assert mock_put.call_args[0][0] == "http://test-nifi:8080/nifi-api/connections/conn-1"
+                assert mock_put.call_args[1]["json"]["component"] == {
+                    "id": "conn-1",
+                    "backPressureObjectThreshold": 500
+                }
+    
     def test_should_start_processor(self, client, mock_responses):
         # Arrange
         with patch.object(client.session, 'get') as mock_get:
@@ -203,6 +628,351 @@ class TestNiFiAPIClient:
                 # Assert
                 assert result["component"]["state"] == "RUNNING"
     
+    def test_should_run_processor_once(self, client, mock_responses):
+        # Arrange
+        with patch.object(client.session, 'get') as mock_get:
+            with patch.object(client.session, 'put') as mock_put:
+                mock_get.return_value.json.return_value = mock_responses["processor_response"]
+                mock_get.return_value.status_code = 200
+                mock_put.return_value.json.return_value = mock_responses["processor_response"]
+                mock_put.return_value.status_code = 200
+                
+                # Act
+                client.run_processor_once("test-proc-456")
+                
+                # Assert
+                assert mock_put.call_args[0][0] == \
+                    "http://test-nifi:8080/nifi-api/processors/test-proc-456/run-status"
+                assert mock_put.call_args[1]["json"]["state"] == "RUN_ONCE"
+    
+    def test_should_wait_for_controller_service_state_with_backoff(self, client):
+        # Arrange
+        enabling = Mock(status_code=200)
+        enabling.json.return_value = {"component": {"id": "test-dbcp-789", "state": "ENABLING"}}
+        enabled = Mock(status_code=200)
+        enabled.json.return_value = {"component": {"id": "test-dbcp-789", "state": "ENABLED"}}
+        
+        with patch.object(client.session, 'get', side_effect=[enabling, enabling, enabled]) as mock_get:
+            with patch('time.sleep') as mock_sleep:
+                # Act
+                result = client.wait_for_controller_service_state("test-dbcp-789", "ENABLED")
+        
+        # Assert
+        assert result["component"]["state"] == "ENABLED"
+        assert mock_get.call_count == 3
+        assert mock_get.call_args[0][0] == "http://test-nifi:8080/nifi-api/controller-services/test-dbcp-789"
+        sleeps = [c[0][0] for c in mock_sleep.call_args_list]
+        assert sleeps == [0.1, 0.2]
+    
+    def test_should_return_immediately_when_processor_already_in_state(self, client):
+        # Arrange
+        running = Mock(status_code=200)
+        running.json.return_value = {"component": {"id": "test-proc-456", "state": "RUNNING"}}
+        
+        with patch.object(client.session, 'get', return_value=running) as mock_get:
+            with patch('time.sleep') as mock_sleep:
+                # Act
+                result = client.wait_for_processor_state("test-proc-456", "RUNNING")
+        
+        # Assert
+        assert result["component"]["state"] == "RUNNING"
+        mock_get.assert_called_once_with("http://test-nifi:8080/nifi-api/processors/test-proc-456")
+        mock_sleep.assert_not_called()
+    
+    def test_should_raise_timeout_when_state_not_reached(self, client):
+        # Arrange
+        enabling = Mock(status_code=200)
+        enabling.json.return_value = {"component": {
+            "id": "test-dbcp-789",
+            "state": "ENABLING",
+            "validationErrors": ["Driver class not found"]
+        }}
+        
+        with patch.object(client.session, 'get', return_value=enabling):
+            with patch('time.sleep'):
+                with patch('time.monotonic', side_effect=[0.0, 0.5, 1.5]):
+                    # Act & Assert
+                    with pytest.raises(TimeoutError) as exc_info:
+                        client.wait_for_controller_service_state("test-dbcp-789", "ENABLED", timeout=1.0)
+        
+        assert "Driver class not found" in str(exc_info.value)
+    
+    def test_should_start_process_group_with_single_request(self, client):
+        # Arrange
+        with patch.object(client.session, 'put') as mock_put:
+            mock_put.return_value.json.return_value = {"id": "test-pg-123", "state": "RUNNING"}
+            
+            # Act
+            result = client.start_process_group("test-pg-123")
+        
+        # Assert
+        assert result["state"] == "RUNNING"
+        mock_put.assert_called_once_with(
+            "http://test-nifi:8080/nifi-api/flow/process-groups/test-pg-123",
+            json={"id": "test-pg-123", "state": "RUNNING"}
+        )
+    
+    def test_should_stop_process_group_with_single_request(self, client):
+        # Arrange
+        with patch.object(client.session, 'put') as mock_put:
+            # Act
+            client.stop_process_group("test-pg-123")
+        
+        # Assert
+        assert mock_put.call_args[1]["json"] == {"id": "test-pg-123", "state": "STOPPED"}
+    
+    def test_should_enable_process_group_services_with_single_request(self, client):
+        # Arrange
+        with patch.object(client.session, 'put') as mock_put:
+            # Act
+            client.enable_process_group_services("test-pg-123")
+        
+        # Assert
+        mock_put.assert_called_once_with(
+            "http://test-nifi:8080/nifi-api/flow/process-groups/test-pg-123/controller-services",
+            json={"id": "test-pg-123", "state": "ENABLED"}
+        )
+    
+    def test_should_wait_for_all_process_group_services(self, client):
+        # Arrange
+        enabling = Mock(status_code=200)
+        enabling.json.return_value = {"controllerServices": [
+            {"component": {"id": "svc-1", "state": "ENABLED"}},
+            {"component": {"id": "svc-2", "state": "ENABLING"}}
+        ]}
+        enabled = Mock(status_code=200)
+        enabled.json.return_value = {"controllerServices": [
+            {"component": {"id": "svc-1", "state": "ENABLED"}},
+            {"component": {"id": "svc-2", "state": "ENABLED"}}
+        ]}
+        
+        with patch.object(client.session, 'get', side_effect=[enabling, enabled]) as mock_get:
+            with patch('time.sleep'):
+                # Act
+                client.wait_for_process_group_services_state("test-pg-123", "ENABLED")
+        
+        # Assert
+        assert mock_get.call_count == 2
+        assert mock_get.call_args[0][0].startswith(
+            "http://test-nifi:8080/nifi-api/flow/process-groups/test-pg-123/controller-services"
+        )
+    
+    def test_should_upload_process_group_definition(self, client):
+        # Arrange
+        definition = {"flowContents": {"name": "My Flow", "processors": []}}
+        with patch.object(client.session, 'post') as mock_post:
+            mock_post.return_value.json.return_value = {
+                "revision": {"version": 1}, "component": {"id": "new-pg", "name": "My Flow"}
+            }
+            
+            # Act
+            result = client.upload_process_group("parent-pg", "My Flow", definition)
+        
+        # Assert
+        assert result["component"]["id"] == "new-pg"
+        call_args = mock_post.call_args
+        assert call_args[0][0] == "http://test-nifi:8080/nifi-api/process-groups/parent-pg/process-groups/upload"
+        assert call_args[1]["data"]["groupName"] == "My Flow"
+        filename, content, content_type = call_args[1]["files"]["file"]
+        assert json.loads(content) == definition
+        assert content_type == "application/json"
+    
+    def test_should_update_controller_service_properties(self, client):
+        # Arrange
+        client._revisions["svc-1"] = {"version": 3}
+        with patch.object(client.session, 'put') as mock_put:
+            # Act
+            client.update_controller_service("svc-1", {"Password": "secret"})
+        
+        # Assert
+        assert mock_put.call_args[0][0] == "http://test-nifi:8080/nifi-api/controller-services/svc-1"
+        assert mock_put.call_args[1]["json"] == {
+            "revision": {"version": 3},
+            "component": {"id": "svc-1", "properties": {"Password": "secret"}}
+        }
+    
+    def test_should_disable_and_delete_controller_service(self, client):
+        # Arrange
+        client._revisions["svc-1"] = {"version": 3}
+        response = Mock(status_code=200)
+        response.json.return_value = {"revision": {"version": 4}, "component": {"id": "svc-1", "state": "DISABLED"}}
+        with patch.object(client.session, 'put', return_value=response) as mock_put, \
+                patch.object(client.session, 'delete') as mock_delete:
+            # Act
+            client.disable_controller_service("svc-1")
+            client.delete_controller_service("svc-1")
+        
+        # Assert
+        assert mock_put.call_args[1]["json"]["component"] == {"id": "svc-1", "state": "DISABLED"}
+        assert mock_delete.call_args[0][0] == "http://test-nifi:8080/nifi-api/controller-services/svc-1"
+        assert mock_delete.call_args[1]["params"]["version"] == 4
+    
+    def test_should_update_processor_configuration(self, client):
+        # Arrange
+        client._revisions["test-proc-456"] = {"version": 2}
+        with patch.object(client.session, 'put') as mock_put:
+            # Act
+            client.update_processor("test-proc-456", {"Batch Size": "5000"}, {"concurrentlySchedulableTaskCount": 4})
+        
+        # Assert
+        assert mock_put.call_args[1]["json"]["component"] == {
+            "id": "test-proc-456",
+            "config": {"concurrentlySchedulableTaskCount": 4, "properties": {"Batch Size": "5000"}}
+        }
+    
+    def test_should_stop_processor(self, client):
+        # Arrange
+        client._revisions["test-proc-456"] = {"version": 2}
+        with patch.object(client.session, 'put') as mock_put:
+            # Act
+            client.stop_processor("test-proc-456")
+        
+        # Assert
+        assert mock_put.call_args[1]["json"]["component"]["state"] == "STOPPED"
+    
+    def test_should_delete_process_group_with_cached_revision(self, client):
+        # Arrange
+        client._revisions["pg-1"] = {"version": 2, "clientId": "abc"}
+        with patch.object(client.session, 'delete') as mock_delete:
+            # Act
+            client.delete_process_group("pg-1")
+        
+        # Assert
+        mock_delete.assert_called_once_with(
+            "http://test-nifi:8080/nifi-api/process-groups/pg-1",
+            params={"version": 2, "clientId": "abc"}
+        )
+    
+    def test_should_move_process_group_through_snippet(self, client):
+        # Arrange
+        client._revisions["pg-1"] = {"version": 3}
+        with patch.object(client.session, 'post') as mock_post, patch.object(client.session, 'put') as mock_put:
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"snippet": {"id": "snip-1"}}
+            mock_put.return_value.status_code = 200
+            mock_put.return_value.json.return_value = {"snippet": {"id": "snip-1"}}
+            
+            # Act
+            client.move_process_group("pg-1", "root", "cdc-1")
+        
+        # Assert
+        assert mock_post.call_args[0][0] == "http://test-nifi:8080/nifi-api/snippets"
+        assert mock_post.call_args[1]["json"] == {"snippet": {
+            "parentGroupId": "root", "processGroups": {"pg-1": {"version": 3}}
+        }}
+        assert mock_put.call_args[0][0] == "http://test-nifi:8080/nifi-api/snippets/snip-1"
+        assert mock_put.call_args[1]["json"] == {"snippet": {"id": "snip-1", "parentGroupId": "cdc-1"}}
+        assert "pg-1" not in client._revisions
+    
+    def test_should_delete_connection_with_cached_revision(self, client):
+        # Arrange
+        client._revisions["test-conn-111"] = {"version": 4, "clientId": "abc"}
+        with patch.object(client.session, 'delete') as mock_delete:
+            # Act
+            client.delete_connection("test-conn-111")
+        
+        # Assert
+        mock_delete.assert_called_once_with(
+            "http://test-nifi:8080/nifi-api/connections/test-conn-111",
+            params={"version": 4, "clientId": "abc"}
+        )
+        assert "test-conn-111" not in client._revisions
+    
+    def test_should_drop_connection_queue(self, client):
+        # Arrange
+        running = Mock(status_code=200)
+        running.json.return_value = {"dropRequest": {"id": "drop-1", "finished": False}}
+        finished = Mock(status_code=200)
+        finished.json.return_value = {"dropRequest": {"id": "drop-1", "finished": True, "droppedCount": 42}}
+        
+        with patch.object(client.session, 'post', return_value=running) as mock_post, \
+                patch.object(client.session, 'get', return_value=finished) as mock_get, \
+                patch.object(client.session, 'delete', return_value=finished) as mock_delete:
+            # Act
+            result = client.drop_connection_queue("conn-1")
+        
+        # Assert
+        drop_url = "http://test-nifi:8080/nifi-api/flowfile-queues/conn-1/drop-requests"
+        assert mock_post.call_args[0][0] == drop_url
+        assert mock_get.call_args[0][0] == f"{drop_url}/drop-1"
+        mock_delete.assert_called_once_with(f"{drop_url}/drop-1")
+        assert result["dropRequest"]["droppedCount"] == 42
+    
+    def test_should_wait_for_active_threads_when_stopping(self, client):
+        # Arrange
+        draining = Mock(status_code=200)
+        draining.json.return_value = {"component": {"id": "p", "state": "STOPPED"},
+                                      "status": {"aggregateSnapshot": {"activeThreadCount": 2}}}
+        stopped = Mock(status_code=200)
+        stopped.json.return_value = {"component": {"id": "p", "state": "STOPPED"},
+                                     "status": {"aggregateSnapshot": {"activeThreadCount": 0}}}
+        
+        with patch.object(client.session, 'get', side_effect=[draining, stopped]) as mock_get:
+            with patch('time.sleep'):
+                # Act
+                client.wait_for_processor_state("p", "STOPPED")
+        
+        # Assert
+        assert mock_get.call_count == 2
+    
+    def test_should_wait_for_process_group_queues_to_drain(self, client):
+        # Arrange
+        queued = Mock(status_code=200)
+        queued.json.return_value = {"processGroupStatus": {"aggregateSnapshot": {"flowFilesQueued": 12}}}
+        drained = Mock(status_code=200)
+        drained.json.return_value = {"processGroupStatus": {"aggregateSnapshot": {"flowFilesQueued": 0}}}
+        
+        with patch.object(client.session, 'get', side_effect=[queued, drained]) as mock_get:
+            with patch('time.sleep'):
+                # Act
+                client.wait_for_process_group_drained("pg-1")
+        
+        # Assert
+        assert mock_get.call_count == 2
+        assert mock_get.call_args[0][0].startswith("http://test-nifi:8080/nifi-api/flow/process-groups/pg-1/status")
+    
+    def test_should_filter_bulletin_board(self, client):
+        # Arrange
+        with patch.object(client.session, 'get') as mock_get:
+            mock_get.return_value.status_code = 200
+            mock_get.return_value.json.return_value = {"bulletinBoard": {"bulletins": []}}
+            
+            # Act
+            client.get_bulletin_board(after=7, group_id="pg-1")
+        
+        # Assert
+        assert mock_get.call_args[1] == {"params": {"after": 7, "groupId": "pg-1"}}
+    
+    def test_should_get_recursive_process_group_status(self, client):
+        # Arrange
+        with patch.object(client.session, 'get') as mock_get:
+            mock_get.return_value.status_code = 200
+            mock_get.return_value.json.return_value = {"processGroupStatus": {"id": "cdc"}}
+            
+            # Act
+            client.get_process_group_status("cdc", recursive=True)
+            client.get_bulletin_board(after=7)
+            client.get_processor_state("qdt-1")
+        
+        # Assert
+        assert mock_get.call_args_list[0][0][0] == \
+            "http://test-nifi:8080/nifi-api/flow/process-groups/cdc/status?recursive=true"
+        assert mock_get.call_args_list[1][0][0] == "http://test-nifi:8080/nifi-api/flow/bulletin-board"
+        assert mock_get.call_args_list[1][1] == {"params": {"after": 7}}
+        assert mock_get.call_args_list[2][0][0] == "http://test-nifi:8080/nifi-api/processors/qdt-1/state"
+    
+    def test_should_get_process_group_flow(self, client):
+        # Arrange
+        with patch.object(client.session, 'get') as mock_get:
+            mock_get.return_value.json.return_value = {"processGroupFlow": {"id": "test-pg-123"}}
+            
+            # Act
+            result = client.get_process_group_flow("test-pg-123")
+        
+        # Assert
+        assert result["processGroupFlow"]["id"] == "test-pg-123"
+        mock_get.assert_called_once_with("http://test-nifi:8080/nifi-api/flow/process-groups/test-pg-123")
+    
     def test_should_get_process_group(self, client, mock_responses):
         # Arrange
         with patch.object(client.session, 'get') as mock_get:
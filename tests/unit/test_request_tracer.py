@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import Mock, patch
+from pathlib import Path
+import asyncio
+import json
+import sys
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from async_nifi_api_client import AsyncNiFiAPIClient
+from nifi_api_client import NiFiAPIClient, request_context
+from request_tracer import RequestTracer
+
+
+def call(endpoint, started, elapsed, flow="emp", phase="processors", **fields):
+    method = endpoint.split()[0]
+    return dict({"method": method, "url": "http://nifi/nifi-api", "endpoint": endpoint,
+                 "labels": {"flow": flow, "phase": phase}, "thread": 1, "started": started,
+                 "elapsed": elapsed, "status": 200, "retries": 0, "error": None}, **fields)
+
+
+class TestRequestTracer:
+
+    @pytest.fixture
+    def tracer(self):
+        """Create a tracer holding the calls of two flows"""
+        tracer = RequestTracer()
+        for recorded in [
+            call("POST /process-groups/{id}/processors", 100.0, 0.4),
+            call("POST /process-groups/{id}/processors", 100.4, 0.6, retries=2),
+            call("WAIT /controller-services/{id}", 101.0, 1.5, phase="services"),
+            call("GET /controller-services/{id}", 101.0, 0.1, phase="services", error="HTTPError: 500"),
+            call("PUT /flow/process-groups/{id}", 100.0, 0.2, flow="dept", phase="start")
+        ]:
+            tracer.record(recorded)
+        return tracer
+
+    def test_should_break_time_down_per_flow_phase_and_endpoint(self, tracer):
+        # Act
+        summary = tracer.summary()
+
+        # Assert
+        emp = summary["emp"]
+        assert emp["requests"] == 3 and emp["retries"] == 2 and emp["errors"] == 1
+        assert emp["request_time"] == pytest.approx(1.1)
+        assert emp["wait_time"] == pytest.approx(1.5)
+        assert emp["elapsed"] == pytest.approx(2.5)
+        assert emp["phases"]["processors"] == {"requests": 2, "request_time": pytest.approx(1.0), "wait_time": 0.0}
+        assert emp["endpoints"]["POST /process-groups/{id}/processors"] == {
+            "count": 2, "total": pytest.approx(1.0), "max": 0.6
+        }
+        assert summary["dept"]["requests"] == 1
+
+    def test_should_format_slowest_endpoints(self, tracer):
+        # Act
+        text = tracer.format_summary(top=1)
+
+        # Assert
+        lines = text.splitlines()
+        assert lines[0].startswith("dept: 0.20s, 1 requests")
+        assert "  WAIT /controller-services/{id}: 1 x avg 1.500s, max 1.500s, total 1.50s" in lines
+        assert not any("POST /process-groups" in line for line in lines)
+
+    def test_should_write_chrome_trace(self, tracer, tmp_path):
+        # Act
+        trace_path = tmp_path / "trace.json"
+        tracer.write_chrome_trace(str(trace_path))
+
+        # Assert
+        events = json.loads(trace_path.read_text())["traceEvents"]
+        names = {e["pid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+        spans = [e for e in events if e["ph"] == "X"]
+        assert sorted(names.values()) == ["dept", "emp"]
+        assert len(spans) == 5
+        assert spans[1]["ts"] == pytest.approx(400000) and spans[1]["dur"] == pytest.approx(600000)
+        assert spans[1]["args"]["retries"] == 2 and names[spans[1]["pid"]] == "emp"
+
+    def test_should_trace_requests_of_async_client_with_caller_labels(self):
+        # Arrange
+        tracer = RequestTracer()
+        nifi_client = NiFiAPIClient("http://test-nifi:8080/nifi-api", request_hooks=[tracer.hook])
+        ok = Mock(status_code=200)
+        ok.json.return_value = {"component": {"id": "pg-1"}}
+
+        async def deploy():
+            async with AsyncNiFiAPIClient.from_client(nifi_client, pool_size=2) as client:
+                with request_context(flow="emp", phase="start"):
+                    await asyncio.gather(client.get_process_group("pg-1"), client.get_process_group("pg-2"))
+
+        with patch.object(nifi_client.session, 'get', return_value=ok):
+            # Act
+            asyncio.run(deploy())
+
+        # Assert
+        assert len(tracer.calls) == 2
+        assert all(c["labels"] == {"flow": "emp", "phase": "start"} for c in tracer.calls)
+        assert tracer.summary()["emp"]["phases"]["start"]["requests"] == 2